@@ -0,0 +1,207 @@
+"""
+asyncio front end for key generation and the clipboard.
+
+``agenerate(n)`` is an async generator of arena-backed keys. A producer task
+fills batches on a dedicated key-generation thread (small batches inline,
+where a thread hop costs more than the work) and hands them over through an
+``asyncio.Queue`` of at most ``prefetch`` batches, so a slow consumer stalls
+generation instead of piling up keys. Each key is valid until the consumer
+moves past its batch; copy it to keep it. Closing or cancelling the
+generator wipes every key it still holds, including a batch that was in
+flight on the thread.
+
+Clipboard copies and clears run on a single clipboard thread, since a
+backend call may write to a helper pipe or spawn xclip/xsel. ``acopy`` hands
+the expiry to a ``ClipboardExpiryScheduler`` and ``acopy_with_expiry`` waits
+for it without holding a thread; cancelling that wait clears at once.
+
+The event loop itself never blocks on entropy, clipboard I/O or sleeps.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import AsyncIterator, Optional
+
+from aes256_clipboard import ClipboardExpiryScheduler, ClipboardUnavailable, Data, clipboard_backend
+from aes256_core import SecureArena, generate_keys, release_keys
+from aes256_stats import stage
+
+DEFAULT_BATCH = 256
+DEFAULT_PREFETCH = 2
+INLINE_MAX = 32  # batches this small are generated on the loop (a few µs each)
+
+_executors: dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+_scheduler: Optional[ClipboardExpiryScheduler] = None
+
+
+def _executor(name: str) -> ThreadPoolExecutor:
+    """One long-lived worker thread per job kind, shared by every event loop."""
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = _executors[name] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"aes256-{name}")
+        return executor
+
+
+def _release_result(arena: Optional[SecureArena], future: Future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        release_keys(future.result(), arena)
+
+
+async def _generate_batch(n: int, arena: Optional[SecureArena]) -> list[memoryview]:
+    if n <= INLINE_MAX:
+        return generate_keys(n, arena)
+    future = _executor("keygen").submit(generate_keys, n, arena)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # The thread cannot be interrupted: wipe its batch when it lands.
+        future.add_done_callback(partial(_release_result, arena))
+        raise
+
+
+async def _produce(n: int, batch_size: int, arena: Optional[SecureArena], queue: asyncio.Queue) -> None:
+    remaining = n
+    while remaining > 0:
+        keys = await _generate_batch(min(batch_size, remaining), arena)
+        try:
+            await queue.put(keys)  # blocks while prefetch batches are waiting
+        except asyncio.CancelledError:
+            release_keys(keys, arena)
+            raise
+        remaining -= len(keys)
+    await queue.put(None)
+
+
+async def agenerate(
+    n: int,
+    batch_size: int = DEFAULT_BATCH,
+    prefetch: int = DEFAULT_PREFETCH,
+    arena: Optional[SecureArena] = None,
+) -> AsyncIterator[memoryview]:
+    """
+    Yield n keys without blocking the loop. Use ``async with
+    contextlib.aclosing(agenerate(n)) as keys`` when breaking out early, so the
+    wipe runs at once rather than when the generator is collected.
+    """
+    if n < 1:
+        return
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, prefetch))
+    producer = asyncio.ensure_future(_produce(n, max(1, batch_size), arena, queue))
+    batch: Optional[list[memoryview]] = None
+    getter: Optional[asyncio.Future] = None
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait((getter, producer), return_when=asyncio.FIRST_COMPLETED)
+            if getter not in done:
+                producer.result()  # the producer failed: raise its error here
+            batch, getter = getter.result(), None
+            if batch is None:
+                return
+            for key in batch:
+                yield key
+            release_keys(batch, arena)
+            batch = None
+    finally:
+        producer.cancel()
+        if getter is not None:
+            if getter.done() and not getter.cancelled() and getter.result() is not None:
+                release_keys(getter.result(), arena)
+            getter.cancel()
+        if batch is not None:
+            release_keys(batch, arena)
+        while not queue.empty():
+            leftover = queue.get_nowait()
+            if leftover is not None:
+                release_keys(leftover, arena)
+
+
+@asynccontextmanager
+async def akeys(n: int, arena: Optional[SecureArena] = None) -> AsyncIterator[list[memoryview]]:
+    """``async with akeys(n) as keys``: n keys, wiped on exit, cancellation included."""
+    keys = await _generate_batch(n, arena)
+    try:
+        yield keys
+    finally:
+        release_keys(keys, arena)
+
+
+async def arelease(keys: list[memoryview], arena: Optional[SecureArena] = None) -> None:
+    """Wipe and free keys; large batches are wiped on the key-generation thread."""
+    if len(keys) <= INLINE_MAX:
+        release_keys(keys, arena)
+        return
+    await asyncio.wrap_future(_executor("keygen").submit(release_keys, keys, arena))
+
+
+# ---------------------------
+# Clipboard
+# ---------------------------
+
+def _clear_best_effort() -> None:
+    try:
+        with stage("clipboard_clear"):
+            clipboard_backend().clear()
+    except ClipboardUnavailable:
+        pass
+
+
+def clipboard_scheduler() -> ClipboardExpiryScheduler:
+    """Expiry scheduler for async callers; its worker thread starts on first use."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = ClipboardExpiryScheduler(_clear_best_effort)
+    return _scheduler
+
+
+async def aclear() -> None:
+    """Clear the clipboard on the clipboard thread."""
+    await asyncio.wrap_future(_executor("clipboard").submit(_clear_best_effort))
+
+
+async def acopy(
+    data: Data,
+    delay: float = 30.0,
+    scheduler: Optional[ClipboardExpiryScheduler] = None,
+) -> tuple[int, asyncio.Future]:
+    """
+    Copy data and schedule its expiry. Returns the scheduler token and a
+    future that resolves once the expiry has fired. Raises
+    ClipboardUnavailable without a backend.
+    """
+    scheduler = scheduler or clipboard_scheduler()
+    loop = asyncio.get_running_loop()
+    cleared = loop.create_future()
+
+    def on_cleared() -> None:
+        loop.call_soon_threadsafe(lambda: cleared.done() or cleared.set_result(None))
+
+    def copy() -> None:
+        with stage("clipboard_copy"):
+            clipboard_backend().copy(data)
+
+    token = await asyncio.wrap_future(_executor("clipboard").submit(scheduler.schedule, delay, on_cleared, copy))
+    return token, cleared
+
+
+async def acopy_with_expiry(
+    data: Data,
+    delay: float = 30.0,
+    scheduler: Optional[ClipboardExpiryScheduler] = None,
+) -> None:
+    """Copy data and wait until its expiry clears it; cancelling clears at once."""
+    scheduler = scheduler or clipboard_scheduler()
+    token, cleared = await acopy(data, delay, scheduler)
+    try:
+        await cleared
+    except asyncio.CancelledError:
+        if scheduler.cancel(token):
+            _executor("clipboard").submit(_clear_best_effort)  # don't await: we are being cancelled
+        raise
@@ -0,0 +1,282 @@
+"""
+AES-256 block cipher for the DRBG and key wrapping.
+
+Uses the ``cryptography`` package when it is installed and otherwise a
+table-driven pure-Python implementation (FIPS-197), checked once against the
+FIPS-197 appendix C.3 known-answer vector before first use. Round keys of the
+pure-Python path live in arrays that ``wipe()`` zeroes; the decryption
+schedule and tables are only built on first decrypt.
+
+``wrap_into``/``unwrap_into`` implement AES Key Wrap (RFC 3394) on top of it.
+"""
+
+from __future__ import annotations
+
+import struct
+from array import array
+
+from aes256_core import zeroize
+
+BLOCK_SIZE = 16
+_ROUNDS = 14
+
+
+def _xtime(a: int) -> int:
+    a <<= 1
+    return (a ^ 0x1B) & 0xFF if a & 0x100 else a
+
+
+def _build_tables() -> tuple[bytes, list[list[int]]]:
+    sbox = bytearray(256)
+    p = q = 1
+    while True:
+        # p walks GF(2^8) by multiplying by 3; q = p^-1 by dividing by 3.
+        p = p ^ _xtime(p)
+        q ^= q << 1
+        q ^= q << 2
+        q ^= q << 4
+        q &= 0xFF
+        if q & 0x80:
+            q ^= 0x09
+        x = q
+        for shift in range(1, 5):
+            x ^= ((q << shift) | (q >> (8 - shift))) & 0xFF
+        sbox[p] = x ^ 0x63
+        if p == 1:
+            break
+    sbox[0] = 0x63
+    t0 = []
+    for s in sbox:
+        s2 = _xtime(s)
+        t0.append((s2 << 24) | (s << 16) | (s << 8) | (s2 ^ s))
+    tables = [t0]
+    for r in (8, 16, 24):
+        tables.append([((t >> r) | (t << (32 - r))) & 0xFFFFFFFF for t in t0])
+    return bytes(sbox), tables
+
+
+_SBOX, (_T0, _T1, _T2, _T3) = _build_tables()
+_inverse = None
+
+
+def _mul(a: int, b: int) -> int:
+    r = 0
+    while b:
+        if b & 1:
+            r ^= a
+        a = _xtime(a)
+        b >>= 1
+    return r
+
+
+def _inverse_tables() -> tuple[bytes, list[int], list[int], list[int], list[int]]:
+    """Inverse S-box and decryption T-tables, built on first decrypt."""
+    global _inverse
+    if _inverse is None:
+        inv = bytearray(256)
+        for i, s in enumerate(_SBOX):
+            inv[s] = i
+        td0 = [(_mul(s, 14) << 24) | (_mul(s, 9) << 16) | (_mul(s, 13) << 8) | _mul(s, 11) for s in inv]
+        tables = [td0] + [[((t >> r) | (t << (32 - r))) & 0xFFFFFFFF for t in td0] for r in (8, 16, 24)]
+        _inverse = (bytes(inv), *tables)
+    return _inverse
+
+
+def _sub_word(w: int) -> int:
+    s = _SBOX
+    return (s[w >> 24] << 24) | (s[(w >> 16) & 0xFF] << 16) | (s[(w >> 8) & 0xFF] << 8) | s[w & 0xFF]
+
+
+class _PurePythonAES:
+    def __init__(self, key: bytes | bytearray | memoryview) -> None:
+        w = array("I", struct.unpack(">8I", key))
+        rcon = 1
+        for i in range(8, 4 * (_ROUNDS + 1)):
+            t = w[i - 1]
+            if i % 8 == 0:
+                t = _sub_word(((t << 8) & 0xFFFFFFFF) | (t >> 24)) ^ (rcon << 24)
+                rcon = _xtime(rcon)
+            elif i % 8 == 4:
+                t = _sub_word(t)
+            w.append(w[i - 8] ^ t)
+        self._w = w
+        self._dw = None
+
+    def _decrypt_schedule(self) -> array:
+        # Equivalent inverse cipher: round keys reversed, InvMixColumns applied
+        # to the inner ones.
+        _, td0, td1, td2, td3 = _inverse_tables()
+        w, s = self._w, _SBOX
+        dw = array("I", w[4 * _ROUNDS:4 * _ROUNDS + 4])
+        for rnd in range(_ROUNDS - 1, 0, -1):
+            for t in w[4 * rnd:4 * rnd + 4]:
+                dw.append(td0[s[t >> 24]] ^ td1[s[(t >> 16) & 0xFF]] ^ td2[s[(t >> 8) & 0xFF]] ^ td3[s[t & 0xFF]])
+        dw.extend(w[0:4])
+        self._dw = dw
+        return dw
+
+    def encrypt_block(self, block: bytes | bytearray | memoryview) -> bytes:
+        w = self._w
+        t0, t1, t2, t3 = _T0, _T1, _T2, _T3
+        s0, s1, s2, s3 = struct.unpack(">4I", block)
+        s0 ^= w[0]
+        s1 ^= w[1]
+        s2 ^= w[2]
+        s3 ^= w[3]
+        k = 4
+        for _ in range(_ROUNDS - 1):
+            s0, s1, s2, s3 = (
+                t0[s0 >> 24] ^ t1[(s1 >> 16) & 0xFF] ^ t2[(s2 >> 8) & 0xFF] ^ t3[s3 & 0xFF] ^ w[k],
+                t0[s1 >> 24] ^ t1[(s2 >> 16) & 0xFF] ^ t2[(s3 >> 8) & 0xFF] ^ t3[s0 & 0xFF] ^ w[k + 1],
+                t0[s2 >> 24] ^ t1[(s3 >> 16) & 0xFF] ^ t2[(s0 >> 8) & 0xFF] ^ t3[s1 & 0xFF] ^ w[k + 2],
+                t0[s3 >> 24] ^ t1[(s0 >> 16) & 0xFF] ^ t2[(s1 >> 8) & 0xFF] ^ t3[s2 & 0xFF] ^ w[k + 3],
+            )
+            k += 4
+        s = _SBOX
+        return struct.pack(
+            ">4I",
+            ((s[s0 >> 24] << 24) | (s[(s1 >> 16) & 0xFF] << 16) | (s[(s2 >> 8) & 0xFF] << 8) | s[s3 & 0xFF]) ^ w[k],
+            ((s[s1 >> 24] << 24) | (s[(s2 >> 16) & 0xFF] << 16) | (s[(s3 >> 8) & 0xFF] << 8) | s[s0 & 0xFF]) ^ w[k + 1],
+            ((s[s2 >> 24] << 24) | (s[(s3 >> 16) & 0xFF] << 16) | (s[(s0 >> 8) & 0xFF] << 8) | s[s1 & 0xFF]) ^ w[k + 2],
+            ((s[s3 >> 24] << 24) | (s[(s0 >> 16) & 0xFF] << 16) | (s[(s1 >> 8) & 0xFF] << 8) | s[s2 & 0xFF]) ^ w[k + 3],
+        )
+
+    def decrypt_block(self, block: bytes | bytearray | memoryview) -> bytes:
+        w = self._dw if self._dw is not None else self._decrypt_schedule()
+        inv, t0, t1, t2, t3 = _inverse_tables()
+        s0, s1, s2, s3 = struct.unpack(">4I", block)
+        s0 ^= w[0]
+        s1 ^= w[1]
+        s2 ^= w[2]
+        s3 ^= w[3]
+        k = 4
+        for _ in range(_ROUNDS - 1):
+            s0, s1, s2, s3 = (
+                t0[s0 >> 24] ^ t1[(s3 >> 16) & 0xFF] ^ t2[(s2 >> 8) & 0xFF] ^ t3[s1 & 0xFF] ^ w[k],
+                t0[s1 >> 24] ^ t1[(s0 >> 16) & 0xFF] ^ t2[(s3 >> 8) & 0xFF] ^ t3[s2 & 0xFF] ^ w[k + 1],
+                t0[s2 >> 24] ^ t1[(s1 >> 16) & 0xFF] ^ t2[(s0 >> 8) & 0xFF] ^ t3[s3 & 0xFF] ^ w[k + 2],
+                t0[s3 >> 24] ^ t1[(s2 >> 16) & 0xFF] ^ t2[(s1 >> 8) & 0xFF] ^ t3[s0 & 0xFF] ^ w[k + 3],
+            )
+            k += 4
+        return struct.pack(
+            ">4I",
+            ((inv[s0 >> 24] << 24) | (inv[(s3 >> 16) & 0xFF] << 16) | (inv[(s2 >> 8) & 0xFF] << 8) | inv[s1 & 0xFF]) ^ w[k],
+            ((inv[s1 >> 24] << 24) | (inv[(s0 >> 16) & 0xFF] << 16) | (inv[(s3 >> 8) & 0xFF] << 8) | inv[s2 & 0xFF]) ^ w[k + 1],
+            ((inv[s2 >> 24] << 24) | (inv[(s1 >> 16) & 0xFF] << 16) | (inv[(s0 >> 8) & 0xFF] << 8) | inv[s3 & 0xFF]) ^ w[k + 2],
+            ((inv[s3 >> 24] << 24) | (inv[(s2 >> 16) & 0xFF] << 16) | (inv[(s1 >> 8) & 0xFF] << 8) | inv[s0 & 0xFF]) ^ w[k + 3],
+        )
+
+    def wipe(self) -> None:
+        zeroize(memoryview(self._w).cast("B"))
+        if self._dw is not None:
+            zeroize(memoryview(self._dw).cast("B"))
+
+
+class _CryptographyAES:
+    def __init__(self, key: bytes | bytearray | memoryview) -> None:
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+        cipher = Cipher(algorithms.AES(bytes(key)), modes.ECB())
+        self._encryptor = cipher.encryptor()
+        self._decryptor = cipher.decryptor()
+
+    def encrypt_block(self, block: bytes | bytearray | memoryview) -> bytes:
+        return self._encryptor.update(block)
+
+    def decrypt_block(self, block: bytes | bytearray | memoryview) -> bytes:
+        return self._decryptor.update(block)
+
+    def wipe(self) -> None:
+        self._encryptor = None
+        self._decryptor = None
+
+
+_self_tested = False
+
+# FIPS-197 appendix C.3 (AES-256).
+_KAT_KEY = bytes(range(32))
+_KAT_PLAIN = bytes.fromhex("00112233445566778899aabbccddeeff")
+_KAT_CIPHER = bytes.fromhex("8ea2b7ca516745bfeafc49904b496089")
+
+
+def _backend():
+    try:
+        import cryptography.hazmat.primitives.ciphers  # noqa: F401
+        return _CryptographyAES
+    except ImportError:
+        return _PurePythonAES
+
+
+def new_cipher(key: bytes | bytearray | memoryview):
+    """
+    AES-256 block cipher for key; returns an object with
+    ``encrypt_block(16 bytes) -> bytes``, ``decrypt_block`` and ``wipe()``.
+    """
+    global _self_tested
+    if len(key) != 32:
+        raise ValueError("AES-256 needs a 32-byte key")
+    impl = _backend()
+    if not _self_tested:
+        kat = impl(_KAT_KEY)
+        if kat.encrypt_block(_KAT_PLAIN) != _KAT_CIPHER or kat.decrypt_block(_KAT_CIPHER) != _KAT_PLAIN:
+            raise RuntimeError("AES-256 known-answer self-test failed")
+        _self_tested = True
+    return impl(key)
+
+
+# ---------------------------
+# AES Key Wrap (RFC 3394)
+# ---------------------------
+
+KW_DEFAULT_IV = 0xA6A6A6A6A6A6A6A6
+
+# RFC 3394 section 4.6: 256 bits of key data with a 256-bit KEK.
+_KW_KEK = bytes(range(32))
+_KW_DATA = bytes.fromhex("00112233445566778899aabbccddeeff000102030405060708090a0b0c0d0e0f")
+_KW_WRAPPED = bytes.fromhex("28c9f404c4b810f4cbccb35cfb87f8263f5786e2d80ed326cbc7f0e71a99f43bfb988b9b7a02dd21")
+
+
+def wrap_into(cipher, key, out, pos: int = 0, iv: int = KW_DEFAULT_IV) -> int:
+    """
+    AES-KW wrap key (a multiple of 8 bytes, at least 16) with cipher into
+    out[pos:]; return the end position. The output is 8 bytes longer than key.
+    """
+    n = len(key) // 8
+    if len(key) % 8 or n < 2:
+        raise ValueError("AES-KW wraps a multiple of 8 bytes, at least 16")
+    r = list(struct.unpack(">%dQ" % n, key))
+    a = iv
+    encrypt = cipher.encrypt_block
+    for j in range(6):
+        for i in range(n):
+            a, r[i] = struct.unpack(">QQ", encrypt(struct.pack(">QQ", a, r[i])))
+            a ^= n * j + i + 1
+    struct.pack_into(">Q%dQ" % n, out, pos, a, *r)
+    return pos + 8 * (n + 1)
+
+
+def unwrap_into(cipher, wrapped, out, pos: int = 0, iv: int = KW_DEFAULT_IV) -> int:
+    """Inverse of wrap_into; raises ValueError when the integrity check fails."""
+    n = len(wrapped) // 8 - 1
+    if len(wrapped) % 8 or n < 2:
+        raise ValueError("malformed AES-KW ciphertext")
+    a, *r = struct.unpack(">Q%dQ" % n, wrapped)
+    decrypt = cipher.decrypt_block
+    for j in range(5, -1, -1):
+        for i in range(n - 1, -1, -1):
+            a, r[i] = struct.unpack(">QQ", decrypt(struct.pack(">QQ", a ^ (n * j + i + 1), r[i])))
+    if a != iv:
+        raise ValueError("AES-KW integrity check failed (wrong key or corrupted record)")
+    struct.pack_into(">%dQ" % n, out, pos, *r)
+    return pos + 8 * n
+
+
+def kw_self_test() -> None:
+    """Check wrap and unwrap against the RFC 3394 section 4.6 vector."""
+    cipher = new_cipher(_KW_KEK)
+    out = bytearray(len(_KW_WRAPPED))
+    wrap_into(cipher, _KW_DATA, out)
+    plain = bytearray(len(_KW_DATA))
+    unwrap_into(cipher, _KW_WRAPPED, plain)
+    if out != _KW_WRAPPED or plain != _KW_DATA:
+        raise RuntimeError("AES-KW known-answer self-test failed")
@@ -0,0 +1,484 @@
+"""
+Clipboard backends and self-destruct scheduling shared by the CLI and the GUI.
+
+Backends are probed once per process and cached. On X11 a single Tk helper
+process owns the selection and is fed over a pipe, so a copy or clear is one
+write() rather than a fork/exec of xclip or xsel. Windows uses the clipboard
+API in-process through ctypes. AES256_CLIPBOARD_BACKEND forces a backend
+("fake" runs without a display, for tests and benchmarks).
+
+One long-lived worker thread owns a deadline heap of expiries. When a newer
+copy replaces the clipboard, older expiries become stale and no longer clear
+it (their callbacks still fire at their deadline). The thread sleeps until
+the earliest deadline exactly and never clears before it; expiries already
+due when it wakes are handled together with at most one clear.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+from typing import Callable, Optional, Union
+
+from aes256_core import zeroize
+
+BACKEND_ENV = "AES256_CLIPBOARD_BACKEND"
+
+Data = Union[bytes, bytearray, memoryview, str]
+
+
+class ClipboardUnavailable(RuntimeError):
+    pass
+
+
+def _as_bytes(data: Data) -> Union[bytes, bytearray, memoryview]:
+    return data.encode("utf-8") if isinstance(data, str) else data
+
+
+# ---------------------------
+# Backends
+# ---------------------------
+
+class ClipboardBackend:
+    """Copy bytes to / clear the system clipboard. Errors raise ClipboardUnavailable."""
+
+    name = "none"
+
+    def copy(self, data: Data) -> None:
+        raise ClipboardUnavailable("no clipboard backend available")
+
+    def clear(self) -> None:
+        self.copy(b"")
+
+    def close(self) -> None:
+        pass
+
+
+class FakeClipboard(ClipboardBackend):
+    """In-memory clipboard; the previous content is wiped on every copy or clear."""
+
+    name = "fake"
+
+    def __init__(self) -> None:
+        self.content = bytearray()
+        self.copies = 0
+        self.clears = 0
+
+    def copy(self, data: Data) -> None:
+        zeroize(self.content)
+        self.content[:] = _as_bytes(data)
+        self.copies += 1
+
+    def clear(self) -> None:
+        zeroize(self.content)
+        self.content.clear()
+        self.clears += 1
+
+
+class CommandClipboard(ClipboardBackend):
+    """One subprocess per operation (xclip, xsel, wl-copy, pbcopy)."""
+
+    def __init__(self, name: str, copy_argvs: list[list[str]], clear_argvs: Optional[list[list[str]]] = None) -> None:
+        self.name = name
+        self._copy_argvs = copy_argvs
+        self._clear_argvs = clear_argvs
+
+    def _run(self, argvs: list[list[str]], data: Data) -> None:
+        import subprocess
+
+        for argv in argvs:
+            try:
+                subprocess.run(argv, input=_as_bytes(data), check=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            except (OSError, subprocess.CalledProcessError) as exc:
+                raise ClipboardUnavailable(f"{argv[0]} failed: {exc}") from exc
+
+    def copy(self, data: Data) -> None:
+        self._run(self._copy_argvs, data)
+
+    def clear(self) -> None:
+        self._run(self._clear_argvs or self._copy_argvs, b"")
+
+
+# Runs in the helper process: owns the X selection through Tk and applies
+# length-prefixed frames read from stdin. An empty frame clears; EOF exits.
+_HELPER_SOURCE = r"""
+import os, sys, tkinter
+root = tkinter.Tk()
+root.withdraw()
+fd = sys.stdin.fileno()
+buf = bytearray(65536)
+pending = bytearray()
+def readable(_file, _mask):
+    n = os.readv(fd, [buf])
+    if not n:
+        root.clipboard_clear()
+        root.quit()
+        return
+    pending.extend(memoryview(buf)[:n])
+    buf[:n] = bytes(n)
+    while len(pending) >= 4:
+        size = int.from_bytes(pending[:4], "big")
+        if len(pending) < 4 + size:
+            break
+        root.clipboard_clear()
+        if size:
+            root.clipboard_append(pending[4:4 + size].decode("utf-8"))
+        pending[:4 + size] = bytes(4 + size)
+        del pending[:4 + size]
+    root.update_idletasks()
+root.tk.createfilehandler(fd, tkinter.READABLE, readable)
+os.write(1, b"R")
+root.mainloop()
+"""
+
+
+class HelperClipboard(ClipboardBackend):
+    """Persistent Tk helper process fed over a pipe; one fork for the whole session."""
+
+    name = "tk-helper"
+
+    def __init__(self, timeout: float = 3.0) -> None:
+        import select
+        import subprocess
+
+        try:
+            self._proc = subprocess.Popen(
+                [sys.executable, "-c", _HELPER_SOURCE],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            )
+        except OSError as exc:
+            raise ClipboardUnavailable(f"clipboard helper failed to start: {exc}") from exc
+        ready, _, _ = select.select([self._proc.stdout], [], [], timeout)
+        if not ready or os.read(self._proc.stdout.fileno(), 1) != b"R":
+            self._proc.kill()
+            self._proc.wait()
+            raise ClipboardUnavailable("clipboard helper did not start")
+        self._fd = self._proc.stdin.fileno()
+
+    def copy(self, data: Data) -> None:
+        payload = memoryview(_as_bytes(data)).cast("B")
+        try:
+            # One writev of a small frame is atomic on a pipe, so no lock is
+            # needed even when a signal handler clears mid-copy.
+            os.writev(self._fd, [len(payload).to_bytes(4, "big"), payload])
+        except OSError as exc:
+            raise ClipboardUnavailable(f"clipboard helper gone: {exc}") from exc
+        finally:
+            payload.release()
+
+    def clear(self) -> None:
+        self.copy(b"")
+
+    def close(self) -> None:
+        try:
+            self._proc.stdin.close()
+            self._proc.wait(timeout=1.0)
+        except Exception:
+            self._proc.kill()
+
+
+class WindowsClipboard(ClipboardBackend):
+    """Win32 clipboard API in-process via ctypes."""
+
+    name = "windows"
+    _CF_UNICODETEXT = 13
+    _GMEM_MOVEABLE = 0x0002
+
+    def __init__(self) -> None:
+        import ctypes
+        from ctypes import wintypes
+
+        self._ctypes = ctypes
+        self._user32 = ctypes.WinDLL("user32", use_last_error=True)
+        self._kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        self._user32.OpenClipboard.argtypes = [wintypes.HWND]
+        self._user32.SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+        self._user32.SetClipboardData.restype = wintypes.HANDLE
+        self._kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+        self._kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+        self._kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+        self._kernel32.GlobalLock.restype = ctypes.c_void_p
+        self._kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+        self._kernel32.GlobalFree.argtypes = [wintypes.HGLOBAL]
+
+    def _open(self) -> None:
+        for _ in range(10):
+            if self._user32.OpenClipboard(None):
+                return
+            time.sleep(0.01)
+        raise ClipboardUnavailable("clipboard is locked by another process")
+
+    def copy(self, data: Data) -> None:
+        if isinstance(data, str):
+            data = data.encode("utf-16-le")
+            width = 1
+        else:
+            width = 2  # ASCII hex: widen to UTF-16 in place, no str copy
+        payload = memoryview(data).cast("B")
+        size = len(payload) * width + 2
+        handle = self._kernel32.GlobalAlloc(self._GMEM_MOVEABLE, size)
+        if not handle:
+            raise ClipboardUnavailable("GlobalAlloc failed")
+        ptr = self._kernel32.GlobalLock(handle)
+        target = memoryview((self._ctypes.c_char * size).from_address(ptr)).cast("B")
+        target[:] = bytes(size)
+        target[0:len(payload) * width:width] = payload
+        target.release()
+        self._kernel32.GlobalUnlock(handle)
+        self._open()
+        try:
+            self._user32.EmptyClipboard()
+            if not self._user32.SetClipboardData(self._CF_UNICODETEXT, handle):
+                self._kernel32.GlobalFree(handle)
+                raise ClipboardUnavailable("SetClipboardData failed")
+        finally:
+            self._user32.CloseClipboard()
+
+    def clear(self) -> None:
+        self._open()
+        try:
+            self._user32.EmptyClipboard()
+        finally:
+            self._user32.CloseClipboard()
+
+
+class PyperclipClipboard(ClipboardBackend):
+    """Last-resort fallback; pyperclip only takes str."""
+
+    name = "pyperclip"
+
+    def __init__(self) -> None:
+        import pyperclip
+
+        self._pyperclip = pyperclip
+
+    def copy(self, data: Data) -> None:
+        text = data if isinstance(data, str) else bytes(data).decode("utf-8")
+        try:
+            self._pyperclip.copy(text)
+        except self._pyperclip.PyperclipException as exc:
+            raise ClipboardUnavailable(str(exc)) from exc
+
+
+def _xclip() -> CommandClipboard:
+    return CommandClipboard(
+        "xclip",
+        [["xclip", "-selection", "clipboard"]],
+        [["xclip", "-selection", "clipboard"], ["xclip", "-selection", "primary"]],
+    )
+
+
+def _xsel() -> CommandClipboard:
+    return CommandClipboard(
+        "xsel",
+        [["xsel", "--clipboard", "--input"]],
+        [["xsel", "--clipboard", "--clear"], ["xsel", "--primary", "--clear"]],
+    )
+
+
+_BACKENDS: dict[str, Callable[[], ClipboardBackend]] = {
+    "fake": FakeClipboard,
+    "tk-helper": HelperClipboard,
+    "xclip": _xclip,
+    "xsel": _xsel,
+    "wl-copy": lambda: CommandClipboard("wl-copy", [["wl-copy"]], [["wl-copy", "--clear"]]),
+    "pbcopy": lambda: CommandClipboard("pbcopy", [["pbcopy"]]),
+    "windows": WindowsClipboard,
+    "pyperclip": PyperclipClipboard,
+    "none": ClipboardBackend,
+}
+
+
+def _candidates() -> list[str]:
+    forced = os.environ.get(BACKEND_ENV)
+    if forced:
+        return [forced]
+    if sys.platform.startswith("win"):
+        return ["windows", "pyperclip"]
+    if sys.platform.startswith("darwin"):
+        return ["pbcopy", "pyperclip"]
+    import shutil
+
+    names = []
+    if os.environ.get("DISPLAY"):
+        names.append("tk-helper")
+    if os.environ.get("WAYLAND_DISPLAY") and shutil.which("wl-copy"):
+        names.append("wl-copy")
+    if os.environ.get("DISPLAY"):
+        names += [n for n in ("xclip", "xsel") if shutil.which(n)]
+    names.append("pyperclip")
+    return names
+
+
+_backend: Optional[ClipboardBackend] = None
+
+
+def clipboard_backend() -> ClipboardBackend:
+    """Probe the available backends once and cache the first that works."""
+    global _backend
+    if _backend is None:
+        backend = None
+        for name in _candidates():
+            factory = _BACKENDS.get(name)
+            if factory is None:
+                raise ValueError(f"unknown {BACKEND_ENV} value: {name!r}")
+            try:
+                backend = factory()
+                break
+            except (ClipboardUnavailable, ImportError, OSError):
+                continue
+        _backend = backend if backend is not None else ClipboardBackend()
+    return _backend
+
+
+def set_clipboard_backend(backend: Optional[ClipboardBackend]) -> None:
+    """Install a backend (or None to re-probe on next use), closing the previous one."""
+    global _backend
+    if _backend is not None and _backend is not backend:
+        _backend.close()
+    _backend = backend
+
+
+def close_clipboard_backend() -> None:
+    set_clipboard_backend(None)
+
+
+# ---------------------------
+# Expiry scheduling
+# ---------------------------
+
+
+class _Expiry:
+    __slots__ = ("deadline", "token", "generation", "on_cleared", "cancelled")
+
+    def __init__(self, deadline: float, token: int, generation: int, on_cleared: Optional[Callable[[], None]]) -> None:
+        self.deadline = deadline
+        self.token = token
+        self.generation = generation
+        self.on_cleared = on_cleared
+        self.cancelled = False
+
+
+class ClipboardExpiryScheduler:
+    """Single-thread clipboard expiry scheduler with a deadline heap."""
+
+    def __init__(
+        self,
+        clear: Callable[[], None],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._clear = clear
+        self._clock = clock
+        self._heap: list[tuple[float, int, _Expiry]] = []
+        self._entries: dict[int, _Expiry] = {}
+        self._cond = threading.Condition()
+        # Serialises clipboard writes (copy) against clears so a clear decided
+        # for an old copy can never land on top of a newer one.
+        self._io_lock = threading.Lock()
+        self._generation = 0
+        self._tokens = itertools.count(1)
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def schedule(
+        self,
+        delay: float,
+        on_cleared: Optional[Callable[[], None]] = None,
+        copy: Optional[Callable[[], None]] = None,
+    ) -> int:
+        """
+        Register an expiry delay seconds from now and return its token.
+
+        If copy is given it is run first, atomically with respect to clears;
+        the new expiry supersedes every pending one.
+        """
+        with self._io_lock:
+            if copy is not None:
+                copy()
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("clipboard scheduler is shut down")
+                self._generation += 1
+                entry = _Expiry(self._clock() + max(0.0, delay), next(self._tokens), self._generation, on_cleared)
+                heapq.heappush(self._heap, (entry.deadline, entry.token, entry))
+                self._entries[entry.token] = entry
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="clipboard-expiry", daemon=True)
+                    self._thread.start()
+                self._cond.notify()
+        return entry.token
+
+    def cancel(self, token: int) -> bool:
+        """Drop a pending expiry (no clear, no callback). Returns False if already fired."""
+        with self._cond:
+            entry = self._entries.pop(token, None)
+            if entry is None:
+                return False
+            entry.cancelled = True
+            return True
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._entries)
+
+    def flush(self) -> None:
+        """Clear now and fire every pending callback (e.g. on exit)."""
+        with self._cond:
+            due = [e for _, _, e in self._heap if not e.cancelled]
+            self._heap.clear()
+            self._entries.clear()
+        self._fire(due, force_clear=True)
+
+    def shutdown(self, flush: bool = True) -> None:
+        """Stop the worker thread, optionally flushing pending expiries first."""
+        if flush:
+            self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=1.0)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed:
+                    now = self._clock()
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+                    timeout = self._heap[0][0] - now if self._heap else None
+                    self._cond.wait(timeout)
+                if self._closed:
+                    return
+                now = self._clock()
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    _, _, entry = heapq.heappop(self._heap)
+                    if not entry.cancelled:
+                        self._entries.pop(entry.token, None)
+                        due.append(entry)
+            self._fire(due)
+
+    def _fire(self, due: list[_Expiry], force_clear: bool = False) -> None:
+        with self._io_lock:
+            with self._cond:
+                # Only the newest copy's expiry may clear; re-checked under the
+                # io lock in case a newer copy landed since the entries fell due.
+                current = force_clear or any(e.generation == self._generation for e in due)
+            if current:
+                try:
+                    self._clear()
+                except Exception:
+                    pass
+        for entry in due:
+            if entry.on_cleared is not None:
+                try:
+                    entry.on_cleared()
+                except Exception:
+                    pass
@@ -0,0 +1,712 @@
+"""
+Shared key-material primitives for the AES-256 Hex Generator (CLI and GUI).
+
+Importing this module has no side effects.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import mmap
+import os
+import sys
+import threading
+import time
+from functools import lru_cache
+from itertools import count
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+
+from aes256_stats import count as stats_count, stage
+
+KEY_SIZE = 32
+PAGE_SIZE = mmap.PAGESIZE
+SLOTS_PER_PAGE = PAGE_SIZE // KEY_SIZE  # 128 keys per 4 KiB page
+
+_MADV_WIPEONFORK = getattr(mmap, "MADV_WIPEONFORK", 18 if sys.platform.startswith("linux") else None)
+
+
+@lru_cache(maxsize=None)
+def _libc() -> Optional[ctypes.CDLL]:
+    if os.name != "posix":
+        return None
+    import ctypes.util  # pulls in subprocess/shutil; only needed once
+
+    for name in (ctypes.util.find_library("c"), "libc.so.6", "libc.dylib", "libSystem.B.dylib"):
+        if not name:
+            continue
+        try:
+            return ctypes.CDLL(name, use_errno=True)
+        except OSError:
+            continue
+    return None
+
+
+def _address_of(buf) -> int:
+    return ctypes.addressof(ctypes.c_char.from_buffer(buf))
+
+
+def _lock_region(addr: int, length: int) -> bool:
+    try:
+        if os.name == "nt":
+            return ctypes.windll.kernel32.VirtualLock(ctypes.c_void_p(addr), ctypes.c_size_t(length)) != 0
+        libc = _libc()
+        if libc is None:
+            return False
+        return libc.mlock(ctypes.c_void_p(addr), ctypes.c_size_t(length)) == 0
+    except (AttributeError, OSError):
+        return False
+
+
+def _unlock_region(addr: int, length: int) -> bool:
+    try:
+        if os.name == "nt":
+            return ctypes.windll.kernel32.VirtualUnlock(ctypes.c_void_p(addr), ctypes.c_size_t(length)) != 0
+        libc = _libc()
+        if libc is None:
+            return False
+        return libc.munlock(ctypes.c_void_p(addr), ctypes.c_size_t(length)) == 0
+    except (AttributeError, OSError):
+        return False
+
+
+class WipeBackend(NamedTuple):
+    primitive: str
+    library: Optional[str]
+    zero: Callable[[int, int], None]  # (address, length)
+    optimisation_safe: bool
+
+
+def available_wipe_backends() -> list[WipeBackend]:
+    """Every zeroization backend usable on this platform, most preferred first."""
+    backends = []
+    if os.name == "nt":
+        try:
+            # RtlSecureZeroMemory is an inline intrinsic; RtlZeroMemory is the exported equivalent.
+            for name in ("RtlSecureZeroMemory", "RtlZeroMemory"):
+                func = getattr(ctypes.WinDLL("ntdll"), name, None)
+                if func is not None:
+                    func.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+                    func.restype = None
+                    backends.append(WipeBackend(name, "ntdll", func, True))
+        except OSError:
+            pass
+    libc = _libc()
+    if libc is not None:
+        explicit_bzero = getattr(libc, "explicit_bzero", None)
+        if explicit_bzero is not None:
+            explicit_bzero.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+            explicit_bzero.restype = None
+            backends.append(WipeBackend("explicit_bzero", libc._name, explicit_bzero, True))
+        memset_s = getattr(libc, "memset_s", None)
+        if memset_s is not None:
+            memset_s.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_size_t]
+            memset_s.restype = ctypes.c_int
+
+            def _memset_s(addr: int, length: int) -> None:
+                if memset_s(addr, length, 0, length) != 0:
+                    ctypes.memset(addr, 0, length)
+            backends.append(WipeBackend("memset_s", libc._name, _memset_s, True))
+    # A foreign memset call cannot be elided by the Python compiler either.
+    backends.append(WipeBackend("ctypes.memset", None, lambda addr, length: ctypes.memset(addr, 0, length), False))
+    return backends
+
+
+def _probe_wipe_backend() -> WipeBackend:
+    return available_wipe_backends()[0]
+
+
+_wipe_backend: Optional[WipeBackend] = None
+
+
+def wipe_backend() -> WipeBackend:
+    """Return the zeroization backend, probing the platform on first use only."""
+    global _wipe_backend
+    if _wipe_backend is None:
+        _wipe_backend = _probe_wipe_backend()
+    return _wipe_backend
+
+
+def wipe_backend_info() -> dict:
+    """Capability report: which zeroization primitive is active."""
+    backend = wipe_backend()
+    return {
+        "primitive": backend.primitive,
+        "library": backend.library,
+        "optimisation_safe": backend.optimisation_safe,
+        "platform": sys.platform,
+    }
+
+
+_WIPE_PATTERNS = (0xFF, 0x00, 0xA5)
+
+
+def zeroize(buf: bytearray | memoryview, passes: int = 0) -> None:
+    """
+    Zero a writable buffer in place with the cached backend.
+
+    ``passes`` adds pattern overwrites before the final zero, only when falling
+    back to plain memset.
+    """
+    length = len(buf)
+    if length == 0:
+        return
+    try:
+        addr = _address_of(buf)
+    except (TypeError, ValueError):
+        buf[:] = bytes(length)
+        return
+    backend = wipe_backend()
+    if not backend.optimisation_safe:
+        for p in range(passes):
+            ctypes.memset(addr, _WIPE_PATTERNS[p % len(_WIPE_PATTERNS)], length)
+    backend.zero(addr, length)
+
+
+def _hex_tables(digits: bytes) -> tuple[bytes, bytes]:
+    return bytes(digits[b >> 4] for b in range(256)), bytes(digits[b & 0x0F] for b in range(256))
+
+
+_HEX_TABLES = {False: _hex_tables(b"0123456789abcdef"), True: _hex_tables(b"0123456789ABCDEF")}
+
+
+class HexEncoder:
+    """
+    Hex encoder that writes into caller-supplied, reusable buffers.
+
+    Never creates an immutable str/bytes copy of the input: work buffers are
+    bytearrays that are zeroized before returning, so encoded key material
+    exists only where the caller put it (and can wipe it).
+    """
+
+    def __init__(self, upper: bool = False) -> None:
+        self._hi, self._lo = _HEX_TABLES[upper]
+        self._scratch = bytearray()  # not shared: use one encoder per thread
+
+    def _stage(self, n: int) -> bytearray:
+        if len(self._scratch) != n:
+            zeroize(self._scratch)
+            self._scratch = bytearray(n)
+        return self._scratch
+
+    def _spread(self, scratch: bytearray, out, pos: int) -> int:
+        end = pos + 2 * len(scratch)
+        hi = scratch.translate(self._hi)
+        lo = scratch.translate(self._lo)
+        try:
+            out[pos:end:2] = hi
+            out[pos + 1:end:2] = lo
+        finally:
+            zeroize(hi)
+            zeroize(lo)
+            zeroize(scratch)
+        return end
+
+    def encode_into(self, src, out, pos: int = 0) -> int:
+        """Write the hex of src into out[pos:]; return the end position."""
+        scratch = self._stage(len(src))
+        scratch[:] = src
+        return self._spread(scratch, out, pos)
+
+    def encode_many(self, keys: Iterable, out, pos: int = 0) -> int:
+        """Write the concatenated hex of equal-length keys into out[pos:] in one pass."""
+        keys = list(keys)
+        if not keys:
+            return pos
+        width = len(keys[0])
+        scratch = self._stage(width * len(keys))
+        off = 0
+        for key in keys:
+            scratch[off:off + width] = key
+            off += width
+        return self._spread(scratch, out, pos)
+
+
+def memlock_limit() -> Optional[int]:
+    """Return the soft RLIMIT_MEMLOCK in bytes, or None when unlimited/unknown."""
+    try:
+        import resource
+        soft, _hard = resource.getrlimit(resource.RLIMIT_MEMLOCK)
+    except (ImportError, AttributeError, ValueError, OSError):
+        return None
+    if soft == resource.RLIM_INFINITY:
+        return None
+    return soft
+
+
+def process_locked_bytes() -> Optional[int]:
+    """Return the process-wide locked memory (VmLck) in bytes, where the OS reports it."""
+    try:
+        with open("/proc/self/status", "r") as status:
+            for line in status:
+                if line.startswith("VmLck:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _fill_random(buf: memoryview) -> None:
+    """Fill a writable buffer in place from the default entropy source (see aes256_entropy)."""
+    from aes256_entropy import fill_random  # imports this module; resolved at first use
+
+    fill_random(buf)
+
+
+def _zero_runs(addrs: list[int]) -> None:
+    """Zero KEY_SIZE slots at the given addresses, coalescing adjacent slots into one call."""
+    if not addrs:
+        return
+    zero = wipe_backend().zero
+    addrs.sort()
+    run_addr = run_end = addrs[0]
+    for addr in addrs:
+        if addr != run_end:
+            zero(run_addr, run_end - run_addr)
+            run_addr = addr
+        run_end = addr + KEY_SIZE
+    zero(run_addr, run_end - run_addr)
+
+
+class _ArenaChunk:
+    __slots__ = ("mm", "view", "base", "size", "locked")
+
+    def __init__(self, pages: int) -> None:
+        self.size = pages * PAGE_SIZE
+        if os.name == "posix":
+            self.mm = mmap.mmap(-1, self.size, flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS)
+            for advice in (getattr(mmap, "MADV_DONTDUMP", None), _MADV_WIPEONFORK):
+                if advice is None:
+                    continue
+                try:
+                    self.mm.madvise(advice)
+                except (OSError, ValueError):
+                    pass
+        else:
+            self.mm = mmap.mmap(-1, self.size)
+        self.view = memoryview(self.mm)
+        self.base = _address_of(self.mm)
+        self.locked = _lock_region(self.base, self.size)
+
+
+class SecureArena:
+    """
+    mmap-backed, mlocked slot allocator for 32-byte keys.
+
+    Keys are packed SLOTS_PER_PAGE to a page, so locking costs one syscall per
+    chunk rather than one per key. Slots are handed out as memoryviews; alloc
+    and free are O(1) per slot. Freed slots are zeroed and their view released,
+    so a stale reference can never observe a later key.
+
+    wipe_all() zeroes the whole arena with one call per chunk and never takes
+    the allocator lock, so it is safe to run from a signal handler.
+    """
+
+    def __init__(self, pages_per_chunk: int = 16) -> None:
+        self._pages_per_chunk = max(1, int(pages_per_chunk))
+        self._chunks: list[_ArenaChunk] = []
+        self._page_index: dict[int, int] = {}  # page base address -> chunk index
+        self._free: list[int] = []  # stack of free slot ids
+        self._live: dict[int, memoryview] = {}  # slot id -> outstanding view
+        self._lock = threading.Lock()
+        self.last_wipe_ns = 0
+        self.max_wipe_ns = 0
+
+    def _grow(self, min_slots: int) -> None:
+        pages = self._pages_per_chunk
+        while pages * SLOTS_PER_PAGE < min_slots:
+            pages += self._pages_per_chunk
+        with stage("mlock"):
+            chunk = _ArenaChunk(pages)
+        idx = len(self._chunks)
+        self._chunks.append(chunk)
+        for page in range(pages):
+            self._page_index[chunk.base + page * PAGE_SIZE] = idx
+        slots = pages * SLOTS_PER_PAGE
+        # Slot ids are (chunk index << 32) | slot-in-chunk. Push in reverse so
+        # pops hand out ascending, contiguous slots.
+        self._free[:0] = range((idx << 32) + slots - 1, (idx << 32) - 1, -1)
+
+    def alloc(self, n: int = 1) -> list[memoryview]:
+        """Allocate n zeroed key slots."""
+        return self.alloc_runs(n)[0]
+
+    def alloc_runs(self, n: int) -> tuple[list[memoryview], list[tuple[int, int]]]:
+        """alloc() that also returns the contiguous (address, length) runs backing the views."""
+        if n < 1:
+            raise ValueError("alloc expects n >= 1")
+        with self._lock:
+            if len(self._free) < n:
+                self._grow(n - len(self._free))
+            taken = self._free[-n:]
+            del self._free[-n:]
+            taken.sort()  # ascending slots keep contiguous runs together
+            out = []
+            runs: list[tuple[int, int]] = []
+            live = self._live
+            run_addr = run_end = -1
+            for slot in taken:
+                chunk = self._chunks[slot >> 32]
+                off = (slot & 0xFFFFFFFF) * KEY_SIZE
+                view = chunk.view[off:off + KEY_SIZE]
+                live[slot] = view
+                out.append(view)
+                addr = chunk.base + off
+                if addr != run_end:
+                    if run_addr >= 0:
+                        runs.append((run_addr, run_end - run_addr))
+                    run_addr = addr
+                run_end = addr + KEY_SIZE
+            runs.append((run_addr, run_end - run_addr))
+            return out, runs
+
+    def free(self, key: memoryview) -> None:
+        """Zero a key slot, release its view and return the slot to the free list."""
+        self.free_many((key,))
+
+    def free_many(self, keys: Iterable[memoryview]) -> None:
+        """free() for a batch of keys: one lock acquisition, one zeroization per contiguous run."""
+        page_mask = ~(PAGE_SIZE - 1)
+        addrs = []
+        with self._lock:
+            page_index = self._page_index
+            for key in keys:
+                try:
+                    addr = _address_of(key)
+                except (TypeError, ValueError):
+                    continue  # already released
+                idx = page_index.get(addr & page_mask)
+                if idx is None:
+                    raise ValueError("key was not allocated from this arena")
+                slot = (idx << 32) + (addr - self._chunks[idx].base) // KEY_SIZE
+                addrs.append(addr)
+                key.release()
+                self._live.pop(slot, None)
+                self._free.append(slot)
+            _zero_runs(addrs)
+
+    def wipe_all(self) -> int:
+        """
+        Zero every chunk of the arena, live slots included, with one zeroization
+        call per contiguous chunk. Returns the elapsed time in nanoseconds.
+        """
+        zero = wipe_backend().zero
+        start = time.perf_counter_ns()
+        for chunk in tuple(self._chunks):
+            zero(chunk.base, chunk.size)
+        elapsed = time.perf_counter_ns() - start
+        self.last_wipe_ns = elapsed
+        if elapsed > self.max_wipe_ns:
+            self.max_wipe_ns = elapsed
+        return elapsed
+
+    def _release_live(self) -> None:
+        for view in self._live.values():
+            try:
+                view.release()
+            except BufferError:
+                pass
+        self._live.clear()
+
+    def reset(self) -> int:
+        """Wipe the arena and reclaim every slot, releasing all outstanding views."""
+        elapsed = self.wipe_all()
+        with self._lock:
+            self._release_live()
+            self._free.clear()
+            for idx in range(len(self._chunks) - 1, -1, -1):
+                slots = self._chunks[idx].size // KEY_SIZE
+                self._free.extend(range((idx << 32) + slots - 1, (idx << 32) - 1, -1))
+        return elapsed
+
+    def close(self) -> None:
+        """Wipe, unlock and unmap the arena (best-effort if views are still held)."""
+        self.wipe_all()
+        with self._lock:
+            self._release_live()
+            for chunk in self._chunks:
+                if chunk.locked:
+                    _unlock_region(chunk.base, chunk.size)
+                    chunk.locked = False
+                try:
+                    chunk.view.release()
+                    chunk.mm.close()
+                except BufferError:
+                    pass
+            self._chunks.clear()
+            self._page_index.clear()
+            self._free.clear()
+
+    def stats(self) -> dict:
+        """Report slot usage and how much of the memlock limit is in use."""
+        with self._lock:
+            mapped = sum(c.size for c in self._chunks)
+            locked = sum(c.size for c in self._chunks if c.locked)
+            report = {
+                "slots_total": mapped // KEY_SIZE,
+                "slots_used": len(self._live),
+                "bytes_mapped": mapped,
+                "bytes_locked": locked,
+                "wipe_all_last_ns": self.last_wipe_ns,
+                "wipe_all_max_ns": self.max_wipe_ns,
+            }
+        limit = memlock_limit()
+        process_locked = process_locked_bytes()
+        report["memlock_limit"] = limit
+        report["process_locked"] = process_locked
+        if limit:
+            in_use = process_locked if process_locked is not None else locked
+            report["memlock_used_fraction"] = in_use / limit
+        else:
+            report["memlock_used_fraction"] = None
+        return report
+
+
+_default_arena: Optional[SecureArena] = None
+_default_arena_lock = threading.Lock()
+
+
+def default_arena() -> SecureArena:
+    """Return the process-wide arena, creating it on first use."""
+    global _default_arena
+    with _default_arena_lock:
+        if _default_arena is None:
+            _default_arena = SecureArena()
+        return _default_arena
+
+
+_key_observer: Optional[Callable[[Iterable], None]] = None
+
+
+def set_key_observer(observer: Optional[Callable[[Iterable], None]]) -> None:
+    """Have observer(keys) called with every batch of new keys (e.g. a residue tracker)."""
+    global _key_observer
+    _key_observer = observer
+
+
+def report_keys(keys: Iterable) -> None:
+    """Pass keys generated outside generate_keys (loose bytearrays) to the observer."""
+    if _key_observer is not None:
+        _key_observer(keys)
+
+
+def generate_keys(n: int, arena: Optional[SecureArena] = None) -> list[memoryview]:
+    """
+    Generate n AES-256 keys from a single entropy draw.
+
+    Keys are allocated from the secure arena (``default_arena()`` unless one is
+    given) and returned as zero-copy 32-byte memoryviews into locked memory.
+    Release them with ``release_keys`` when done.
+    """
+    if n < 1:
+        raise ValueError("generate_keys expects n >= 1")
+    keys, runs = (arena or default_arena()).alloc_runs(n)
+    # One entropy read per contiguous run (a single run for a fresh arena).
+    with stage("entropy"):
+        for addr, length in runs:
+            _fill_random(memoryview((ctypes.c_char * length).from_address(addr)).cast("B"))
+    stats_count("keys_generated", n)
+    if _key_observer is not None:
+        _key_observer(keys)
+    return keys
+
+
+def wipe_all() -> int:
+    """
+    Emergency wipe: zero every live key in the default arena in one pass.
+
+    Lock-free and allocation-free, intended for signal handlers. Returns the
+    elapsed nanoseconds (0 if no arena was ever created).
+    """
+    arena = _default_arena
+    if arena is None:
+        return 0
+    return arena.wipe_all()
+
+
+def release_keys(keys: Iterable[memoryview], arena: Optional[SecureArena] = None) -> None:
+    """Zero keys and return their slots to the arena."""
+    with stage("wipe"):
+        (arena or default_arena()).free_many(keys)
+
+
+_session_lock = threading.Lock()
+_session_depth = 0
+_session_gc_was_enabled = False
+
+
+class SecureSession:
+    """
+    Scope in which automatic garbage collection is off and every tracked
+    buffer is owed a wipe.
+
+    A collector pass walks the whole heap, so collecting after each key made
+    throughput fall as the heap grew. Inside a session nothing is collected;
+    at exit every tracked buffer is zeroized and checked to read back as
+    zeros, and the outermost session runs a single ``gc.collect()`` before
+    restoring the collector's previous state. Sessions nest and may be
+    opened from several threads; the collector is only touched at depth 0.
+
+    Released arena views count as already wiped (the arena zeroed them).
+    """
+
+    def __init__(self) -> None:
+        self._buffers: dict[int, bytearray | memoryview] = {}
+        self._open = False
+        self.wiped = 0
+        self.unverified = 0
+
+    def track(self, buf: bytearray | memoryview) -> bytearray | memoryview:
+        """Owe buf a wipe at exit (tracking the same buffer twice is a no-op); returns buf."""
+        self._buffers[id(buf)] = buf
+        return buf
+
+    def track_many(self, bufs: Iterable[bytearray | memoryview]) -> None:
+        for buf in bufs:
+            self._buffers[id(buf)] = buf
+
+    def open(self) -> SecureSession:
+        global _session_depth, _session_gc_was_enabled
+        import gc
+
+        if self._open:
+            raise RuntimeError("secure session is already open")
+        with _session_lock:
+            if _session_depth == 0:
+                _session_gc_was_enabled = gc.isenabled()
+                gc.disable()
+            _session_depth += 1
+        self._open = True
+        return self
+
+    def close(self) -> int:
+        """Wipe and verify every tracked buffer, leave the scope; returns how many failed to verify."""
+        global _session_depth
+        import gc
+
+        if not self._open:
+            return self.unverified
+        self._open = False
+        try:
+            with stage("wipe"):
+                for buf in self._buffers.values():
+                    try:
+                        view = memoryview(buf).cast("B")
+                    except ValueError:
+                        continue  # a released arena view: zeroed when it was freed
+                    try:
+                        zeroize(view)
+                        if view != bytes(len(view)):
+                            self.unverified += 1
+                        else:
+                            self.wiped += 1
+                    finally:
+                        view.release()
+            self._buffers.clear()
+        finally:
+            with _session_lock:
+                _session_depth -= 1
+                outermost = _session_depth == 0
+                if outermost:
+                    with stage("gc"):
+                        gc.collect()
+                    if _session_gc_was_enabled:
+                        gc.enable()
+        return self.unverified
+
+    def __enter__(self) -> SecureSession:
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.close() and exc_type is None:
+            raise RuntimeError(f"{self.unverified} tracked buffer(s) did not read back as zeros")
+
+
+def secure_session() -> SecureSession:
+    """``with secure_session() as session``: see SecureSession."""
+    return SecureSession()
+
+
+KEY_LIVE = "live"
+KEY_COPIED = "copied"
+KEY_WIPED = "wiped"
+
+
+class KeyRegistry:
+    """
+    Arena keys behind opaque integer handles.
+
+    Lookup, state changes and removal are O(1) dict operations keyed by the
+    handle; key contents are never compared, so two keys with equal bytes are
+    still distinct entries and no secret is compared in variable time.
+    """
+
+    def __init__(self, arena: Optional[SecureArena] = None) -> None:
+        self._arena = arena
+        self._keys: dict[int, memoryview] = {}
+        self._states: dict[int, str] = {}
+        self._handles = count(1)
+        # Reentrant: the GUI's signal handler clears the registry and may
+        # interrupt add_many/wipe_many on the thread holding the lock.
+        self._lock = threading.RLock()
+
+    def add(self, key: memoryview) -> int:
+        return self.add_many([key])[0]
+
+    def add_many(self, keys: Iterable[memoryview]) -> list[int]:
+        with self._lock:
+            handles = []
+            for key in keys:
+                handle = next(self._handles)
+                self._keys[handle] = key
+                self._states[handle] = KEY_LIVE
+                handles.append(handle)
+            return handles
+
+    def get(self, handle: int) -> Optional[memoryview]:
+        """The key for handle, or None once it has been wiped (or was never issued)."""
+        return self._keys.get(handle)
+
+    def state(self, handle: int) -> Optional[str]:
+        return self._states.get(handle)
+
+    def mark_copied(self, handle: int) -> bool:
+        with self._lock:
+            if handle not in self._keys:
+                return False
+            self._states[handle] = KEY_COPIED
+            return True
+
+    def wipe(self, handle: int) -> bool:
+        return self.wipe_many([handle]) == 1
+
+    def wipe_many(self, handles: Iterable[int]) -> int:
+        """Zero and release the keys behind handles; returns how many were live."""
+        with self._lock:
+            keys = []
+            for handle in handles:
+                key = self._keys.pop(handle, None)
+                if key is not None:
+                    keys.append(key)
+                    self._states[handle] = KEY_WIPED
+        if keys:
+            release_keys(keys, self._arena)
+        return len(keys)
+
+    def wipe_all(self) -> int:
+        return self.wipe_many(list(self._keys))
+
+    def clear(self) -> None:
+        """Forget every handle without touching the arena (after an arena reset)."""
+        with self._lock:
+            self._keys.clear()
+            self._states.clear()
+
+    def __iter__(self) -> Iterator[int]:
+        # Snapshot, so callers may wipe while iterating.
+        return iter(list(self._keys))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, handle: object) -> bool:
+        return handle in self._keys
@@ -0,0 +1,285 @@
+"""
+Local key-issuing daemon backed by a pre-generated pool in locked memory.
+
+The pool holds arena keys (mlocked, excluded from core dumps). A refill
+thread tops it up in batches whenever it falls below the low watermark,
+until it reaches the high watermark, so a request normally just pops keys
+that already exist: no process start, entropy read or allocation on the
+request path. Every key is zeroized and its slot returned to the arena as
+soon as it has been sent; keys still pooled at shutdown are retired the
+same way.
+
+Protocol on a Unix stream socket (mode 0600, same-uid peers only where
+SO_PEERCRED is available), one request per line::
+
+    GET n      -> "OK n\\n" followed by n lines of 64 hex digits
+    STATS      -> "OK " + one JSON line of pool counters
+    QUIT       -> closes the connection
+
+Errors are answered with "ERR <reason>\\n".
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import socketserver
+import struct
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+from aes256_core import KEY_SIZE, HexEncoder, SecureArena, generate_keys, release_keys, zeroize
+from aes256_stats import count as stats_count, stage
+
+DEFAULT_LOW = 256
+DEFAULT_HIGH = 1024
+DEFAULT_BATCH = 256
+MAX_REQUEST = 4096
+
+_HEX_LEN = KEY_SIZE * 2
+_UNHEX = bytes.maketrans(b"0123456789abcdefABCDEF", bytes(range(16)) + bytes(range(10, 16)))
+
+
+class KeyPool:
+    """Thread-safe pool of arena keys kept between low and high watermarks."""
+
+    def __init__(
+        self,
+        low: int = DEFAULT_LOW,
+        high: int = DEFAULT_HIGH,
+        batch: int = DEFAULT_BATCH,
+        arena: Optional[SecureArena] = None,
+    ) -> None:
+        if not 0 <= low < high:
+            raise ValueError("pool watermarks need 0 <= low < high")
+        self.low = low
+        self.high = high
+        self.batch = max(1, batch)
+        self._arena = arena
+        self._keys: deque[memoryview] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.issued = 0
+        self.misses = 0
+        self.refills = 0
+        self._fill(high)  # start full: the first request must not wait
+        self._thread = threading.Thread(target=self._refill_loop, name="key-pool-refill", daemon=True)
+        self._thread.start()
+
+    def _fill(self, target: int) -> None:
+        while True:
+            with self._cond:
+                need = min(self.batch, target - len(self._keys))
+                if need <= 0 or self._closed:
+                    return
+            # Generate outside the lock so take() never waits on entropy.
+            keys = generate_keys(need, self._arena)
+            with self._cond:
+                if self._closed:
+                    release_keys(keys, self._arena)
+                    return
+                self._keys.extend(keys)
+
+    def _refill_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and len(self._keys) >= self.low:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                self.refills += 1
+            with stage("pool_refill"):
+                self._fill(self.high)
+
+    def take(self, n: int) -> list[memoryview]:
+        """Pop n keys; any shortfall is generated inline (counted as a miss)."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("key pool is closed")
+            k = min(n, len(self._keys))
+            keys = [self._keys.popleft() for _ in range(k)]
+            self.issued += n
+            if len(self._keys) < self.low:
+                self._cond.notify()
+        if k < n:
+            self.misses += n - k
+            keys.extend(generate_keys(n - k, self._arena))
+        return keys
+
+    def retire(self, keys: list[memoryview]) -> None:
+        """Zeroize issued keys and return their slots."""
+        release_keys(keys, self._arena)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"pooled": len(self._keys), "low": self.low, "high": self.high,
+                    "issued": self.issued, "misses": self.misses, "refills": self.refills}
+
+    def close(self) -> None:
+        """Stop refilling and retire every pooled key."""
+        with self._cond:
+            self._closed = True
+            keys = list(self._keys)
+            self._keys.clear()
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+        release_keys(keys, self._arena)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: KeyServer
+
+    def handle(self) -> None:
+        if not self.server.peer_allowed(self.request):
+            self.wfile.write(b"ERR permission denied\n")
+            return
+        # One reusable response buffer per connection, wiped after every reply.
+        buf = bytearray(len(b"OK %d\n" % MAX_REQUEST) + MAX_REQUEST * (_HEX_LEN + 1))
+        view = memoryview(buf)
+        encoder = HexEncoder()
+        try:
+            while True:
+                line = self.rfile.readline(64)
+                if not line:
+                    return
+                parts = line.split()
+                if not parts:
+                    continue
+                command = parts[0].upper()
+                if command == b"QUIT":
+                    return
+                if command == b"STATS":
+                    import json
+
+                    self.wfile.write(b"OK " + json.dumps(self.server.pool.stats()).encode() + b"\n")
+                    continue
+                if command != b"GET":
+                    self.wfile.write(b"ERR unknown command\n")
+                    continue
+                try:
+                    n = int(parts[1]) if len(parts) > 1 else 1
+                except ValueError:
+                    n = 0
+                if not 1 <= n <= MAX_REQUEST:
+                    self.wfile.write(b"ERR count must be 1..%d\n" % MAX_REQUEST)
+                    continue
+                self._send_keys(n, encoder, buf, view)
+        finally:
+            self.server.wipe(buf)
+            view.release()
+
+    def _send_keys(self, n: int, encoder: HexEncoder, buf: bytearray, view: memoryview) -> None:
+        pool = self.server.pool
+        keys = pool.take(n)
+        try:
+            with stage("encode"):
+                head = b"OK %d\n" % n
+                view[:len(head)] = head
+                pos = len(head)
+                for key in keys:
+                    pos = encoder.encode_into(key, view, pos)
+                    view[pos:pos + 1] = b"\n"
+                    pos += 1
+        finally:
+            pool.retire(keys)
+        try:
+            with stage("write"):
+                self.request.sendall(view[:pos])  # straight from the buffer, no bytes copy
+        finally:
+            self.server.wipe(view[:pos])
+        stats_count("keys_issued", n)
+
+
+class KeyServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, pool: KeyPool, wipe: Callable = zeroize) -> None:
+        self.pool = pool
+        self.wipe = wipe
+        self.path = path
+        if os.path.exists(path):
+            # Only replace a stale socket, never another kind of file.
+            import stat
+
+            if not stat.S_ISSOCK(os.lstat(path).st_mode):
+                raise FileExistsError(f"{path} exists and is not a socket")
+            os.unlink(path)
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(old_umask)
+
+    def peer_allowed(self, sock: socket.socket) -> bool:
+        """Only the daemon's own uid may take keys (Linux SO_PEERCRED)."""
+        peercred = getattr(socket, "SO_PEERCRED", None)
+        if peercred is None:
+            return True  # the 0600 socket mode still applies
+        _pid, uid, _gid = struct.unpack("3i", sock.getsockopt(socket.SOL_SOCKET, peercred, struct.calcsize("3i")))
+        return uid == os.getuid()
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def serve(
+    path: str,
+    low: int = DEFAULT_LOW,
+    high: int = DEFAULT_HIGH,
+    wipe: Callable = zeroize,
+    ready: Optional[Callable[[KeyServer], None]] = None,
+) -> None:
+    """Run the daemon until interrupted; the pool is retired on the way out."""
+    pool = KeyPool(low, high, batch=max(1, min(DEFAULT_BATCH, high - low)))
+    server = KeyServer(path, pool, wipe)
+    try:
+        if ready is not None:
+            ready(server)
+        server.serve_forever(poll_interval=0.5)
+    finally:
+        server.server_close()
+        pool.close()
+
+
+def request_keys(path: str, n: int = 1) -> list[bytearray]:
+    """Client helper: fetch n keys from a running daemon as bytearrays (wipe them after use)."""
+    if not 1 <= n <= MAX_REQUEST:
+        raise ValueError(f"count must be 1..{MAX_REQUEST}")
+    keys = []
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(b"GET %d\n" % n)
+        buf = bytearray(len(b"OK %d\n" % n) + n * (_HEX_LEN + 1))
+        view = memoryview(buf)
+        got = 0
+        try:
+            while True:
+                newline = buf.find(b"\n", 0, got)
+                if newline >= 0 and got >= newline + 1 + n * (_HEX_LEN + 1):
+                    break
+                if buf.startswith(b"ERR") and newline >= 0:
+                    raise RuntimeError(bytes(buf[4:newline]).decode(errors="replace"))
+                r = sock.recv_into(view[got:])
+                if not r:
+                    raise ConnectionError("daemon closed the connection")
+                got += r
+            pos = newline + 1
+            for _ in range(n):
+                # Decode through a nibble table into the bytearray: no str or bytes copy.
+                nibbles = buf[pos:pos + _HEX_LEN].translate(_UNHEX)
+                key = bytearray(KEY_SIZE)
+                for i in range(KEY_SIZE):
+                    key[i] = (nibbles[2 * i] << 4) | nibbles[2 * i + 1]
+                zeroize(nibbles)
+                keys.append(key)
+                pos += _HEX_LEN + 1
+        finally:
+            zeroize(buf)
+            view.release()
+    return keys
+
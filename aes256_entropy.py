@@ -0,0 +1,308 @@
+"""
+Pluggable entropy sources for key generation.
+
+* urandom   - /dev/urandom through one persistent unbuffered fd (os.urandom
+              elsewhere), read straight into the destination buffer
+* getrandom - the getrandom(2) syscall via ctypes, no fd at all
+* pool      - read-ahead pool in locked, non-dumpable memory, refilled from
+              getrandom/urandom in 64 KiB chunks; served bytes are zeroed at
+              once. Requests of half the pool or more bypass it.
+* ctr_drbg  - NIST SP 800-90A CTR_DRBG (AES-256, no derivation function)
+              seeded from the OS, or from a caller seed for reproducible,
+              deterministic output in tests and benchmarks
+
+The process-wide default is the pool; ``set_default_source`` swaps it.
+Every source detects fork: pools are discarded and OS-seeded DRBGs reseed in
+the child, so parent and child never share output.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from aes256_core import PAGE_SIZE, _address_of, _ArenaChunk, _libc, zeroize
+
+SOURCES = ("urandom", "getrandom", "pool", "ctr_drbg")
+DEFAULT_SOURCE = "pool"
+POOL_SIZE = 64 * 1024
+BLOCK_SIZE = 16
+
+# Bumped in every forked child, so sources notice a fork without a getpid()
+# syscall per request.
+_fork_generation = 0
+
+
+def _after_fork_in_child() -> None:
+    global _fork_generation
+    _fork_generation += 1
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class EntropySource(ABC):
+    name = "base"
+    deterministic = False
+
+    @abstractmethod
+    def fill(self, buf) -> None:
+        """Fill a writable buffer (bytearray, memoryview) with random bytes in place."""
+
+    def close(self) -> None:
+        pass
+
+
+class UrandomSource(EntropySource):
+    name = "urandom"
+
+    def __init__(self) -> None:
+        self._file = open("/dev/urandom", "rb", buffering=0) if os.name == "posix" else None
+
+    def fill(self, buf) -> None:
+        view = memoryview(buf).cast("B")
+        try:
+            if self._file is None:
+                view[:] = os.urandom(len(view))
+                return
+            filled = 0
+            while filled < len(view):
+                n = self._file.readinto(view[filled:])
+                if not n:
+                    raise OSError("short read from /dev/urandom")
+                filled += n
+        finally:
+            view.release()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+class GetrandomSource(EntropySource):
+    name = "getrandom"
+    _MAX_CALL = 33554431  # getrandom(2) caps a single call at 32 MiB - 1
+
+    def __init__(self) -> None:
+        libc = _libc()
+        func = getattr(libc, "getrandom", None) if libc is not None else None
+        if func is None:
+            raise OSError("getrandom(2) is not available")
+        func.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_uint]
+        func.restype = ctypes.c_ssize_t
+        self._getrandom = func
+
+    def fill(self, buf) -> None:
+        length = len(memoryview(buf).cast("B"))
+        if not length:
+            return
+        addr = _address_of(buf)
+        filled = 0
+        while filled < length:
+            n = self._getrandom(addr + filled, min(length - filled, self._MAX_CALL), 0)
+            if n < 0:
+                err = ctypes.get_errno()
+                if err == 4:  # EINTR
+                    continue
+                raise OSError(err, os.strerror(err))
+            filled += n
+
+
+class PooledSource(EntropySource):
+    name = "pool"
+
+    def __init__(self, inner: Optional[EntropySource] = None, size: int = POOL_SIZE) -> None:
+        self._inner = inner or _os_source()
+        self._chunk = _ArenaChunk(max(1, -(-size // PAGE_SIZE)))
+        self._size = self._chunk.size
+        self._zeros = bytes(self._size // 2)
+        self._pos = self._size  # empty until first use
+        self._fork_generation = _fork_generation
+        self._lock = threading.Lock()
+
+    def fill(self, buf) -> None:
+        """buf must be byte-addressed (bytearray or a format 'B' memoryview)."""
+        n = len(buf)
+        if n >= self._size // 2:
+            self._inner.fill(buf)  # bulk reads gain nothing from the pool
+            return
+        with self._lock:
+            pool = self._chunk.view
+            if self._fork_generation != _fork_generation:
+                # Forked: the inherited pool is the parent's future output.
+                zeroize(pool)
+                self._pos = self._size
+                self._fork_generation = _fork_generation
+            if self._size - self._pos < n:
+                self._inner.fill(pool)
+                self._pos = 0
+            start = self._pos
+            self._pos = end = start + n
+            buf[:] = pool[start:end]
+            # A slice store from a constant is a plain memcpy: cheaper than a
+            # zeroize() call for a 32-byte request and never elided.
+            pool[start:end] = self._zeros[:n]
+
+    def close(self) -> None:
+        zeroize(self._chunk.view)
+        self._chunk.view.release()
+        self._chunk.mm.close()
+        self._inner.close()
+
+
+def _xor_into(target: bytearray, data) -> None:
+    for i, b in enumerate(data):
+        target[i] ^= b
+
+
+class CtrDrbg(EntropySource):
+    """
+    SP 800-90A CTR_DRBG, AES-256, no derivation function (seedlen = 48 bytes).
+
+    With seed=None it is seeded (and periodically reseeded) from the OS. A
+    caller seed makes the output stream fully deterministic; seeds that are
+    not exactly 48 bytes are condensed to 48 with SHA-384.
+    """
+
+    name = "ctr_drbg"
+    SEED_LEN = 48
+    MAX_REQUEST = 1 << 16  # bytes per generate call (SP 800-90A allows 2**19 bits)
+    RESEED_INTERVAL = 1 << 20  # generate calls between reseeds
+
+    def __init__(self, seed: Optional[bytes] = None, personalization: bytes = b"") -> None:
+        if len(personalization) > self.SEED_LEN:
+            raise ValueError("personalization string is longer than seedlen")
+        # The cipher (and hashlib) load only when a DRBG is actually used.
+        from aes256_cipher import new_cipher
+
+        self._new_cipher = new_cipher
+        self.deterministic = seed is not None
+        self._key = bytearray(32)
+        self._v = bytearray(BLOCK_SIZE)
+        self._cipher = new_cipher(self._key)
+        self._lock = threading.Lock()
+        material = bytearray(self.SEED_LEN)
+        if seed is None:
+            _os_source().fill(material)
+        elif len(seed) == self.SEED_LEN:
+            material[:] = seed
+        else:
+            import hashlib
+
+            material[:] = hashlib.sha384(seed).digest()
+        _xor_into(material, personalization)
+        self._update(material)
+        zeroize(material)
+        self._reseed_counter = 1
+        self._fork_generation = _fork_generation
+
+    def _increment_v(self) -> None:
+        v = (int.from_bytes(self._v, "big") + 1) & ((1 << 128) - 1)
+        self._v[:] = v.to_bytes(BLOCK_SIZE, "big")
+
+    def _update(self, provided) -> None:
+        temp = bytearray(self.SEED_LEN)
+        for offset in range(0, self.SEED_LEN, BLOCK_SIZE):
+            self._increment_v()
+            temp[offset:offset + BLOCK_SIZE] = self._cipher.encrypt_block(self._v)
+        _xor_into(temp, provided)
+        self._cipher.wipe()
+        self._key[:] = temp[:32]
+        self._v[:] = temp[32:]
+        self._cipher = self._new_cipher(self._key)
+        zeroize(temp)
+
+    def reseed(self, additional: bytes = b"") -> None:
+        if self.deterministic:
+            raise RuntimeError("a seeded (deterministic) DRBG cannot be reseeded from the OS")
+        material = bytearray(self.SEED_LEN)
+        _os_source().fill(material)
+        _xor_into(material, additional[:self.SEED_LEN])
+        with self._lock:
+            self._update(material)
+            self._reseed_counter = 1
+        zeroize(material)
+
+    def fill(self, buf) -> None:
+        view = memoryview(buf).cast("B")
+        try:
+            if self._fork_generation != _fork_generation:
+                if self.deterministic:
+                    raise RuntimeError("deterministic DRBG used after fork would repeat the parent's output")
+                self.reseed(b"fork")
+                self._fork_generation = _fork_generation
+            for start in range(0, len(view), self.MAX_REQUEST):
+                self._generate(view[start:start + self.MAX_REQUEST])
+        finally:
+            view.release()
+
+    def _generate(self, out: memoryview) -> None:
+        if self._reseed_counter > self.RESEED_INTERVAL:
+            self.reseed()
+        with self._lock:
+            n = len(out)
+            for offset in range(0, n, BLOCK_SIZE):
+                self._increment_v()
+                block = self._cipher.encrypt_block(self._v)
+                out[offset:min(n, offset + BLOCK_SIZE)] = block[:n - offset]
+            self._update(bytes(self.SEED_LEN))
+            self._reseed_counter += 1
+
+    def close(self) -> None:
+        self._cipher.wipe()
+        zeroize(self._key)
+        zeroize(self._v)
+
+
+def _os_source() -> EntropySource:
+    try:
+        return GetrandomSource()
+    except OSError:
+        return UrandomSource()
+
+
+def make_source(name: str = DEFAULT_SOURCE, seed: Optional[bytes] = None) -> EntropySource:
+    """Build an entropy source by name; a seed selects a deterministic CTR_DRBG."""
+    if seed is not None:
+        if name not in ("ctr_drbg", DEFAULT_SOURCE):
+            raise ValueError(f"a seed only applies to ctr_drbg, not {name!r}")
+        return CtrDrbg(seed=seed)
+    if name == "urandom":
+        return UrandomSource()
+    if name == "getrandom":
+        return GetrandomSource()
+    if name == "pool":
+        return PooledSource()
+    if name == "ctr_drbg":
+        return CtrDrbg()
+    raise ValueError(f"unknown entropy source: {name!r}")
+
+
+_default_source: Optional[EntropySource] = None
+_default_lock = threading.Lock()
+
+
+def default_source() -> EntropySource:
+    global _default_source
+    with _default_lock:
+        if _default_source is None:
+            _default_source = make_source()
+        return _default_source
+
+
+def set_default_source(source: EntropySource) -> None:
+    """Install source as the process-wide default, closing the previous one."""
+    global _default_source
+    with _default_lock:
+        previous, _default_source = _default_source, source
+    if previous is not None and previous is not source:
+        previous.close()
+
+
+def fill_random(buf) -> None:
+    """Fill buf in place from the process-wide default source."""
+    default_source().fill(buf)
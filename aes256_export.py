@@ -0,0 +1,337 @@
+"""
+Headless, streaming key export for large batches.
+
+Keys flow through a generator pipeline (generate -> encode -> write) one batch
+at a time, so memory stays bounded by the batch size no matter how many keys
+are requested. Each encoded chunk is wiped right after it is written.
+
+With workers > 1, generation and encoding run in a process pool that writes
+straight into a multiprocessing.shared_memory ring; the parent only streams
+the filled slots out in order.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import sys
+from collections import deque
+from typing import TYPE_CHECKING, BinaryIO, Iterable, Iterator, Optional
+
+from aes256_core import (
+    KEY_SIZE,
+    HexEncoder,
+    SecureArena,
+    _address_of,
+    _lock_region,
+    generate_keys,
+    release_keys,
+    zeroize,
+)
+from aes256_progress import ProgressTracker
+from aes256_stats import count as stats_count, stage
+
+if TYPE_CHECKING:
+    from multiprocessing import shared_memory
+
+    from aes256_unique import KeyringIndex
+
+FORMATS = ("hex", "jsonl", "csv")
+DEFAULT_BATCH = 4096
+
+_HEX_LEN = KEY_SIZE * 2
+# Upper bound of one encoded record (jsonl with a 20-digit index).
+_MAX_RECORD = len(b'{"index": , "key": ""}\n') + 20 + _HEX_LEN
+_CSV_HEADER = b"index,key\n"
+
+
+def iter_key_batches(
+    count: int,
+    batch_size: int = DEFAULT_BATCH,
+    progress: Optional[ProgressTracker] = None,
+    unique: Optional[KeyringIndex] = None,
+) -> Iterator[list[memoryview]]:
+    """
+    Yield arena-backed key batches; each batch is released when the consumer
+    moves on. With unique, keys already in the index are regenerated first.
+    """
+    remaining = count
+    while remaining > 0:
+        n = min(batch_size, remaining)
+        keys = generate_keys(n)
+        if unique is not None:
+            unique.ensure_unique(keys)
+        if progress is not None:
+            progress.advance("generated", n)
+        try:
+            yield keys
+        finally:
+            release_keys(keys)
+        remaining -= n
+
+
+def iter_encoded_chunks(
+    batches: Iterator[list[memoryview]],
+    fmt: str = "hex",
+    batch_size: int = DEFAULT_BATCH,
+    start_index: int = 1,
+    progress: Optional[ProgressTracker] = None,
+) -> Iterator[memoryview]:
+    """
+    Encode key batches into one reusable chunk buffer and yield a view of each
+    filled chunk. The chunk is wiped before it is refilled and when the
+    pipeline ends, so no encoded key outlives its write.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format: {fmt!r}")
+    chunk = bytearray(batch_size * _MAX_RECORD + len(_CSV_HEADER))
+    view = memoryview(chunk)
+    index = start_index
+    try:
+        pos = 0
+        if fmt == "csv":
+            view[:len(_CSV_HEADER)] = _CSV_HEADER
+            pos = len(_CSV_HEADER)
+        for keys in batches:
+            with stage("encode"):
+                pos = encode_records(keys, fmt, index, view, pos)
+            index += len(keys)
+            if progress is not None:
+                progress.advance("encoded", len(keys))
+            yield view[:pos]
+            # Resumed: the consumer has written the chunk.
+            zeroize(view[:pos])
+            pos = 0
+            if progress is not None:
+                progress.advance("written", len(keys))
+    finally:
+        zeroize(chunk)
+        view.release()
+
+
+def encode_records(keys: Iterable[memoryview], fmt: str, index: int, view: memoryview, pos: int = 0) -> int:
+    """Encode keys as fmt records into view starting at pos; return the new end position."""
+    keys = list(keys)
+    n = len(keys)
+    hex_buf = bytearray(n * _HEX_LEN)
+    hex_view = memoryview(hex_buf)
+    HexEncoder().encode_many(keys, hex_buf)
+    try:
+        if fmt == "hex":
+            # Fixed-width rows: copy each hex run, then drop all newlines in one slice.
+            stride = _HEX_LEN + 1
+            for i in range(n):
+                row = pos + i * stride
+                view[row:row + _HEX_LEN] = hex_view[i * _HEX_LEN:(i + 1) * _HEX_LEN]
+            view[pos + _HEX_LEN:pos + n * stride:stride] = b"\n" * n
+            return pos + n * stride
+        for i in range(n):
+            if fmt == "jsonl":
+                prefix = b'{"index": %d, "key": "' % (index + i)
+            else:
+                prefix = b"%d," % (index + i)
+            view[pos:pos + len(prefix)] = prefix
+            pos += len(prefix)
+            view[pos:pos + _HEX_LEN] = hex_view[i * _HEX_LEN:(i + 1) * _HEX_LEN]
+            pos += _HEX_LEN
+            if fmt == "jsonl":
+                view[pos:pos + 3] = b'"}\n'
+                pos += 3
+            else:
+                view[pos:pos + 1] = b"\n"
+                pos += 1
+        return pos
+    finally:
+        zeroize(hex_buf)
+        hex_view.release()
+
+
+def open_output(path: str) -> BinaryIO:
+    """Open an unbuffered binary sink: '-' for stdout, otherwise a 0600 file (or FIFO)."""
+    if path == "-":
+        return open(sys.stdout.fileno(), "wb", buffering=0, closefd=False)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    return open(fd, "wb", buffering=0)
+
+
+def _write_all(out: BinaryIO, data: memoryview | bytes) -> int:
+    """Write data fully, handling short writes on pipes."""
+    sent = 0
+    while sent < len(data):
+        n = out.write(data[sent:])
+        if n is None:  # non-blocking sink not ready
+            continue
+        sent += n
+    return sent
+
+
+def write_chunks(out: BinaryIO, chunks: Iterator[memoryview]) -> int:
+    """Write every chunk fully; return bytes written."""
+    total = 0
+    for data in chunks:
+        with stage("write"):
+            total += _write_all(out, data)
+        data.release()
+    stats_count("bytes_written", total)
+    return total
+
+
+# ---------------------------
+# Process-pool pipeline
+# ---------------------------
+
+# multiprocessing is imported lazily: it is only needed for --workers runs.
+_active_segments: set[shared_memory.SharedMemory] = set()
+_worker_segments: dict[str, shared_memory.SharedMemory] = {}
+_worker_arena: Optional[SecureArena] = None
+
+
+def wipe_shared_segments() -> None:
+    """Zero, close and unlink every live shared-memory segment (signal-handler safe)."""
+    for shm in list(_active_segments):
+        _active_segments.discard(shm)
+        try:
+            zeroize(shm.buf)
+        except (TypeError, ValueError):
+            pass
+        try:
+            shm.close()
+        except BufferError:
+            pass  # a slot view is still exported; the mapping dies with the process
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _worker_init(entropy: Optional[str] = None) -> None:
+    global _worker_arena
+    # The parent coordinates shutdown and wipes the segment; workers just stop.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # A fresh arena: pages inherited over fork are neither locked nor ours.
+    _worker_arena = SecureArena()
+    if entropy is not None:
+        # Same source kind as the parent, but this process's own instance.
+        from aes256_entropy import make_source, set_default_source
+
+        set_default_source(make_source(entropy))
+
+
+def _worker_fill(shm_name: str, offset: int, capacity: int, fmt: str, start_index: int, n: int) -> int:
+    shm = _worker_segments.get(shm_name)
+    if shm is None:
+        from multiprocessing import shared_memory
+
+        # Pool children share the parent's resource tracker, so attaching does
+        # not take ownership; only the parent unlinks the segment.
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _worker_segments[shm_name] = shm
+    view = shm.buf[offset:offset + capacity]
+    keys = generate_keys(n, _worker_arena)
+    try:
+        return encode_records(keys, fmt, start_index, view)
+    finally:
+        release_keys(keys, _worker_arena)
+        view.release()
+
+
+def export_keys_parallel(
+    count: int,
+    out: BinaryIO,
+    fmt: str = "hex",
+    batch_size: int = DEFAULT_BATCH,
+    workers: int = 2,
+    progress: Optional[ProgressTracker] = None,
+) -> int:
+    """
+    Generate and encode count keys across a process pool, streaming results to
+    out in index order. Workers fill slots of a shared-memory ring (two slots
+    per worker); each slot is wiped after it is written and the segment is
+    wiped and unlinked on exit.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    from aes256_entropy import default_source
+
+    source = default_source()
+    if source.deterministic:
+        raise ValueError("a seeded entropy source cannot be split across worker processes")
+
+    capacity = batch_size * _MAX_RECORD
+    slots = workers * 2
+    shm = shared_memory.SharedMemory(create=True, size=slots * capacity)
+    _active_segments.add(shm)
+    _lock_region(_address_of(shm.buf), slots * capacity)
+    total = 0
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_worker_init, initargs=(source.name,))
+    try:
+        if fmt == "csv":
+            total += _write_all(out, _CSV_HEADER)
+        pending: deque = deque()
+        free_slots = deque(range(slots))
+        next_index = 1
+        while next_index <= count or pending:
+            while free_slots and next_index <= count:
+                n = min(batch_size, count - next_index + 1)
+                slot = free_slots.popleft()
+                fut = pool.submit(_worker_fill, shm.name, slot * capacity, capacity, fmt, next_index, n)
+                pending.append((slot, fut, n))
+                next_index += n
+            slot, fut, n = pending.popleft()
+            with stage("worker_wait"):
+                length = fut.result()
+            stats_count("keys_generated", n)
+            if progress is not None:
+                progress.advance("generated", n)
+                progress.advance("encoded", n)
+            data = shm.buf[slot * capacity:slot * capacity + length]
+            try:
+                with stage("write"):
+                    total += _write_all(out, data)
+                zeroize(data)
+            finally:
+                data.release()
+            free_slots.append(slot)
+            if progress is not None:
+                progress.advance("written", n)
+        pool.shutdown(wait=True)
+        stats_count("bytes_written", total)
+    except BaseException:
+        pool.shutdown(wait=True, cancel_futures=True)
+        raise
+    finally:
+        wipe_shared_segments()
+    return total
+
+
+def export_keys(
+    count: int,
+    path: str = "-",
+    fmt: str = "hex",
+    batch_size: int = DEFAULT_BATCH,
+    workers: int = 1,
+    progress: Optional[ProgressTracker] = None,
+    unique: Optional[KeyringIndex] = None,
+) -> int:
+    """Generate count keys and stream them to path in fmt; returns bytes written."""
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format: {fmt!r}")
+    if unique is not None and workers > 1:
+        # Workers generate in their own processes and never see the index.
+        raise ValueError("a uniqueness index needs workers=1")
+    batch_size = max(1, min(batch_size, count))
+    out = open_output(path)
+    try:
+        if workers > 1:
+            written = export_keys_parallel(count, out, fmt, batch_size, workers, progress)
+        else:
+            batches = iter_key_batches(count, batch_size, progress, unique)
+            written = write_chunks(out, iter_encoded_chunks(batches, fmt, batch_size, progress=progress))
+        if progress is not None:
+            progress.finish()
+        return written
+    finally:
+        out.close()
@@ -2,89 +2,72 @@
 AES-256 Hex Generator for DMR Radios – Overkill Security Edition
 """
 
-import secrets
 import sys
 import threading
-import time
-import random
-import colorama
-from colorama import Fore, Style
 import os
-import pyperclip
-import argparse
 import signal
-import subprocess
-import ctypes
-import gc
+
+from aes256_clipboard import (
+    ClipboardExpiryScheduler, ClipboardUnavailable, clipboard_backend, close_clipboard_backend,
+)
+from aes256_core import (
+    HexEncoder, generate_keys, report_keys, secure_session, set_key_observer, wipe_all, wipe_backend, zeroize,
+)
+from aes256_entropy import DEFAULT_SOURCE, SOURCES, fill_random, make_source, set_default_source
+from aes256_export import FORMATS, _write_all, export_keys, wipe_shared_segments
+from aes256_progress import DEFAULT_STAGES, terminal_progress
+from aes256_roster import ROSTER_FORMATS, provision_roster, wipe_roster_buffers
+from aes256_stats import count as stats_count, enable_stats, stage, write_stats
+from aes256_viewer import view_keys, viewer_available
+
+# Importing this module has no side effects: console, colour, clipboard and
+# signal setup all happen in main(). Optional dependencies load on first use.
 
 # ---------------------------
-# Secure primitives
+# Lazy dependencies
 # ---------------------------
 
-def secure_clipboard_clear():
-    if os.name == "nt":
-        secure_clipboard_clear_windows()
-    elif sys.platform == "darwin":
-        secure_clipboard_clear_macos()
-    else:
-        secure_clipboard_clear_linux()
-
-def secure_clipboard_clear_windows():
-    try:
-        import win32clipboard  # pywin32
-        win32clipboard.OpenClipboard()
-        try:
-            win32clipboard.EmptyClipboard()
-            win32clipboard.SetClipboardText("[CLEARED]")
-            win32clipboard.EmptyClipboard()
-        finally:
-            win32clipboard.CloseClipboard()
-    except ImportError:
-        try:
-            pyperclip.copy("")
-        except pyperclip.PyperclipException:
-            print("Clipboard clear failed (pyperclip).")
-
-def secure_clipboard_clear_macos():
-    try:
-        subprocess.run(["/usr/bin/pbcopy"], input=b"", check=True)
-    except (FileNotFoundError, subprocess.CalledProcessError):
-        try:
-            pyperclip.copy("")
-        except pyperclip.PyperclipException:
-            print("Clipboard clear failed (pyperclip).")
+_colors = None
 
-def secure_clipboard_clear_linux():
-    cleared = False
-    try:
-        subprocess.run(["xclip", "-selection", "clipboard"], input=b"", check=True)
-        subprocess.run(["xclip", "-selection", "primary"], input=b"", check=True)
-        cleared = True
-    except (FileNotFoundError, subprocess.CalledProcessError):
-        pass
+class _NoColor:
+    def __getattr__(self, _name):
+        return ""
 
-    if not cleared:
+def colors():
+    """Return colorama's (Fore, Style), initialising colorama on first use."""
+    global _colors
+    if _colors is None:
         try:
-            subprocess.run(["xsel", "--clipboard", "--clear"], check=True)
-            subprocess.run(["xsel", "--primary", "--clear"], check=True)
-            cleared = True
-        except (FileNotFoundError, subprocess.CalledProcessError):
-            pass
+            import colorama
+            colorama.init()
+            _colors = (colorama.Fore, colorama.Style)
+        except ImportError:
+            _colors = (_NoColor(), _NoColor())
+    return _colors
 
-    if not cleared:
-        try:
-            pyperclip.copy("")
-        except pyperclip.PyperclipException:
-            print("Clipboard clear failed (pyperclip).")
+# ---------------------------
+# Secure primitives
+# ---------------------------
+
+def secure_clipboard_clear():
+    """Clear the clipboard through the cached backend (probed once per process)."""
+    try:
+        clipboard_backend().clear()
+    except ClipboardUnavailable:
+        print("Clipboard clear failed (best-effort).")
 
 def generate_ephemeral_aes256_key():
     """Generate AES-256 key in ephemeral memory and return as bytearray."""
-    return bytearray(secrets.token_bytes(32))
+    key = bytearray(32)
+    fill_random(key)  # straight from the entropy engine, no intermediate bytes
+    report_keys((key,))
+    return key
 
 def secure_wipe(b: bytearray):
     """Deterministically overwrite sensitive memory (random pass + zero pass)."""
-    if not isinstance(b, bytearray):
+    if not isinstance(b, (bytearray, memoryview)):
         return
+    import secrets
     try:
         mv = memoryview(b)
         mv[:] = secrets.token_bytes(len(mv))  # random pass
@@ -100,63 +83,16 @@ def secure_wipe(b: bytearray):
 def secure_wipe_strong(b: bytearray):
     """
     Strong zeroization using OS-native functions where available.
-    - On Windows: RtlSecureZeroMemory from ntdll.dll
-    - On Linux/macOS: explicit_bzero (libc), fallback to two-pass overwrite
+    - On Windows: RtlSecureZeroMemory/RtlZeroMemory from ntdll.dll
+    - On Linux/macOS: explicit_bzero or memset_s (libc), fallback to ctypes.memset
+    The primitive is probed once and cached (see aes256_core.wipe_backend_info()).
+    Accepts a bytearray or a writable memoryview (e.g. a key from generate_keys).
     """
-    if not isinstance(b, bytearray):
-        return
-    size = len(b)
-    if size == 0:
+    if not isinstance(b, (bytearray, memoryview)):
         return
+    zeroize(b)
 
-    try:
-        addr = ctypes.addressof(ctypes.c_char.from_buffer(b))
-    except (TypeError, ValueError):
-        for i in range(len(b)):
-            b[i] = 0
-        return
-
-    if os.name == "nt":
-        try:
-            rtl_secure_zero_memory = ctypes.WinDLL("ntdll").RtlSecureZeroMemory
-            rtl_secure_zero_memory.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
-            rtl_secure_zero_memory.restype = ctypes.c_void_p
-            rtl_secure_zero_memory(addr, size)
-            return
-        except (AttributeError, OSError):
-            for i in range(len(b)):
-                b[i] = 0
-            return
-
-    # Try libc explicit_bzero or memset_s inline
-    for lib_name in ("libc.so.6", "libc.dylib", "libSystem.B.dylib"):
-        try:
-            libc = ctypes.CDLL(lib_name)
-            try:
-                explicit_bzero = libc.explicit_bzero
-                explicit_bzero.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
-                explicit_bzero.restype = None
-                explicit_bzero(addr, size)
-                return
-            except AttributeError:
-                pass
-            try:
-                memset_s = libc.memset_s
-                memset_s.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_size_t]
-                memset_s.restype = ctypes.c_int
-                res = memset_s(addr, size, 0, size)
-                if res == 0:
-                    return
-            except AttributeError:
-                pass
-        except OSError:
-            continue
-
-    # Fallback: random pass + zero pass
-    mv = memoryview(b)
-    mv[:] = secrets.token_bytes(size)
-    mv[:] = b"\x00" * size
-    del mv
+_hex_encoder = HexEncoder()
 
 def clear_console():
     try:
@@ -190,139 +126,411 @@ def wait_for_keypress():
         input("Press Enter to continue...\n")
     print()
 
-def clipboard_self_destruct(delay=30):
-    """Wipe clipboard after delay seconds."""
-    def wipe():
-        try:
-            time.sleep(delay)
-            pyperclip.copy("")
-        except pyperclip.PyperclipException:
-            pass
-    threading.Thread(target=wipe, daemon=True).start()
+_clipboard_scheduler = None
+
+def _clear_clipboard_best_effort():
+    try:
+        with stage("clipboard_clear"):
+            clipboard_backend().clear()
+    except ClipboardUnavailable:
+        pass
+
+def clipboard_scheduler():
+    """Shared clipboard expiry scheduler; its single worker thread starts on first use."""
+    global _clipboard_scheduler
+    if _clipboard_scheduler is None:
+        _clipboard_scheduler = ClipboardExpiryScheduler(_clear_clipboard_best_effort)
+    return _clipboard_scheduler
+
+def clipboard_self_destruct(delay=30, copy=None):
+    """Wipe clipboard after delay seconds; copy (if given) runs first and supersedes older expiries."""
+    return clipboard_scheduler().schedule(delay, copy=copy)
 
 def clipboard_self_destruct_blocking(delay=30):
     """Wipe clipboard after delay seconds, blocking until done."""
     print(f"Clipboard will self-destruct in {delay} seconds...")
-    try:
-        time.sleep(delay)
-        pyperclip.copy("")
-        print("Clipboard cleared.")
-    except pyperclip.PyperclipException:
-        print("Clipboard clear failed (best-effort).")
+    cleared = threading.Event()
+    clipboard_scheduler().schedule(delay, on_cleared=cleared.set)
+    cleared.wait()
+    print("Clipboard cleared.")
+
+def print_hex_from_bytes(b: bytearray, hex_buf=None):
+    """
+    Print the key as hex without creating any str copy of it.
 
-def print_hex_from_bytes(b: bytearray):
-    """Print the bytearray as hex directly without creating a permanent string."""
-    hex_parts = (f"{byte:02x}" for byte in b)
-    hex_str = ''.join(hex_parts)
-    print(f"[ {Style.BRIGHT}{Fore.LIGHTGREEN_EX}{hex_str}{Style.RESET_ALL} ]")
-    return hex_str  # for clipboard, only exists briefly
-
-def progress_bar():
-    for progress in range(101):
-        bar = '█' * (progress // 2) + '-' * (50 - progress // 2)
-        sys.stdout.write(f"{Style.BRIGHT}\r|{Fore.LIGHTMAGENTA_EX}{bar}{Fore.RESET}| {progress}%{Style.RESET_ALL}")
+    The hex is encoded into hex_buf (a reusable bytearray, allocated if not
+    given) and written straight to the raw stdout file, so the buffered layer
+    keeps no copy. The colour codes go through sys.stdout so colorama can
+    translate them on Windows. Returns hex_buf so the caller can use it briefly
+    and then wipe it.
+    """
+    if hex_buf is None or len(hex_buf) != 2 * len(b):
+        hex_buf = bytearray(2 * len(b))
+    with stage("encode"):
+        _hex_encoder.encode_into(b, hex_buf)
+    Fore, Style = colors()
+    sys.stdout.flush()
+    out = getattr(sys.stdout, "buffer", None)
+    if out is None:
+        print(f"[ {Style.BRIGHT}{Fore.LIGHTGREEN_EX}", end="")
+        print(hex_buf.decode("ascii"), end="")  # text-only stream: no byte channel
+        print(f"{Style.RESET_ALL} ]")
+        return hex_buf
+    with stage("terminal"):
+        sys.stdout.write(f"[ {Style.BRIGHT}{Fore.LIGHTGREEN_EX}")
         sys.stdout.flush()
-        time.sleep(random.uniform(0.0025, 0.01))
-    print()
+        out.flush()
+        _write_all(getattr(out, "raw", out), memoryview(hex_buf))
+        sys.stdout.write(f"{Style.RESET_ALL} ]\n")
+        sys.stdout.flush()
+    return hex_buf
+
+def page_keys(keys, delay=30):
+    """Review keys in the paged viewer; a copied key expires from the clipboard after delay seconds."""
+    def copy(hex_buf):
+        with stage("clipboard_copy"):
+            clipboard_self_destruct(delay=delay, copy=lambda: clipboard_backend().copy(hex_buf))
+    view_keys(keys, copy=copy, wipe=secure_wipe_strong)
+
+def progress_bar(total=1, stream=None, stages=DEFAULT_STAGES):
+    """
+    Terminal progress bar driven by real pipeline events, redrawn at most 20x/s.
+    Returns a ProgressTracker to feed, or None when stream is not a terminal.
+    """
+    stream = stream or sys.stdout
+    if not stream.isatty():
+        return None
+    Fore, Style = colors()
+    return terminal_progress(
+        total, stream, stages=stages,
+        style=Style.BRIGHT, bar_style=Fore.LIGHTMAGENTA_EX, reset=Style.RESET_ALL,
+    )
 
 # ---------------------------
 # Initialization
 # ---------------------------
 
-clear_console()
-colorama.init()
-
-# Detect debugger
-if sys.gettrace() is not None:
-    print("Debugger detected!")
-    sys.exit(1)
-
-# Disable core dumps (best-effort)
-try:
-    import resource
-    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
-except (ImportError, ValueError):
-    pass
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="AES-256 Hex Generator for DMR radios")
+    parser.add_argument("--count", type=int, default=8, help="Number of keys to generate")
+    parser.add_argument("--clipboard-delay", type=int, default=30, help="Clipboard self-destruct delay in seconds")
+    parser.add_argument("--output", metavar="PATH", default=None,
+                        help="Headless mode: stream keys to PATH ('-' for stdout) instead of the interactive display")
+    parser.add_argument("--format", choices=FORMATS + ("keystore",), default="hex",
+                        help="Export format for --output (default: hex; keystore = passphrase-encrypted, AES-KW wrapped)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="With --output: generate and encode across N worker processes (default: 1)")
+    parser.add_argument("--entropy", choices=SOURCES, default=DEFAULT_SOURCE,
+                        help="Entropy source (default: pool, a locked read-ahead buffer over getrandom)")
+    parser.add_argument("--seed", metavar="HEX", default=None,
+                        help="Deterministic CTR_DRBG seed for reproducible test runs. Never use for real keys")
+    parser.add_argument("--stats", nargs="?", const="-", default=None, metavar="PATH",
+                        help="Write per-stage timings and counts as JSON at exit (to PATH, default stderr)")
+    parser.add_argument("--unique-against", nargs="+", metavar="FILE", default=None,
+                        help="Keyring files of deployed keys (hex, jsonl or csv); any new key already in them is regenerated")
+    parser.add_argument("--roster", metavar="CSV", default=None,
+                        help="Provision a fleet: stream per-radio and per-talkgroup keys for a radio_id,talkgroup,alias "
+                             "roster to --output (default stdout)")
+    parser.add_argument("--roster-format", choices=ROSTER_FORMATS, default="generic",
+                        help="Output for --roster: generic CSV or an AnyTone-style key list (default: generic)")
+    parser.add_argument("--keystore-get", nargs=2, metavar=("PATH", "INDEX"), default=None,
+                        help="Decrypt and print key INDEX (1-based) from a keystore written with --format keystore")
+    parser.add_argument("--daemon", metavar="SOCKET", default=None,
+                        help="Run a key-issuing daemon on a Unix socket, serving keys from a pool in locked memory")
+    parser.add_argument("--pool-low", type=int, default=256, help="Daemon pool refill threshold (default: 256)")
+    parser.add_argument("--pool-high", type=int, default=1024, help="Daemon pool refill target (default: 1024)")
+    parser.add_argument("--no-pager", action="store_true",
+                        help="Show several keys one screen at a time instead of in the paged viewer")
+    parser.add_argument("--verify-residue", action="store_true",
+                        help="After cleanup, scan this process's memory for raw or hex remnants of the generated keys "
+                             "(Linux); exit status 3 if any are found")
+    args = parser.parse_args(argv)
+    if args.count < 1:
+        parser.error("--count must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.verify_residue and (args.workers > 1 or args.daemon is not None):
+        parser.error("--verify-residue cannot be combined with --workers or --daemon")
+    if args.daemon is not None and not 0 <= args.pool_low < args.pool_high:
+        parser.error("--pool-low must be below --pool-high")
+    if args.format == "keystore":
+        if args.output is None:
+            parser.error("--format keystore needs --output")
+        if args.workers > 1:
+            parser.error("--format keystore cannot be combined with --workers")
+    if args.keystore_get is not None:
+        try:
+            args.keystore_get = (args.keystore_get[0], int(args.keystore_get[1]))
+        except ValueError:
+            parser.error("--keystore-get INDEX must be an integer")
+    if args.roster is not None:
+        if args.workers > 1:
+            parser.error("--roster cannot be combined with --workers")
+        if args.output is None:
+            args.output = "-"
+    if args.workers > 1 and args.output is None:
+        parser.error("--workers needs --output")
+    if args.unique_against and args.workers > 1:
+        parser.error("--unique-against cannot be combined with --workers")
+    if args.seed is not None:
+        try:
+            args.seed = bytes.fromhex(args.seed)
+        except ValueError:
+            parser.error("--seed must be hex")
+        if args.entropy not in (DEFAULT_SOURCE, "ctr_drbg"):
+            parser.error("--seed only applies to --entropy ctr_drbg")
+        if args.workers > 1:
+            parser.error("--seed cannot be combined with --workers")
+    return args
+
+def _harden_process():
+    """Debugger check and core-dump suppression (best-effort)."""
+    # Detect debugger
+    if sys.gettrace() is not None:
+        print("Debugger detected!")
+        sys.exit(1)
 
-# CLI argument parsing
-parser = argparse.ArgumentParser(description="AES-256 Hex Generator for DMR radios")
-parser.add_argument("--count", type=int, default=8, help="Number of keys to generate")
-parser.add_argument("--clipboard-delay", type=int, default=30, help="Clipboard self-destruct delay in seconds")
-args = parser.parse_args()
+    # Disable core dumps (best-effort)
+    try:
+        import resource
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    except (ImportError, ValueError):
+        pass
 
 # ---------------------------
 # Main with hardened cleanup
 # ---------------------------
 
+ephemeral_keys = None
 ephemeral_key = None
+_residue_tracker = None
 ephemeral_hex = None
+_clipboard_used = False
 
 def _final_cleanup():
     """Final safety net: wipe memory and clear clipboard."""
+    # One lock-free pass over every live key, safe inside the signal handler
+    with stage("wipe_all"):
+        wipe_all()
+    wipe_shared_segments()
+    wipe_roster_buffers()
     if ephemeral_key is not None:
         secure_wipe_strong(ephemeral_key)
+    if ephemeral_hex is not None:
+        secure_wipe_strong(ephemeral_hex)
+    globals()['ephemeral_keys'] = None
     globals()['ephemeral_key'] = None
     globals()['ephemeral_hex'] = None
-    try:
+    if _clipboard_scheduler is not None:
+        # No flush: the clear below covers it, and the handler may interrupt a copy
+        _clipboard_scheduler.shutdown(flush=False)
+    if _clipboard_used:
         secure_clipboard_clear()
-    except pyperclip.PyperclipException:
-        pass
-    try:
-        colorama.deinit()
-    except RuntimeError:
-        pass
+        close_clipboard_backend()
+    if _colors is not None:
+        try:
+            import colorama
+            colorama.deinit()
+        except (ImportError, RuntimeError):
+            pass
 
 def _signal_handler(signum, _frame):
     print(f"\nSignal {signum} received, performing secure cleanup...")
     _final_cleanup()
     sys.exit(1)
 
-for _sig in (getattr(signal, "SIGINT", None), getattr(signal, "SIGTERM", None)):
-    if _sig is not None:
+def _install_signal_handlers():
+    for _sig in (getattr(signal, "SIGINT", None), getattr(signal, "SIGTERM", None)):
+        if _sig is not None:
+            try:
+                signal.signal(_sig, _signal_handler)
+            except (ValueError, OSError):
+                pass
+
+def read_passphrase(confirm=False):
+    """Keystore passphrase as a bytearray (wipe it after use): $AES256_KEYSTORE_PASSPHRASE or the terminal."""
+    text = os.environ.get("AES256_KEYSTORE_PASSPHRASE")
+    if text is None:
+        import getpass
+        text = getpass.getpass("Keystore passphrase: ")
+        if confirm and getpass.getpass("Repeat passphrase: ") != text:
+            print("Passphrases do not match.", file=sys.stderr)
+            sys.exit(2)
+    if not text:
+        print("An empty passphrase is not allowed.", file=sys.stderr)
+        sys.exit(2)
+    return bytearray(text.encode("utf-8"))
+
+def keystore_get(path, index):
+    """Write one key from a keystore to stdout as a plain hex line, then wipe it and the derived key."""
+    from aes256_keystore import Keystore, KeystoreError
+    passphrase = read_passphrase()
+    key = bytearray(32)
+    line = bytearray(2 * len(key) + 1)
+    try:
+        with Keystore(path, passphrase, wipe=secure_wipe_strong) as ks:
+            ks.read_into(index, key)
+        pos = _hex_encoder.encode_into(key, line)
+        line[pos] = 0x0A
+        # Same shape as --output -: no banner or colour, straight from the buffer
+        out = sys.stdout.buffer
+        out.write(line)
+        out.flush()
+    except (OSError, IndexError, KeystoreError) as e:
+        print(f"Cannot read keystore: {e}", file=sys.stderr)
+        sys.exit(2)
+    finally:
+        secure_wipe_strong(key)
+        secure_wipe_strong(line)
+        secure_wipe_strong(passphrase)
+
+def export_keystore_file(args, unique):
+    """Headless export into a passphrase-encrypted keystore."""
+    from aes256_keystore import export_keystore
+    passphrase = read_passphrase(confirm=True)
+    try:
+        # The scrypt-derived wrapping key is a bytearray wiped with secure_wipe_strong
+        export_keystore(args.count, args.output, passphrase, progress=progress_bar(args.count, sys.stderr),
+                        unique=unique, wipe=secure_wipe_strong)
+    finally:
+        secure_wipe_strong(passphrase)
+
+def start_residue_tracking():
+    """Record anchors of every key generated from now on, for verify_residue()."""
+    global _residue_tracker
+    from aes256_residue import ResidueTracker
+    _residue_tracker = ResidueTracker()
+    set_key_observer(_residue_tracker.record)
+
+def verify_residue():
+    """Scan process memory for key remnants after cleanup; returns the number found."""
+    from aes256_residue import format_report
+    set_key_observer(None)
+    with stage("residue_scan"):
+        hits = _residue_tracker.scan()
+    print(format_report(hits, _residue_tracker), file=sys.stderr)
+    _residue_tracker.clear()
+    return len(hits)
+
+def run_daemon(args):
+    """Serve keys over a Unix socket until SIGINT/SIGTERM."""
+    from aes256_daemon import serve
+    def ready(server):
+        print(f"Key daemon listening on {server.path} (pool {args.pool_low}-{args.pool_high})", file=sys.stderr)
+    # Every issued response buffer is wiped with secure_wipe_strong; pooled keys
+    # live in the locked arena and are zeroized as they are sent or retired
+    serve(args.daemon, args.pool_low, args.pool_high, wipe=secure_wipe_strong, ready=ready)
+
+def load_keyring_index(paths):
+    """Fingerprint index over the deployed keyring files, or None without any."""
+    if not paths:
+        return None
+    from aes256_unique import KeyringIndex
+    with stage("keyring_load"):
         try:
-            signal.signal(_sig, _signal_handler)
-        except (ValueError, OSError):
-            pass
+            return KeyringIndex.from_files(paths)
+        except OSError as e:
+            print(f"Cannot read keyring {e.filename}: {e.strerror}", file=sys.stderr)
+            sys.exit(2)
+
+def main(argv=None):
+    global ephemeral_keys, ephemeral_key, ephemeral_hex, _clipboard_used
+    args = parse_args(argv)
+    if args.stats is not None:
+        enable_stats()
+    if args.seed is not None:
+        print("WARNING: --seed makes every key reproducible. Test use only.", file=sys.stderr)
+    if args.seed is not None or args.entropy != DEFAULT_SOURCE:
+        set_default_source(make_source(args.entropy, seed=args.seed))
+    if args.verify_residue:
+        start_residue_tracking()
+
+    if args.output is None and args.daemon is None and args.keystore_get is None:
+        clear_console()
+    # Probe the zeroization backend once, before any key exists
+    wipe_backend()
+    _harden_process()
+    _install_signal_handlers()
 
-if __name__ == "__main__":
     try:
-        for _ in range(args.count):
-            # Generate ephemeral key
-            ephemeral_key = generate_ephemeral_aes256_key()
-
-            # Display banner
-            print(
-                Fore.GREEN + "♦───────⟨ " +
-                Style.BRIGHT + Fore.LIGHTGREEN_EX + "AES 256-bit Hex Generator " +
-                Style.RESET_ALL + Fore.GREEN + "⟩───────♦" +
-                Style.RESET_ALL
-            )
-
-            # Show progress bar
-            progress_bar()
-
-            # Print key and copy to clipboard
-            ephemeral_hex = print_hex_from_bytes(ephemeral_key)
+        if args.keystore_get is not None:
+            keystore_get(*args.keystore_get)
+            sys.exit(0)
+        if args.daemon is not None:
+            run_daemon(args)
+            sys.exit(0)
+        unique = load_keyring_index(args.unique_against)
+        if args.roster is not None:
+            # One key per distinct radio and talkgroup, held in the locked arena
             try:
-                pyperclip.copy(ephemeral_hex)
-            except pyperclip.PyperclipException:
-                print("Clipboard unavailable (best-effort).")
-            clipboard_self_destruct(delay=args.clipboard_delay)
-
-            # Wipe ephemeral memory immediately after use (strong wipe)
-            secure_wipe_strong(ephemeral_key)
-            ephemeral_key = None
-            ephemeral_hex = None
-
-            # Aggressive collection
-            gc.collect()
-
-            # Handle clipboard self-destruct flow
-            if args.count > 1:
-                wait_for_keypress()
-                print('\033[3J\033c')
+                provision_roster(args.roster, args.output, args.roster_format, unique=unique)
+            except (OSError, ValueError) as e:
+                print(f"Roster provisioning failed: {e}", file=sys.stderr)
+                sys.exit(2)
+            sys.exit(0)
+        if args.format == "keystore":
+            export_keystore_file(args, unique)
+            sys.exit(0)
+        if args.output is not None:
+            # Headless streaming export: no banner, progress bar, clipboard or keypress
+            export_keys(args.count, args.output, args.format, workers=args.workers,
+                        progress=progress_bar(args.count, sys.stderr), unique=unique)
+            sys.exit(0)
+
+        Fore, Style = colors()
+        _clipboard_used = True
+
+        # Collector off for the whole loop; one collection and a verified wipe at exit
+        with secure_session() as session:
+            # Generate the whole batch from a single entropy draw
+            progress = progress_bar(args.count, stages=("generated",))
+            ephemeral_keys = generate_keys(args.count)
+            if unique is not None:
+                unique.ensure_unique(ephemeral_keys)
+            if progress is not None:
+                progress.advance("generated", args.count)
+                progress.finish()
+            session.track_many(ephemeral_keys)
+            if args.count > 1 and not args.no_pager and viewer_available():
+                # Masked, paged review: only revealed rows of the visible page are decoded
+                page_keys(ephemeral_keys, delay=args.clipboard_delay)
             else:
-                clipboard_self_destruct_blocking(delay=args.clipboard_delay)
+                for ephemeral_key in ephemeral_keys:
+
+                    # Display banner
+                    print(
+                        Fore.GREEN + "♦───────⟨ " +
+                        Style.BRIGHT + Fore.LIGHTGREEN_EX + "AES 256-bit Hex Generator " +
+                        Style.RESET_ALL + Fore.GREEN + "⟩───────♦" +
+                        Style.RESET_ALL
+                    )
+
+                    # Print key and copy to clipboard
+                    ephemeral_hex = session.track(print_hex_from_bytes(ephemeral_key, ephemeral_hex))
+                    hex_buf = ephemeral_hex
+                    try:
+                        # Backends take the hex buffer as bytes: no str copy of the key
+                        with stage("clipboard_copy"):
+                            clipboard_self_destruct(delay=args.clipboard_delay,
+                                                    copy=lambda: clipboard_backend().copy(hex_buf))
+                    except ClipboardUnavailable:
+                        print("Clipboard unavailable (best-effort).")
+
+                    # Wipe ephemeral memory immediately after use (strong wipe)
+                    with stage("wipe"):
+                        secure_wipe_strong(ephemeral_key)
+                        secure_wipe_strong(ephemeral_hex)  # buffer is reused for the next key
+                    ephemeral_key = None
+                    stats_count("keys_displayed")
+
+                    # Handle clipboard self-destruct flow
+                    if args.count > 1:
+                        with stage("keypress_wait"):
+                            wait_for_keypress()
+                        print('\033[3J\033c')
+                    else:
+                        clipboard_self_destruct_blocking(delay=args.clipboard_delay)
 
     except KeyboardInterrupt:
         print("\nGoodbye!")
@@ -333,4 +541,11 @@ if __name__ == "__main__":
         _final_cleanup()
         sys.exit(1)
     finally:
-        _final_cleanup()
\ No newline at end of file
+        _final_cleanup()
+        residue = verify_residue() if args.verify_residue else 0
+        write_stats(args.stats)
+        if residue:
+            sys.exit(3)
+
+if __name__ == "__main__":
+    main()
@@ -3,237 +3,119 @@
 from __future__ import annotations
 
 import argparse
-import ctypes
 import gc
 import logging
 import os
+import queue
 import secrets
 import signal
-import shutil
 import sys
 import threading
 import time
 from dataclasses import dataclass
 from typing import Callable, Optional
 
-import pyperclip  # type: ignore
 import tkinter as tk
 from tkinter import messagebox, ttk
 
+from aes256_clipboard import ClipboardExpiryScheduler, clipboard_backend
+from aes256_core import (
+    HexEncoder,
+    KeyRegistry,
+    default_arena,
+    generate_keys,
+    report_keys,
+    secure_session,
+    set_key_observer,
+    wipe_all,
+    wipe_backend_info,
+    zeroize,
+)
+from aes256_entropy import DEFAULT_SOURCE, SOURCES, fill_random, make_source, set_default_source
+from aes256_progress import ProgressSnapshot, ProgressTracker
+from aes256_stats import count as stats_count, enable_stats, stage, write_stats
+
 _BG = "#000000"
 _RED = "#ff0000"
 _RED_DARK = "#990000"
 _BTN_TEXT = "#000000"
+_UI_TICK_MS = 16
+_UI_BUDGET_S = 0.012
 
 
-def _attempt_mlock(buf: bytearray) -> bool:
-    try:
-        length = len(buf)
-        if length == 0:
-            return False
-        if os.name == "posix":
-            libc = ctypes.CDLL("libc.so.6", use_errno=True)
-            addr = ctypes.addressof(ctypes.c_char.from_buffer(buf))
-            res = libc.mlock(ctypes.c_void_p(addr), ctypes.c_size_t(length))
-            return res == 0
-        if os.name == "nt":
-            kernel32 = ctypes.windll.kernel32
-            addr = ctypes.addressof(ctypes.c_char.from_buffer(buf))
-            res = kernel32.VirtualLock(ctypes.c_void_p(addr), ctypes.c_size_t(length))
-            return res != 0
-    except Exception:
-        return False
-
-
-def _attempt_munlock(buf: bytearray) -> bool:
-    try:
-        length = len(buf)
-        if length == 0:
-            return False
-        if os.name == "posix":
-            libc = ctypes.CDLL("libc.so.6", use_errno=True)
-            addr = ctypes.addressof(ctypes.c_char.from_buffer(buf))
-            res = libc.munlock(ctypes.c_void_p(addr), ctypes.c_size_t(length))
-            return res == 0
-        if os.name == "nt":
-            kernel32 = ctypes.windll.kernel32
-            addr = ctypes.addressof(ctypes.c_char.from_buffer(buf))
-            res = kernel32.VirtualUnlock(ctypes.c_void_p(addr), ctypes.c_size_t(length))
-            return res != 0
-    except Exception:
-        return False
-
-
-def _memset_s_available() -> Optional[ctypes.CDLL]:
-    candidates = []
-    if os.name == "posix":
-        candidates = ["libc.so.6", "libc.dylib", "libSystem.B.dylib"]
-    for lib in candidates:
-        try:
-            libc = ctypes.CDLL(lib)
-            return libc
-        except Exception:
-            continue
-    return None
-
-
-def secure_wipe_strong(buf: bytearray, passes: int = 3) -> None:
-    if not isinstance(buf, bytearray):
-        raise TypeError("secure_wipe_strong expects a bytearray")
-    length = len(buf)
-    if length == 0:
-        return
-    locked = _attempt_mlock(buf)
-    try:
-        try:
-            if os.name == "nt":
-                ntdll = ctypes.WinDLL("ntdll")
-                if hasattr(ntdll, "RtlSecureZeroMemory"):
-                    func = ntdll.RtlSecureZeroMemory
-                    func.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
-                    func.restype = ctypes.c_void_p
-                    addr = ctypes.addressof(ctypes.c_char.from_buffer(buf))
-                    func(ctypes.c_void_p(addr), ctypes.c_size_t(length))
-                    return
-        except Exception:
-            pass
-        libc = _memset_s_available()
-        if libc is not None:
-            try:
-                if hasattr(libc, "explicit_bzero"):
-                    explicit_bzero = libc.explicit_bzero
-                    explicit_bzero.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
-                    explicit_bzero.restype = None
-                    addr = ctypes.addressof(ctypes.c_char.from_buffer(buf))
-                    explicit_bzero(ctypes.c_void_p(addr), ctypes.c_size_t(length))
-                    return
-                if hasattr(libc, "memset_s"):
-                    memset_s = libc.memset_s
-                    memset_s.argtypes = [
-                        ctypes.c_void_p,
-                        ctypes.c_size_t,
-                        ctypes.c_int,
-                        ctypes.c_size_t,
-                    ]
-                    memset_s.restype = ctypes.c_int
-                    addr = ctypes.addressof(ctypes.c_char.from_buffer(buf))
-                    res = memset_s(
-                        ctypes.c_void_p(addr),
-                        ctypes.c_size_t(length),
-                        ctypes.c_int(0),
-                        ctypes.c_size_t(length),
-                    )
-                    if res == 0:
-                        return
-            except Exception:
-                pass
-        patterns = [0xFF, 0x00, 0xA5]
-        for p in range(passes):
-            pat = patterns[p % len(patterns)]
-            for i in range(length):
-                buf[i] = pat
-            time.sleep(0.001)
-        mv = memoryview(buf)
-        mv[:] = secrets.token_bytes(length)
-        mv[:] = b"\x00" * length
-        del mv
-    finally:
-        if locked:
-            _attempt_munlock(buf)
-        gc.collect()
+def secure_wipe_strong(buf: bytearray | memoryview, passes: int = 3) -> None:
+    if not isinstance(buf, (bytearray, memoryview)):
+        raise TypeError("secure_wipe_strong expects a bytearray or memoryview")
+    zeroize(buf, passes=passes)
 
 
 def generate_ephemeral_aes256_key() -> bytearray:
-    key_bytes = secrets.token_bytes(32)
-    key_buf = bytearray(key_bytes)
-    del key_bytes
-    gc.collect()
-    _attempt_mlock(key_buf)
+    key_buf = bytearray(32)
+    fill_random(key_buf)
+    report_keys((key_buf,))
     return key_buf
 
 
 @dataclass
 class ClipboardTask:
-    content: str
+    content: str | bytes | bytearray
     delay: int
     blocking: bool = False
     notify: bool = True
 
 
 def _clear_clipboard_os_specific() -> None:
-    try:
-        overwrite = secrets.token_hex(16)
+    backend = clipboard_backend()
+    with stage("clipboard_clear"):
         try:
-            pyperclip.copy(overwrite)  # type: ignore
+            backend.copy(secrets.token_hex(16))
         except Exception:
             pass
-        time.sleep(0.05)
         try:
-            pyperclip.copy("")  # type: ignore
+            backend.clear()
         except Exception:
             pass
-    except Exception:
-        pass
-    try:
-        if sys.platform.startswith("win"):
-            user32 = ctypes.windll.user32
-            if user32.OpenClipboard(None):
-                user32.EmptyClipboard()
-                user32.CloseClipboard()
-        elif sys.platform.startswith("darwin"):
-            with os.popen("pbcopy", "w") as p:
-                p.write("")
-        else:
-            if shutil.which("xclip"):
-                os.system("printf '' | xclip -selection clipboard")
-                os.system("printf '' | xclip -selection primary")
-            elif shutil.which("xsel"):
-                os.system("printf '' | xsel --clipboard --input")
-                os.system("printf '' | xsel --primary --input")
-    except Exception:
-        pass
+
+
+_clipboard_scheduler: Optional[ClipboardExpiryScheduler] = None
+
+
+def clipboard_scheduler() -> ClipboardExpiryScheduler:
+    global _clipboard_scheduler
+    if _clipboard_scheduler is None:
+        _clipboard_scheduler = ClipboardExpiryScheduler(_clear_clipboard_os_specific)
+    return _clipboard_scheduler
 
 
 def copy_to_clipboard_with_self_destruct(
     task: ClipboardTask,
     on_cleared: Optional[Callable[[], None]] = None,
     tk_root: Optional[tk.Tk] = None,
-) -> threading.Thread:
-    def worker() -> None:
-        try:
-            pyperclip.copy(task.content)  # type: ignore
-        except Exception:
+) -> Optional[int]:
+    def cleared() -> None:
+        if on_cleared is None:
             return
-        remaining = task.delay
-        while remaining > 0:
-            time.sleep(0.5)
-            remaining -= 0.5
-        _clear_clipboard_os_specific()
-        if on_cleared:
+        if tk_root is not None:
             try:
-                if tk_root is not None:
-                    try:
-                        tk_root.after(0, on_cleared)
-                    except Exception:
-                        try:
-                            on_cleared()
-                        except Exception:
-                            pass
-                else:
-                    try:
-                        on_cleared()
-                    except Exception:
-                        pass
+                tk_root.after(0, on_cleared)
+                return
             except Exception:
                 pass
-    thread = threading.Thread(target=worker, daemon=True)
-    thread.start()
-    return thread
+        try:
+            on_cleared()
+        except Exception:
+            pass
+    try:
+        return clipboard_scheduler().schedule(
+            task.delay, on_cleared=cleared, copy=lambda: clipboard_backend().copy(task.content)
+        )
+    except Exception:
+        return None
 
 
 def copy_to_clipboard_blocking(task: ClipboardTask, tk_root: Optional[tk.Tk] = None) -> None:
     try:
-        pyperclip.copy(task.content)  # type: ignore
+        clipboard_backend().copy(task.content)
     except Exception:
         return
     root = tk.Tk()
@@ -367,10 +249,11 @@ class SecureAESGui(tk.Tk):
         self._accent = _RED
         self._count = max(1, int(count))
         self._clipboard_delay = max(1, int(clipboard_delay))
-        self._generated_keys: list[bytearray] = []
-        self._clipboard_threads: list[threading.Thread] = []
-        self._key_rows: list[dict] = []
+        self._keys = KeyRegistry()
+        self._row_delay = self._clipboard_delay
+        self._ui_queue: queue.SimpleQueue = queue.SimpleQueue()
         self._build_ui()
+        self.after(_UI_TICK_MS, self._drain_ui_queue)
         self.protocol("WM_DELETE_WINDOW", self._on_close)
         if sys.gettrace() is not None:
             try:
@@ -385,7 +268,7 @@ class SecureAESGui(tk.Tk):
         frm = tk.Frame(self, bg=_BG)
         frm.pack(fill="x", padx=12, pady=6)
         tk.Label(frm, text="Count:", bg=_BG, fg=self._fg).grid(row=0, column=0, sticky="w")
-        self.count_spinner = NumericSpinner(frm, value=self._count, minval=1, maxval=100, width=6)
+        self.count_spinner = NumericSpinner(frm, value=self._count, minval=1, maxval=10000, width=6)
         self.count_spinner.grid(row=0, column=1, sticky="w", padx=(6, 0))
         tk.Label(frm, text="Clipboard delay (s):", bg=_BG, fg=self._fg).grid(row=1, column=0, sticky="w", pady=(6, 0))
         self.delay_spinner = NumericSpinner(frm, value=self._clipboard_delay, minval=1, maxval=3600, width=6)
@@ -394,6 +277,35 @@ class SecureAESGui(tk.Tk):
         gen_btn.grid(row=2, column=0, columnspan=2, pady=(12, 0))
         self.keys_frame = tk.Frame(self, bg=_BG)
         self.keys_frame.pack(fill="both", expand=True, padx=12, pady=12)
+        style = ttk.Style(self)
+        try:
+            style.theme_use("clam")
+        except Exception:
+            pass
+        style.configure("Keys.Treeview", background=_BG, fieldbackground=_BG, foreground=self._fg, borderwidth=0)
+        style.configure("Keys.Treeview.Heading", background="#220000", foreground="#ffdddd", relief="flat")
+        style.map("Keys.Treeview", background=[("selected", "#440000")], foreground=[("selected", "#ffdddd")])
+        # Treeview items are not widgets and only visible rows are drawn, so
+        # thousands of keys cost one widget and a few bytes of Tcl state each.
+        self.keys_tree = ttk.Treeview(self.keys_frame, columns=("key", "state"), show="headings",
+                                      style="Keys.Treeview", selectmode="extended", height=12)
+        self.keys_tree.heading("key", text="Key")
+        self.keys_tree.heading("state", text="State")
+        self.keys_tree.column("key", width=160, anchor="w")
+        self.keys_tree.column("state", width=120, anchor="w")
+        scroll = ttk.Scrollbar(self.keys_frame, orient="vertical", command=self.keys_tree.yview)
+        self.keys_tree.configure(yscrollcommand=scroll.set)
+        self.keys_tree.pack(side="left", fill="both", expand=True)
+        scroll.pack(side="right", fill="y")
+        self.keys_tree.bind("<Double-1>", lambda _e: self._on_show_selected())
+        actions = tk.Frame(self, bg=_BG)
+        actions.pack(fill="x", padx=12, pady=(0, 6))
+        show_btn = _make_button(actions, "Show", self._on_show_selected, bg="#330000", fg="#ffdddd", activebg="#220000")
+        show_btn.pack(side="left", padx=(0, 6))
+        copy_btn = _make_button(actions, "Copy", self._on_copy_selected, bg="#660000", fg="#ffdddd", activebg="#440000")
+        copy_btn.pack(side="left", padx=(0, 6))
+        wipe_btn = _make_button(actions, "Wipe", self._on_wipe_selected, bg="#990000", fg="#ffffff", activebg="#660000")
+        wipe_btn.pack(side="left", padx=(0, 6))
         footer = tk.Frame(self, bg=_BG)
         footer.pack(fill="x", padx=12, pady=(0, 12))
         quit_btn = _make_button(footer, "Quit", self._on_close, bg="#660000", fg="#ffdddd", activebg="#440000")
@@ -402,82 +314,111 @@ class SecureAESGui(tk.Tk):
     def _on_generate(self) -> None:
         self._wipe_all_generated_keys()
         count = max(1, self.count_spinner.get())
-        delay = max(1, self.delay_spinner.get())
+        self._row_delay = max(1, self.delay_spinner.get())
         progress = ProgressDialog(self, total=count, title="Generating keys")
         progress.show()
+        tracker = ProgressTracker(count, stages=("generated", "displayed"), max_hz=30.0)
+        tracker.subscribe(lambda snap: self._post(progress.update, snap))
+        def add_rows(keys: list[memoryview]) -> None:
+            with stage("display"):
+                for i, handle in enumerate(self._keys.add_many(keys)):
+                    self._add_key_row(handle, i)
+            tracker.advance("displayed", len(keys))
         def worker() -> None:
             try:
-                for i in range(count):
-                    key = generate_ephemeral_aes256_key()
-                    self._generated_keys.append(key)
-                    self.after(0, lambda k=key, idx=i: self._add_key_row(k, idx, delay))
-                    progress.increment()
-                    time.sleep(0.05)
+                keys = generate_keys(count)
+                tracker.advance("generated", count)
+                logger = logging.getLogger("secure_aes_gui_mono_red")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("arena: %s", default_arena().stats())
+                self._post(add_rows, keys)
             except Exception:
                 pass
             finally:
-                self.after(0, progress.close)
+                self._post(tracker.finish)
         t = threading.Thread(target=worker, daemon=True)
         t.start()
 
-    def _add_key_row(self, key: bytearray, index: int, delay: int) -> None:
-        row = tk.Frame(self.keys_frame, bg=_BG)
-        row.pack(fill="x", pady=6)
-        masked = "•" * 8
-        lbl = tk.Label(row, text=f"Key {index + 1}: {masked}", bg=_BG, fg=self._fg)
-        lbl.pack(side="left", padx=(0, 8))
-        def on_show() -> None:
-            hex_key = key.hex()
-            ShowKeyDialog(self, hex_key).show()
-        def on_copy() -> None:
-            hex_str = key.hex()
-            def on_cleared_callback() -> None:
-                try:
-                    secure_wipe_strong(key)
-                except Exception:
-                    pass
-                try:
-                    if key in self._generated_keys:
-                        self._generated_keys.remove(key)
-                except Exception:
-                    pass
-                try:
-                    lbl.config(text=f"Key {index + 1}: [wiped]")
-                except Exception:
-                    pass
-                gc.collect()
-            try:
-                thr = copy_to_clipboard_with_self_destruct(ClipboardTask(content=hex_str, delay=delay), on_cleared=on_cleared_callback, tk_root=self)
-                self._clipboard_threads.append(thr)
-            finally:
-                try:
-                    hex_str = ""
-                except Exception:
-                    pass
-                gc.collect()
-            try:
-                lbl.config(text=f"Key {index + 1}: [copied]")
-            except Exception:
-                pass
-        def on_wipe() -> None:
+    def _post(self, fn: Callable[..., None], *args) -> None:
+        # Thread-safe: workers never touch Tk, the main loop applies this on its next tick.
+        self._ui_queue.put((fn, args))
+
+    def _drain_ui_queue(self) -> None:
+        deadline = time.monotonic() + _UI_BUDGET_S
+        while time.monotonic() < deadline:
             try:
-                secure_wipe_strong(key)
-            except Exception:
-                pass
+                fn, args = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
             try:
-                if key in self._generated_keys:
-                    self._generated_keys.remove(key)
+                fn(*args)
             except Exception:
-                pass
-            lbl.config(text=f"Key {index + 1}: [wiped]")
-            gc.collect()
-        show_btn = _make_button(row, "Show", on_show, bg="#330000", fg="#ffdddd", activebg="#220000")
-        show_btn.pack(side="left", padx=(0, 6))
-        copy_btn = _make_button(row, "Copy", on_copy, bg="#660000", fg="#ffdddd", activebg="#440000")
-        copy_btn.pack(side="left", padx=(0, 6))
-        wipe_btn = _make_button(row, "Wipe", on_wipe, bg="#990000", fg="#ffffff", activebg="#660000")
-        wipe_btn.pack(side="left", padx=(0, 6))
-        self._key_rows.append({"key": key, "label": lbl, "row": row})
+                logging.getLogger("secure_aes_gui_mono_red").debug("ui event failed", exc_info=True)
+        self.after(_UI_TICK_MS, self._drain_ui_queue)
+
+    def _add_key_row(self, handle: int, index: int) -> None:
+        self.keys_tree.insert("", "end", iid=str(handle), values=(f"Key {index + 1}: " + "•" * 8, ""))
+
+    def _set_row_state(self, handle: int, state: str) -> None:
+        if self.keys_tree.exists(str(handle)):
+            self.keys_tree.set(str(handle), "state", state)
+
+    def _selected_handles(self) -> list[int]:
+        return [int(iid) for iid in self.keys_tree.selection() if int(iid) in self._keys]
+
+    def _encode_row(self, handle: int) -> Optional[bytearray]:
+        key = self._keys.get(handle)
+        if key is None:
+            return None
+        hex_buf = bytearray(2 * len(key))
+        try:
+            HexEncoder().encode_into(key, hex_buf)
+        except ValueError:
+            return None  # slot already released back to the arena
+        return hex_buf
+
+    def _on_show_selected(self) -> None:
+        handles = self._selected_handles()
+        if not handles:
+            return
+        hex_buf = self._encode_row(handles[0])
+        if hex_buf is None:
+            return
+        try:
+            dialog = ShowKeyDialog(self, hex_buf)
+        except Exception:
+            zeroize(hex_buf)
+            raise
+        # The dialog's session owns hex_buf from here and wipes it on close.
+        dialog.show()
+
+    def _on_copy_selected(self) -> None:
+        handles = self._selected_handles()
+        if not handles:
+            return
+        handle = handles[0]
+        hex_buf = self._encode_row(handle)
+        if hex_buf is None:
+            return
+        try:
+            # The backend copies synchronously, so the buffer can be wiped straight after.
+            with stage("clipboard_copy"):
+                copy_to_clipboard_with_self_destruct(ClipboardTask(content=hex_buf, delay=self._row_delay),
+                                                     on_cleared=lambda: self._post(self._wipe_rows, [handle]))
+        finally:
+            zeroize(hex_buf)
+        self._keys.mark_copied(handle)
+        stats_count("keys_copied")
+        self._set_row_state(handle, "[copied]")
+
+    def _on_wipe_selected(self) -> None:
+        self._wipe_rows(self._selected_handles())
+
+    def _wipe_rows(self, handles: list[int]) -> None:
+        live = [h for h in handles if h in self._keys]
+        self._keys.wipe_many(live)
+        for handle in live:
+            self._set_row_state(handle, "[wiped]")
 
     def _notify(self, message: str) -> None:
         win = tk.Toplevel(self)
@@ -491,21 +432,17 @@ class SecureAESGui(tk.Tk):
         self.after(2000, win.destroy)
 
     def _wipe_all_generated_keys(self) -> None:
-        for k in list(self._generated_keys):
-            try:
-                secure_wipe_strong(k)
-            except Exception:
-                pass
-        self._generated_keys.clear()
-        gc.collect()
-        for child in self.keys_frame.winfo_children():
-            child.destroy()
-        self._key_rows.clear()
+        try:
+            default_arena().reset()
+        except Exception:
+            pass
+        self._keys.clear()
+        self.keys_tree.delete(*self.keys_tree.get_children())
 
     def _register_signal_handlers(self) -> None:
         def handler(signum, frame) -> None:
             try:
-                self._wipe_all_generated_keys()
+                wipe_all()
                 _clear_clipboard_os_specific()
             finally:
                 os._exit(0)
@@ -529,6 +466,7 @@ class ProgressDialog:
         self.parent = parent
         self.total = max(1, int(total))
         self.count = 0
+        self._closed = False
         self.win = tk.Toplevel(parent)
         self.win.title(title)
         self.win.configure(bg=_BG)
@@ -550,12 +488,20 @@ class ProgressDialog:
         self.win.deiconify()
         self.parent.update_idletasks()
 
-    def increment(self) -> None:
-        self.count += 1
-        self.pb["value"] = self.count
-        self.parent.update_idletasks()
+    def update(self, snap: ProgressSnapshot) -> None:
+        """ProgressTracker subscriber; closes the dialog on the final snapshot."""
+        if self._closed:
+            return
+        self.count = snap.completed
+        self.pb["value"] = snap.completed
+        self.lbl.config(text=f"{snap.completed}/{snap.total}")
+        if snap.finished:
+            self.close()
 
     def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
         try:
             self.win.grab_release()
         except Exception:
@@ -564,7 +510,7 @@ class ProgressDialog:
 
 
 class ShowKeyDialog:
-    def __init__(self, parent: tk.Tk, hex_key: str, timeout: int = 8) -> None:
+    def __init__(self, parent: tk.Tk, hex_key: bytearray, timeout: int = 8) -> None:
         self.parent = parent
         self.hex_key = hex_key
         self.timeout = max(1, int(timeout))
@@ -581,27 +527,43 @@ class ShowKeyDialog:
             txt = tk.Text(self.win, height=2, width=80, bg=_BG, fg=_RED, font=font_spec, bd=0, highlightthickness=0)
         except Exception:
             txt = tk.Text(self.win, height=2, width=80, bg=_BG, fg=_RED, font=("Arial", 12, "bold"), bd=0, highlightthickness=0)
-        txt.insert("1.0", self.hex_key)
+        # Tk needs str; decode only at that boundary.
+        txt.insert("1.0", self.hex_key.decode("ascii"))
         txt.configure(state="disabled")
         txt.pack(padx=12, pady=(0, 8))
         self._countdown_label = tk.Label(self.win, text=f"Closing in {self.timeout}s", bg=_BG, fg=_RED)
         self._countdown_label.pack()
         self._remaining = self.timeout
+        self._after_id: Optional[str] = None
+        self._closed = False
+        # Collector off while the key is on screen; closing wipes hex_key and collects once.
+        self._session = secure_session().open()
+        self._session.track(self.hex_key)
+        self.win.protocol("WM_DELETE_WINDOW", self._close)
         self._tick()
 
+    def _close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._after_id is not None:
+            self.win.after_cancel(self._after_id)
+            self._after_id = None
+        try:
+            self.win.grab_release()
+        except Exception:
+            pass
+        self.win.destroy()
+        self._session.close()
+
     def _tick(self) -> None:
+        self._after_id = None
         self._remaining -= 1
         if self._remaining <= 0:
-            try:
-                self.win.grab_release()
-            except Exception:
-                pass
-            self.win.destroy()
-            self.hex_key = ""
-            gc.collect()
+            self._close()
             return
         self._countdown_label.config(text=f"Closing in {self._remaining}s")
-        self.win.after(1000, self._tick)
+        self._after_id = self.win.after(1000, self._tick)
 
     def show(self) -> None:
         self.win.deiconify()
@@ -613,20 +575,33 @@ def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
     parser.add_argument("--count", type=int, default=8, help="Number of keys to generate")
     parser.add_argument("--clipboard-delay", type=int, default=30, help="Clipboard self-destruct delay in seconds")
     parser.add_argument("--debug", action="store_true", help="Enable debug logging (hidden by default)")
-    return parser.parse_args(argv)
+    parser.add_argument("--entropy", choices=SOURCES, default=DEFAULT_SOURCE, help="Entropy source (default: pool)")
+    parser.add_argument("--seed", metavar="HEX", default=None,
+                        help="Deterministic CTR_DRBG seed for reproducible test runs. Never use for real keys")
+    parser.add_argument("--stats", nargs="?", const="-", default=None, metavar="PATH",
+                        help="Write per-stage timings and counts as JSON at exit (to PATH, default stderr)")
+    parser.add_argument("--verify-residue", action="store_true",
+                        help="After cleanup, scan process memory (Tk strings included) for key remnants (Linux)")
+    args = parser.parse_args(argv)
+    if args.seed is not None:
+        try:
+            args.seed = bytes.fromhex(args.seed)
+        except ValueError:
+            parser.error("--seed must be hex")
+        if args.entropy not in (DEFAULT_SOURCE, "ctr_drbg"):
+            parser.error("--seed only applies to --entropy ctr_drbg")
+    return args
 
 
-def _final_cleanup(generated_keys: Optional[list[bytearray]] = None) -> None:
+def _final_cleanup(keys: Optional[KeyRegistry] = None) -> None:
     try:
-        if generated_keys:
-            for k in generated_keys:
-                try:
-                    secure_wipe_strong(k)
-                except Exception:
-                    pass
-            generated_keys.clear()
+        wipe_all()
+        if keys is not None:
+            keys.clear()
     except Exception:
         pass
+    if _clipboard_scheduler is not None:
+        _clipboard_scheduler.shutdown(flush=False)
     try:
         _clear_clipboard_os_specific()
     except Exception:
@@ -636,12 +611,27 @@ def _final_cleanup(generated_keys: Optional[list[bytearray]] = None) -> None:
 
 def main(argv: Optional[list[str]] = None) -> None:
     args = parse_args(argv)
+    if args.stats is not None:
+        enable_stats()
+    if args.seed is not None:
+        print("WARNING: --seed makes every key reproducible. Test use only.", file=sys.stderr)
+    if args.seed is not None or args.entropy != DEFAULT_SOURCE:
+        set_default_source(make_source(args.entropy, seed=args.seed))
     if args.debug:
         logger = logging.getLogger("secure_aes_gui_mono_red")
         logger.setLevel(logging.DEBUG)
         if not logger.handlers:
             handler = logging.StreamHandler()
             logger.addHandler(handler)
+    tracker = None
+    if args.verify_residue:
+        from aes256_residue import ResidueTracker
+
+        tracker = ResidueTracker()
+        set_key_observer(tracker.record)
+    # Probe the zeroization backend once, before any key exists.
+    wipe_info = wipe_backend_info()
+    logging.getLogger("secure_aes_gui_mono_red").debug("wipe backend: %s", wipe_info)
     if sys.gettrace() is not None and not args.debug:
         try:
             root = tk.Tk()
@@ -653,7 +643,8 @@ def main(argv: Optional[list[str]] = None) -> None:
     app = SecureAESGui(count=args.count, clipboard_delay=args.clipboard_delay)
     def _signal_handler(signum, _frame):
         try:
-            _final_cleanup(app._generated_keys)
+            _final_cleanup(app._keys)
+            write_stats(args.stats)
         finally:
             os._exit(0)
     try:
@@ -661,10 +652,22 @@ def main(argv: Optional[list[str]] = None) -> None:
         signal.signal(signal.SIGTERM, _signal_handler)
     except Exception:
         pass
+    residue = 0
     try:
         app.mainloop()
     finally:
-        _final_cleanup(app._generated_keys)
+        _final_cleanup(app._keys)
+        if tracker is not None:
+            from aes256_residue import format_report
+
+            set_key_observer(None)
+            with stage("residue_scan"):
+                hits = tracker.scan()
+            print(format_report(hits, tracker), file=sys.stderr)
+            residue = len(hits)
+        write_stats(args.stats)
+    if residue:
+        sys.exit(3)
 
 
 if __name__ == "__main__":
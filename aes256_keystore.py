@@ -0,0 +1,201 @@
+"""
+Passphrase-encrypted keystore output.
+
+The passphrase is stretched once per file with scrypt into a 64-byte
+bytearray: a 32-byte key-encryption key (KEK) and a 32-byte MAC key. Every
+key is then AES-KW wrapped (RFC 3394) into a fixed 40-byte record in one
+streaming pass, so any key can be read back by index with a single pread and
+unwrap.
+
+Layout (big-endian)::
+
+    0   magic "AES256KS", version, kdf (1 = scrypt), log2(N), r, p,
+        record size, 2 reserved bytes
+    16  salt (16 bytes)
+    32  key count (u64)
+    40  HMAC-SHA256 of bytes 0..39 under the MAC key
+    72  count x 40-byte records; record i (1-based) is wrapped with the
+        AES-KW IV A6A6A6A6A6A6A6A6 xor i, binding it to its position
+
+A wrong passphrase fails the header HMAC before any record is touched.
+hashlib.scrypt returns immutable bytes; they are copied into the bytearray
+and dropped at once, and the bytearray is wiped when the writer or reader
+is done with it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import os
+import struct
+from typing import TYPE_CHECKING, Callable, Iterator, Optional
+
+from aes256_cipher import KW_DEFAULT_IV, kw_self_test, new_cipher, unwrap_into, wrap_into
+from aes256_core import KEY_SIZE, zeroize
+from aes256_export import DEFAULT_BATCH, iter_key_batches, open_output, write_chunks
+from aes256_progress import ProgressTracker
+from aes256_stats import stage
+
+if TYPE_CHECKING:
+    from aes256_unique import KeyringIndex
+
+MAGIC = b"AES256KS"
+VERSION = 1
+KDF_SCRYPT = 1
+RECORD_SIZE = KEY_SIZE + 8
+DEFAULT_LOG2_N = 17  # 128 MiB with r=8, about half a second
+DEFAULT_R = 8
+DEFAULT_P = 1
+
+_PARAMS = struct.Struct(">8sBBBBBB2x16sQ")
+_MAC_SIZE = 32
+HEADER_SIZE = _PARAMS.size + _MAC_SIZE
+
+
+class KeystoreError(ValueError):
+    pass
+
+
+def derive_keys(passphrase: bytes | bytearray, salt: bytes, log2_n: int, r: int, p: int) -> bytearray:
+    """Stretch passphrase once; returns KEK (first 32 bytes) + MAC key (last 32)."""
+    with stage("kdf"):
+        derived = bytearray(hashlib.scrypt(passphrase, salt=salt, n=1 << log2_n, r=r, p=p,
+                                           maxmem=256 * r * (1 << log2_n) + (1 << 20), dklen=64))
+    return derived
+
+
+def _header_mac(derived: bytearray, params: bytes) -> bytes:
+    mac_key = derived[KEY_SIZE:]
+    try:
+        return hmac.new(mac_key, params, hashlib.sha256).digest()
+    finally:
+        zeroize(mac_key)
+
+
+def iter_wrapped_chunks(
+    batches: Iterator[list[memoryview]],
+    cipher,
+    batch_size: int = DEFAULT_BATCH,
+    start_index: int = 1,
+    progress: Optional[ProgressTracker] = None,
+) -> Iterator[memoryview]:
+    """Wrap key batches into one reusable chunk of fixed-size records and yield each filled view."""
+    chunk = bytearray(batch_size * RECORD_SIZE)
+    view = memoryview(chunk)
+    index = start_index
+    try:
+        for keys in batches:
+            pos = 0
+            with stage("wrap"):
+                for key in keys:
+                    pos = wrap_into(cipher, key, chunk, pos, KW_DEFAULT_IV ^ index)
+                    index += 1
+            if progress is not None:
+                progress.advance("encoded", len(keys))
+            yield view[:pos]
+            if progress is not None:
+                progress.advance("written", len(keys))
+    finally:
+        zeroize(chunk)
+        view.release()
+
+
+def export_keystore(
+    count: int,
+    path: str,
+    passphrase: bytes | bytearray,
+    batch_size: int = DEFAULT_BATCH,
+    progress: Optional[ProgressTracker] = None,
+    unique: Optional[KeyringIndex] = None,
+    wipe: Callable[[bytearray], None] = zeroize,
+    log2_n: int = DEFAULT_LOG2_N,
+) -> int:
+    """Generate count keys into an encrypted keystore at path; returns bytes written."""
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    kw_self_test()
+    batch_size = max(1, min(batch_size, count))
+    salt = os.urandom(16)
+    derived = derive_keys(passphrase, salt, log2_n, DEFAULT_R, DEFAULT_P)
+    cipher = new_cipher(memoryview(derived)[:KEY_SIZE])
+    try:
+        params = _PARAMS.pack(MAGIC, VERSION, KDF_SCRYPT, log2_n, DEFAULT_R, DEFAULT_P, RECORD_SIZE, salt, count)
+        header = params + _header_mac(derived, params)
+        out = open_output(path)
+        try:
+            written = write_chunks(out, iter([memoryview(header)]))
+            batches = iter_key_batches(count, batch_size, progress, unique)
+            written += write_chunks(out, iter_wrapped_chunks(batches, cipher, batch_size, progress=progress))
+        finally:
+            out.close()
+        if progress is not None:
+            progress.finish()
+        return written
+    finally:
+        cipher.wipe()
+        wipe(derived)
+
+
+class Keystore:
+    """Random-access reader: ``read_key(i)`` unwraps record i (1-based) alone."""
+
+    def __init__(self, path: str, passphrase: bytes | bytearray,
+                 wipe: Callable[[bytearray], None] = zeroize) -> None:
+        self._wipe = wipe
+        self._fd = os.open(path, os.O_RDONLY)
+        self._derived: Optional[bytearray] = None
+        self._cipher = None
+        try:
+            header = os.pread(self._fd, HEADER_SIZE, 0)
+            if len(header) < HEADER_SIZE or not header.startswith(MAGIC):
+                raise KeystoreError(f"{path} is not an AES-256 keystore")
+            _magic, version, kdf, log2_n, r, p, record_size, salt, count = _PARAMS.unpack_from(header)
+            if version != VERSION or kdf != KDF_SCRYPT or record_size != RECORD_SIZE:
+                raise KeystoreError(f"unsupported keystore version {version} (kdf {kdf})")
+            self._derived = derive_keys(passphrase, salt, log2_n, r, p)
+            mac = _header_mac(self._derived, header[:_PARAMS.size])
+            if not hmac.compare_digest(mac, header[_PARAMS.size:]):
+                raise KeystoreError("wrong passphrase or corrupted keystore header")
+            if os.fstat(self._fd).st_size < HEADER_SIZE + count * RECORD_SIZE:
+                raise KeystoreError("keystore is truncated")
+            self.count = count
+            self._cipher = new_cipher(memoryview(self._derived)[:KEY_SIZE])
+        except BaseException:
+            self.close()
+            raise
+
+    def read_into(self, index: int, out, pos: int = 0) -> int:
+        """Unwrap key index (1-based) into out[pos:]; return the end position."""
+        if not 1 <= index <= self.count:
+            raise IndexError(f"key index {index} out of range 1..{self.count}")
+        record = os.pread(self._fd, RECORD_SIZE, HEADER_SIZE + (index - 1) * RECORD_SIZE)
+        try:
+            return unwrap_into(self._cipher, record, out, pos, KW_DEFAULT_IV ^ index)
+        except ValueError:
+            raise KeystoreError(f"record {index} failed its integrity check") from None
+
+    def read_key(self, index: int) -> bytearray:
+        key = bytearray(KEY_SIZE)
+        self.read_into(index, key)
+        return key
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self) -> None:
+        if self._cipher is not None:
+            self._cipher.wipe()
+            self._cipher = None
+        if self._derived is not None:
+            self._wipe(self._derived)
+            self._derived = None
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self) -> Keystore:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,126 @@
+"""
+Event-driven progress reporting shared by the CLI and the GUI.
+
+Pipeline stages report real events (keys generated, encoded, written, ...)
+to a ProgressTracker, which notifies subscribers at most ``max_hz`` times per
+second plus once on completion. Reporting an event is a counter update and a
+clock read, so progress costs nothing measurable when generation is fast.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, NamedTuple, Optional, TextIO
+
+DEFAULT_STAGES = ("generated", "encoded", "written")
+
+
+class ProgressSnapshot(NamedTuple):
+    total: int
+    counts: dict
+    completed: int  # count of the final stage
+    elapsed: float
+    finished: bool
+
+    @property
+    def fraction(self) -> float:
+        return min(1.0, self.completed / self.total) if self.total else 1.0
+
+
+class ProgressTracker:
+    """Counts pipeline events and pushes throttled snapshots to subscribers."""
+
+    def __init__(
+        self,
+        total: int,
+        stages: tuple[str, ...] = DEFAULT_STAGES,
+        max_hz: float = 20.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.total = max(0, int(total))
+        self.stages = stages
+        self._counts = dict.fromkeys(stages, 0)
+        self._interval = 1.0 / max_hz if max_hz > 0 else 0.0
+        self._clock = clock
+        self._start = clock()
+        self._last_emit = float("-inf")
+        self._finished = False
+        self._subscribers: list[Callable[[ProgressSnapshot], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[ProgressSnapshot], None]) -> None:
+        self._subscribers.append(callback)
+
+    def advance(self, stage: str, n: int = 1) -> None:
+        """Record n events for stage; redraw only if the throttle interval has passed."""
+        with self._lock:
+            self._counts[stage] += n
+            now = self._clock()
+            if now - self._last_emit < self._interval:
+                return
+            self._last_emit = now
+            snap = self._snapshot(now)
+        self._emit(snap)
+
+    def finish(self) -> None:
+        """Mark the run complete and always deliver a final snapshot."""
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+            snap = self._snapshot(self._clock())
+        self._emit(snap)
+
+    def snapshot(self) -> ProgressSnapshot:
+        with self._lock:
+            return self._snapshot(self._clock())
+
+    def _snapshot(self, now: float) -> ProgressSnapshot:
+        counts = dict(self._counts)
+        return ProgressSnapshot(
+            total=self.total,
+            counts=counts,
+            completed=counts[self.stages[-1]],
+            elapsed=now - self._start,
+            finished=self._finished,
+        )
+
+    def _emit(self, snap: ProgressSnapshot) -> None:
+        for callback in self._subscribers:
+            callback(snap)
+
+
+class TerminalProgressBar:
+    """Subscriber that redraws a single-line bar on a text stream."""
+
+    def __init__(self, stream: TextIO, width: int = 50, style: str = "", bar_style: str = "", reset: str = "") -> None:
+        self.stream = stream
+        self.width = width
+        self.style = style
+        self.bar_style = bar_style
+        self.reset = reset
+
+    def __call__(self, snap: ProgressSnapshot) -> None:
+        filled = int(snap.fraction * self.width)
+        bar = "█" * filled + "-" * (self.width - filled)
+        line = f"{self.style}\r|{self.bar_style}{bar}{self.reset}{self.style}| {int(snap.fraction * 100)}%"
+        if snap.total > 1:
+            line += f" ({snap.completed}/{snap.total})"
+        self.stream.write(line + self.reset)
+        if snap.finished:
+            self.stream.write("\n")
+        self.stream.flush()
+
+
+def terminal_progress(total: int, stream: TextIO, stages: tuple[str, ...] = DEFAULT_STAGES,
+                      max_hz: float = 20.0, **style) -> Optional[ProgressTracker]:
+    """Tracker with a TerminalProgressBar subscribed, or None if stream is not a terminal."""
+    try:
+        if not stream.isatty():
+            return None
+    except (AttributeError, ValueError):
+        return None
+    tracker = ProgressTracker(total, stages=stages, max_hz=max_hz)
+    tracker.subscribe(TerminalProgressBar(stream, **style))
+    return tracker
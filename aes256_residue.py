@@ -0,0 +1,224 @@
+"""
+Post-cleanup scan of the process's own memory for key remnants.
+
+A ResidueTracker records anchors for each generated key: 8-byte windows of
+the key in four encodings (raw bytes, lower- and upper-case hex, and UTF-16
+hex as Tk and the Windows clipboard hold it), one window per possible
+alignment, plus the words that follow each window so every hit is
+confirmed on 64 bits of key material. After cleanup, ``scan()`` reads every readable, writable or
+anonymous mapping listed in /proc/self/maps through /proc/self/mem and
+tests all aligned 64-bit words of each chunk against every anchor at once
+with a single C-level set intersection. The cost per byte is the same no
+matter how many keys are tracked: roughly a second per 150 MiB, with
+all-zero pages skipped by a memcmp.
+
+Anchors and memory are both mapped through a random byte permutation before
+comparison. The anchor set therefore holds no raw key fragments, and its
+own hash table (CPython stores an int's hash, which is often the int
+itself) cannot match itself. Hits inside the scanner's read buffer are
+ignored. Linux only (needs /proc/self/mem).
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import struct
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from aes256_core import PAGE_SIZE, HexEncoder, _address_of, zeroize
+
+CHUNK = 8 << 20
+DEFAULT_LIMIT = 10_000
+FORMS = ("raw", "hex", "HEX", "utf16-hex", "utf16-HEX")
+
+_SKIP_REGIONS = ("[vvar]", "[vvar_vclock]", "[vsyscall]")
+# Key bits carried per byte of each encoding.
+_BITS_PER_BYTE = {"raw": 8, "hex": 4, "HEX": 4, "utf16-hex": 2, "utf16-HEX": 2}
+
+
+class Region(NamedTuple):
+    start: int
+    end: int
+    perms: str
+    name: str
+
+
+class Residue(NamedTuple):
+    address: int
+    region: str
+    form: str
+    key: int  # position of the key in recording order
+
+
+def readable_regions(include_readonly_files: bool = False) -> list[Region]:
+    """
+    Mappings worth scanning: anonymous, heap/stack and writable mappings.
+    Read-only file mappings (code, rodata) cannot hold runtime copies.
+    """
+    regions = []
+    with open("/proc/self/maps") as fh:
+        for line in fh:
+            fields = line.split(None, 5)
+            start, end = (int(x, 16) for x in fields[0].split("-"))
+            perms = fields[1]
+            name = fields[5].strip() if len(fields) > 5 else ""
+            if "r" not in perms or name in _SKIP_REGIONS:
+                continue
+            if name and not name.startswith("[") and "w" not in perms and not include_readonly_files:
+                continue
+            regions.append(Region(start, end, perms, name or "[anon]"))
+    return regions
+
+
+class ResidueTracker:
+    """Anchors for up to limit keys, and the scan that looks for them."""
+
+    def __init__(self, limit: int = DEFAULT_LIMIT) -> None:
+        self.limit = limit
+        self.recorded = 0
+        perm = list(range(256))
+        random.SystemRandom().shuffle(perm)
+        self._perm = bytes(perm)
+        self._zero_page = self._perm[0:1] * PAGE_SIZE  # an all-zero page after permutation
+        self._anchors: dict[int, list[tuple[str, int, tuple[int, ...]]]] = {}
+        self._lower = HexEncoder()
+        self._upper = HexEncoder(upper=True)
+
+    def _add_windows(self, encoded: bytearray, form: str, step: int) -> None:
+        # One window per alignment the encoding could start at (UTF-16 text is
+        # at least 2-byte aligned). A hex window holds only 32 bits and a UTF-16
+        # one 16, so each anchor carries the following aligned words needed to
+        # confirm a 64-bit match.
+        mapped = encoded.translate(self._perm)
+        follow = 8 // _BITS_PER_BYTE[form] - 1
+        try:
+            for s in range(0, 8, step):
+                words = struct.unpack_from("<%dQ" % (follow + 1), mapped, s)
+                self._anchors.setdefault(words[0], []).append((form, self.recorded, words[1:]))
+        finally:
+            zeroize(mapped)
+
+    def record(self, keys: Iterable) -> None:
+        """Add anchors for keys (the key observer hook); keys past limit are ignored."""
+        for key in keys:
+            if self.recorded >= self.limit:
+                return
+            raw = bytearray(key)
+            hex_lower = bytearray(2 * len(raw))
+            hex_upper = bytearray(2 * len(raw))
+            wide = bytearray(4 * len(raw))
+            try:
+                self._add_windows(raw, "raw", 1)
+                self._lower.encode_into(raw, hex_lower)
+                self._upper.encode_into(raw, hex_upper)
+                self._add_windows(hex_lower, "hex", 1)
+                self._add_windows(hex_upper, "HEX", 1)
+                wide[0::2] = hex_lower
+                self._add_windows(wide, "utf16-hex", 2)
+                wide[0::2] = hex_upper
+                self._add_windows(wide, "utf16-HEX", 2)
+            finally:
+                for buf in (raw, hex_lower, hex_upper, wide):
+                    zeroize(buf)
+            self.recorded += 1
+
+    def _runs(self, mapped: bytearray, length: int) -> Iterator[tuple[int, int]]:
+        """Runs of pages in mapped[:length] that were not all zero."""
+        zero = self._zero_page
+        run = -1
+        for off in range(0, length, PAGE_SIZE):
+            if mapped.startswith(zero, off, off + PAGE_SIZE):
+                if run >= 0:
+                    yield run, off
+                    run = -1
+            elif run < 0:
+                run = off
+        if run >= 0:
+            yield run, length
+
+    def scan(self, regions: Optional[list[Region]] = None) -> list[Residue]:
+        """Scan regions (default: readable_regions()) and return every anchor hit."""
+        if not self._anchors:
+            return []
+        regions = readable_regions() if regions is None else regions
+        anchors = set(self._anchors)
+        buf = bytearray(CHUNK)
+        view = memoryview(buf)
+        skip_start = _address_of(buf)
+        skip_end = skip_start + len(buf)
+        probe = bytearray(8)
+        follow = bytearray(8 * 3)
+        follow_view = memoryview(follow)
+        hits: list[Residue] = []
+        fd = os.open("/proc/self/mem", os.O_RDONLY)
+        try:
+            for region in regions:
+                for base in range(region.start, region.end, CHUNK):
+                    size = min(CHUNK, region.end - base)
+                    try:
+                        n = os.preadv(fd, [view[:size]], base)
+                    except OSError:
+                        break  # unreadable (guard page, device mapping)
+                    n -= n % 8
+                    mapped = buf.translate(self._perm)  # whole buffer: a slice would be an unwiped copy
+                    mapped_view = memoryview(mapped)
+                    try:
+                        for a, b in self._runs(mapped, n):
+                            found = anchors.intersection(mapped_view[a:b].cast("Q"))
+                            for word in found:
+                                struct.pack_into("<Q", probe, 0, word)
+                                pos = mapped.find(probe, a, b)
+                                while pos >= 0:
+                                    addr = base + pos
+                                    if pos % 8 == 0 and not skip_start <= addr < skip_end:
+                                        hits.extend(self._confirm(fd, addr, word, follow, follow_view, region.name))
+                                    pos = mapped.find(probe, pos + 1, b)
+                    finally:
+                        mapped_view.release()
+                        zeroize(mapped)
+        finally:
+            os.close(fd)
+            zeroize(buf)
+            zeroize(probe)
+            zeroize(follow)
+            view.release()
+            follow_view.release()
+        return hits
+
+    def _confirm(self, fd: int, addr: int, word: int, follow: bytearray, follow_view: memoryview,
+                 region: str) -> Iterator[Residue]:
+        """Check the words after an anchor hit (read afresh: they may lie past the chunk)."""
+        for form, key, expected in self._anchors[word]:
+            if not expected:
+                yield Residue(addr, region, form, key)
+                continue
+            size = 8 * len(expected)
+            try:
+                if os.preadv(fd, [follow_view[:size]], addr + 8) < size:
+                    continue
+            except OSError:
+                continue
+            mapped = follow.translate(self._perm)
+            try:
+                if struct.unpack_from("<%dQ" % len(expected), mapped) == expected:
+                    yield Residue(addr, region, form, key)
+            finally:
+                zeroize(mapped)
+                zeroize(follow)
+
+    def clear(self) -> None:
+        self._anchors.clear()
+        self.recorded = 0
+
+
+def format_report(hits: list[Residue], tracker: ResidueTracker) -> str:
+    if not hits:
+        return f"Residue scan: clean ({tracker.recorded} keys checked)."
+    lines = [f"Residue scan: {len(hits)} remnant(s) of {len({h.key for h in hits})} key(s) "
+             f"out of {tracker.recorded} checked:"]
+    for h in sorted(hits)[:50]:
+        lines.append(f"  0x{h.address:x} {h.form:10} key #{h.key + 1} in {h.region}")
+    if len(hits) > 50:
+        lines.append(f"  ... {len(hits) - 50} more")
+    return "\n".join(lines)
@@ -0,0 +1,211 @@
+"""
+Streaming fleet provisioning from a radio roster.
+
+A roster is a CSV of (radio_id, talkgroup, alias) rows, with or without a
+header. It is read one row at a time and each row is encoded straight into a
+reusable output chunk that is wiped as soon as it is written. One key per
+distinct radio and one per distinct talkgroup are kept in the locked arena
+until the run ends, so a radio listed in several talkgroups gets the same
+radio key on every row; nothing else grows with the roster.
+
+Output formats:
+
+* generic - ``radio_id,talkgroup,alias,radio_key,talkgroup_key`` per roster
+            row, with the radio's key and the shared talkgroup key
+* anytone - AnyTone CPS style AES key list (``"No.","Key ID","Key"``,
+            quoted, upper-case hex, CRLF): one entry per talkgroup, keyed by
+            talkgroup ID. Per-radio keys do not apply to a shared key list
+            and are not generated.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterable, Iterator, NamedTuple, Optional
+
+from aes256_core import KEY_SIZE, HexEncoder, generate_keys, release_keys, zeroize
+from aes256_export import open_output, write_chunks
+from aes256_stats import count as stats_count, stage
+
+if TYPE_CHECKING:
+    from aes256_unique import KeyringIndex
+
+ROSTER_FORMATS = ("generic", "anytone")
+CHUNK_SIZE = 64 * 1024
+MAX_DMR_ID = 16776415  # 24-bit DMR IDs; the top of the range is reserved
+
+_HEX_LEN = KEY_SIZE * 2
+_GENERIC_HEADER = b"radio_id,talkgroup,alias,radio_key,talkgroup_key\n"
+_ANYTONE_HEADER = b'"No.","Key ID","Key"\r\n'
+_COLUMN_NAMES = {
+    "radio_id": ("radioid", "radio", "id", "dmrid"),
+    "talkgroup": ("talkgroup", "tg", "tgid", "groupid", "talkgroupid"),
+    "alias": ("alias", "name", "callsign"),
+}
+
+
+class RosterEntry(NamedTuple):
+    line: int
+    radio_id: int
+    talkgroup: int
+    alias: str
+
+
+def _dmr_id(value: str, what: str, line: int) -> int:
+    value = value.strip()
+    if not value.isdigit() or not 1 <= int(value) <= MAX_DMR_ID:
+        raise ValueError(f"roster line {line}: invalid {what} {value!r}")
+    return int(value)
+
+
+def _column_map(header: list[str]) -> tuple[int, int, Optional[int]]:
+    names = ["".join(c for c in h.lower() if c.isalnum()) for h in header]
+    found = {}
+    for field, aliases in _COLUMN_NAMES.items():
+        for alias in aliases:
+            if alias in names:
+                found[field] = names.index(alias)
+                break
+    if "radio_id" not in found or "talkgroup" not in found:
+        raise ValueError("roster header needs radio_id and talkgroup columns")
+    return found["radio_id"], found["talkgroup"], found.get("alias")
+
+
+def iter_roster(path: str) -> Iterator[RosterEntry]:
+    """
+    Stream roster rows. A first row that does not start with a number is a
+    header naming the columns; otherwise columns are radio_id, talkgroup, alias.
+    """
+    import csv  # loaded only for --roster runs
+
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        reader = csv.reader(fh)
+        columns: Optional[tuple[int, int, Optional[int]]] = None
+        for row in reader:
+            line = reader.line_num
+            if not row or not "".join(row).strip() or row[0].lstrip().startswith("#"):
+                continue
+            if columns is None:
+                if row[0].strip().isdigit():
+                    columns = (0, 1, 2)
+                else:
+                    columns = _column_map(row)
+                    continue
+            radio_col, tg_col, alias_col = columns
+            if len(row) <= max(radio_col, tg_col):
+                raise ValueError(f"roster line {line}: expected radio_id and talkgroup")
+            alias = row[alias_col].strip() if alias_col is not None and alias_col < len(row) else ""
+            yield RosterEntry(line, _dmr_id(row[radio_col], "radio ID", line),
+                              _dmr_id(row[tg_col], "talkgroup", line), alias)
+
+
+def _csv_field(text: str) -> bytes:
+    data = text.encode("utf-8")
+    if any(c in data for c in b',"\r\n'):
+        data = b'"' + data.replace(b'"', b'""') + b'"'
+    return data
+
+
+# Output chunks in flight, wiped by wipe_roster_buffers() on a signal.
+_live_buffers: dict[int, bytearray] = {}
+
+
+def wipe_roster_buffers() -> None:
+    """Zero every live roster output chunk (signal-handler safe)."""
+    for buf in list(_live_buffers.values()):
+        zeroize(buf)
+
+
+def iter_roster_chunks(
+    entries: Iterable[RosterEntry],
+    fmt: str = "generic",
+    unique: Optional[KeyringIndex] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[memoryview]:
+    """
+    Encode roster entries into one reusable chunk and yield each filled view.
+
+    Radio and talkgroup keys are drawn once per distinct ID, live in the
+    arena and are released when the generator ends. The chunk is wiped after
+    every write and at the end.
+    """
+    if fmt not in ROSTER_FORMATS:
+        raise ValueError(f"unknown roster format: {fmt!r}")
+    upper = fmt == "anytone"
+    encoder = HexEncoder(upper=upper)
+    chunk = bytearray(chunk_size)
+    view = memoryview(chunk)
+    _live_buffers[id(chunk)] = chunk
+    talkgroup_keys: dict[int, memoryview] = {}
+    radio_keys: dict[int, memoryview] = {}
+    rows = 0
+    try:
+        header = _ANYTONE_HEADER if upper else _GENERIC_HEADER
+        view[:len(header)] = header
+        pos = len(header)
+        for entry in entries:
+            tg_key = talkgroup_keys.get(entry.talkgroup)
+            if tg_key is None:
+                tg_key = talkgroup_keys[entry.talkgroup] = generate_keys(1)[0]
+                if unique is not None:
+                    unique.ensure_unique([tg_key])
+            elif upper:
+                continue  # the talkgroup is already in the key list
+            if upper:
+                prefix = b'"%d","%d","' % (len(talkgroup_keys), entry.talkgroup)
+                suffix = b'"\r\n'
+                need = len(prefix) + _HEX_LEN + len(suffix)
+            else:
+                prefix = b"%d,%d,%s," % (entry.radio_id, entry.talkgroup, _csv_field(entry.alias))
+                need = len(prefix) + 2 * _HEX_LEN + 2
+            if need > chunk_size:
+                raise ValueError(f"roster line {entry.line}: row longer than the output chunk")
+            if pos + need > chunk_size:
+                yield view[:pos]
+                zeroize(view[:pos])
+                pos = 0
+            with stage("encode"):
+                view[pos:pos + len(prefix)] = prefix
+                pos += len(prefix)
+                if upper:
+                    pos = encoder.encode_into(tg_key, view, pos)
+                    view[pos:pos + len(suffix)] = suffix
+                    pos += len(suffix)
+                else:
+                    radio_key = radio_keys.get(entry.radio_id)
+                    if radio_key is None:
+                        radio_key = radio_keys[entry.radio_id] = generate_keys(1)[0]
+                        if unique is not None:
+                            unique.ensure_unique([radio_key])
+                    pos = encoder.encode_into(radio_key, view, pos)
+                    view[pos:pos + 1] = b","
+                    pos = encoder.encode_into(tg_key, view, pos + 1)
+                    view[pos:pos + 1] = b"\n"
+                    pos += 1
+            rows += 1
+        if pos:
+            yield view[:pos]
+    finally:
+        release_keys(talkgroup_keys.values())
+        release_keys(radio_keys.values())
+        zeroize(chunk)
+        _live_buffers.pop(id(chunk), None)
+        view.release()
+        stats_count("roster_rows", rows)
+        stats_count("talkgroup_keys", len(talkgroup_keys))
+        stats_count("radio_keys", len(radio_keys))
+
+
+def provision_roster(
+    roster_path: str,
+    path: str = "-",
+    fmt: str = "generic",
+    unique: Optional[KeyringIndex] = None,
+) -> int:
+    """Stream key assignments for every roster row to path; returns bytes written."""
+    if fmt not in ROSTER_FORMATS:
+        raise ValueError(f"unknown roster format: {fmt!r}")
+    out = open_output(path)
+    try:
+        return write_chunks(out, iter_roster_chunks(iter_roster(roster_path), fmt, unique))
+    finally:
+        out.close()
@@ -0,0 +1,176 @@
+"""
+Per-stage timing instrumentation for the CLI, the GUI and the export pipeline.
+
+Hot paths wrap each stage in ``with stage("entropy"):`` and bump counters
+with ``count("keys", n)``. While stats are disabled (the default) ``stage``
+returns a shared no-op context manager and ``count`` returns immediately, so
+the hooks cost one attribute check. When enabled, each stage keeps a count,
+total/min/max and a log2 histogram of monotonic_ns durations.
+
+Only stage names, durations and counts are recorded, never key material.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from typing import Callable, Optional
+
+_BUCKETS = 64  # bucket b holds durations in [2**(b-1), 2**b) ns
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class StageStats:
+    __slots__ = ("count", "total_ns", "min_ns", "max_ns", "histogram")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+        self.histogram = [0] * _BUCKETS
+
+    def add(self, ns: int) -> None:
+        if self.count == 0 or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.count += 1
+        self.total_ns += ns
+        self.histogram[min(ns.bit_length(), _BUCKETS - 1)] += 1
+
+    def percentile_ns(self, p: float) -> int:
+        """Upper bound of the histogram bucket holding the p-th percentile."""
+        rank = max(1, int(round(p / 100 * self.count)))
+        seen = 0
+        for bucket, n in enumerate(self.histogram):
+            seen += n
+            if seen >= rank:
+                return min((1 << bucket) - 1 if bucket else 0, self.max_ns)
+        return self.max_ns
+
+    def report(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ns": self.total_ns,
+            "mean_ns": self.total_ns // self.count if self.count else 0,
+            "min_ns": self.min_ns,
+            "max_ns": self.max_ns,
+            "p50_ns": self.percentile_ns(50),
+            "p99_ns": self.percentile_ns(99),
+            # Keyed by bucket upper bound, non-empty buckets only.
+            "histogram_ns": {str((1 << b) - 1 if b else 0): n for b, n in enumerate(self.histogram) if n},
+        }
+
+
+class _Stage:
+    __slots__ = ("_stats", "_name", "_start")
+
+    def __init__(self, stats: Stats, name: str) -> None:
+        self._stats = stats
+        self._name = name
+
+    def __enter__(self) -> None:
+        self._start = self._stats.clock()
+
+    def __exit__(self, *exc) -> bool:
+        self._stats.record(self._name, self._stats.clock() - self._start)
+        return False
+
+
+class Stats:
+    """Stage timings and counters; a no-op until enabled."""
+
+    def __init__(self, enabled: bool = False, clock: Callable[[], int] = time.monotonic_ns) -> None:
+        self.enabled = enabled
+        self.clock = clock
+        self._start = clock()
+        self._stages: dict[str, StageStats] = {}
+        self._counters: dict[str, int] = {}
+        # Stages are also recorded from the clipboard scheduler and GUI worker threads.
+        # Reentrant: the CLI's signal handler records a stage and may interrupt
+        # record() on the thread already holding the lock.
+        self._lock = threading.RLock()
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def record(self, name: str, ns: int) -> None:
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = StageStats()
+            stats.add(ns)
+
+    def count(self, name: str, n: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                "wall_ns": self.clock() - self._start,
+                "stages": {name: s.report() for name, s in sorted(self._stages.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def write(self, path: str = "-") -> None:
+        """Write the JSON report to path ('-' for stderr, keeping stdout clean for key output)."""
+        import json
+
+        text = json.dumps(self.report(), indent=2) + "\n"
+        if path == "-":
+            sys.stderr.write(text)
+            sys.stderr.flush()
+        else:
+            with open(path, "w") as fh:
+                fh.write(text)
+
+
+_stats = Stats()
+
+
+def default_stats() -> Stats:
+    return _stats
+
+
+def enable_stats() -> Stats:
+    """Start recording into the process-wide Stats (the wall clock starts now)."""
+    global _stats
+    if not _stats.enabled:
+        _stats = Stats(enabled=True)
+    return _stats
+
+
+def stage(name: str):
+    """Context manager timing one stage in the process-wide Stats."""
+    if not _stats.enabled:
+        return _NULL_STAGE
+    return _Stage(_stats, name)
+
+
+def count(name: str, n: int = 1) -> None:
+    _stats.count(name, n)
+
+
+def write_stats(path: Optional[str]) -> None:
+    """Emit the report if stats are enabled and a destination was requested."""
+    if path is not None and _stats.enabled:
+        _stats.write(path)
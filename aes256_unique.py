@@ -0,0 +1,210 @@
+"""
+Uniqueness check of new keys against deployed keyring files.
+
+Every 64-hex-digit token in the keyring files (hex, jsonl or csv exports, or
+any text with one key per line) is reduced to a keyed 8-byte BLAKE2b
+fingerprint of its lowercase hex. The fingerprints are kept in a sorted
+array('Q') with a Bloom filter in front: about 9.5 bytes per deployed key,
+and a new key costs k bit probes, plus a binary search only on a Bloom hit.
+Keys issued during the run are kept packed as well, in sorted array('Q')
+buckets by their top byte: about 8.5 bytes per issued key, with an insert
+that moves only its own bucket.
+
+The fingerprint key is random per process, so fingerprints mean nothing
+outside it. A fingerprint match is treated as a collision and the new key is
+regenerated; with 64-bit fingerprints a false match is ~n / 2**64 and only
+costs a redraw.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from array import array
+from bisect import bisect_left
+from itertools import chain
+from typing import Iterable, Iterator, Optional
+
+from aes256_core import KEY_SIZE, HexEncoder, _fill_random, zeroize
+from aes256_stats import count as stats_count, stage
+
+_HEX_TOKEN = re.compile(rb"(?<![0-9a-f])[0-9a-f]{64}(?![0-9a-f])")
+_CHUNK = 1 << 20
+_BLOOM_BITS_PER_KEY = 12
+_BLOOM_HASHES = 7
+_BUCKET_SHIFT = 56  # 256 buckets by the top fingerprint byte
+
+
+def _fingerprint(salt: bytes, hex_key) -> int:
+    return int.from_bytes(hashlib.blake2b(hex_key, key=salt, digest_size=8).digest(), "little")
+
+
+def iter_keyring_fingerprints(path: str, salt: bytes) -> Iterator[int]:
+    """
+    Stream fingerprints of every hex key in path without loading the file.
+
+    The file is read in 1 MiB chunks cut at the last newline; each chunk and
+    its lowercase copy are wiped once scanned.
+    """
+    buf = bytearray(_CHUNK)
+    view = memoryview(buf)
+    filled = 0
+    try:
+        with open(path, "rb", buffering=0) as fh:
+            while True:
+                n = fh.readinto(view[filled:])
+                filled += n
+                if n == 0:
+                    end = filled
+                else:
+                    end = buf.rfind(b"\n", 0, filled) + 1
+                    if end == 0:
+                        if filled < len(buf):
+                            continue
+                        end = filled  # a 1 MiB line: scan it whole
+                if end:
+                    segment = buf[:end]
+                    lowered = segment.lower()
+                    zeroize(segment)
+                    low_view = memoryview(lowered)
+                    try:
+                        for match in _HEX_TOKEN.finditer(lowered):
+                            yield _fingerprint(salt, low_view[match.start():match.end()])
+                    finally:
+                        low_view.release()
+                        zeroize(lowered)
+                    view[:filled - end] = view[end:filled]
+                    zeroize(view[filled - end:filled])
+                    filled -= end
+                if n == 0:
+                    return
+    finally:
+        zeroize(buf)
+        view.release()
+
+
+class KeyringIndex:
+    """Bloom filter + sorted fingerprint array over deployed keys; issued keys join packed buckets."""
+
+    def __init__(self, fingerprints: Iterable[int] = (), salt: Optional[bytes] = None) -> None:
+        self.salt = salt or os.urandom(16)
+        self._sorted = self._sort_unique(fingerprints)
+        bits = max(64, len(self._sorted) * _BLOOM_BITS_PER_KEY)
+        self._mask = (1 << (bits - 1).bit_length()) - 1  # power-of-two bit count
+        self._bloom = bytearray((self._mask + 1) // 8)
+        for fp in self._sorted:
+            self._bloom_add(fp)
+        self._issued: list[Optional[array]] = [None] * (1 << (64 - _BUCKET_SHIFT))
+        self._issued_count = 0
+        self._encoder = HexEncoder()
+        self._hex = bytearray(2 * KEY_SIZE)
+
+    @staticmethod
+    def _sort_unique(fingerprints: Iterable[int]) -> array:
+        """
+        Sorted, deduplicated array('Q') built at about 8 bytes per fingerprint.
+
+        Fingerprints are streamed into packed buckets by their top byte (they
+        are uniform, so buckets stay even); each bucket is then sorted on its
+        own and appended to the result, and freed before the next one. Only
+        one bucket at a time ever exists as Python ints.
+        """
+        buckets = [array("Q") for _ in range(1 << (64 - _BUCKET_SHIFT))]
+        for fp in fingerprints:
+            buckets[fp >> _BUCKET_SHIFT].append(fp)
+        result = array("Q")
+        for i, bucket in enumerate(buckets):
+            if bucket:
+                result.extend(sorted(set(bucket)))
+            buckets[i] = None
+        return result
+
+    @classmethod
+    def from_files(cls, paths: Iterable[str]) -> KeyringIndex:
+        salt = os.urandom(16)
+        return cls(chain.from_iterable(iter_keyring_fingerprints(path, salt) for path in paths), salt)
+
+    def _probes(self, fp: int) -> Iterator[int]:
+        # Kirsch-Mitzenmacher double hashing from the two 32-bit halves.
+        h1, h2 = fp & 0xFFFFFFFF, (fp >> 32) | 1
+        mask = self._mask
+        for i in range(_BLOOM_HASHES):
+            yield (h1 + i * h2) & mask
+
+    def _bloom_add(self, fp: int) -> None:
+        bloom = self._bloom
+        for bit in self._probes(fp):
+            bloom[bit >> 3] |= 1 << (bit & 7)
+
+    def _issued_contains(self, fp: int) -> bool:
+        bucket = self._issued[fp >> _BUCKET_SHIFT]
+        if bucket is None:
+            return False
+        i = bisect_left(bucket, fp)
+        return i < len(bucket) and bucket[i] == fp
+
+    def _issue(self, fp: int) -> None:
+        index = fp >> _BUCKET_SHIFT
+        bucket = self._issued[index]
+        if bucket is None:
+            bucket = self._issued[index] = array("Q")
+        i = bisect_left(bucket, fp)
+        if i < len(bucket) and bucket[i] == fp:
+            return
+        bucket.insert(i, fp)
+        self._issued_count += 1
+
+    def _contains_fp(self, fp: int) -> bool:
+        if self._issued_contains(fp):
+            return True
+        bloom = self._bloom
+        for bit in self._probes(fp):
+            if not bloom[bit >> 3] & (1 << (bit & 7)):
+                return False
+        i = bisect_left(self._sorted, fp)
+        return i < len(self._sorted) and self._sorted[i] == fp
+
+    def key_fingerprint(self, key) -> int:
+        self._encoder.encode_into(key, self._hex)
+        try:
+            return _fingerprint(self.salt, self._hex)
+        finally:
+            zeroize(self._hex)
+
+    def __contains__(self, key) -> bool:
+        return self._contains_fp(self.key_fingerprint(key))
+
+    def add(self, key) -> None:
+        self._issue(self.key_fingerprint(key))
+
+    def __len__(self) -> int:
+        return len(self._sorted) + self._issued_count
+
+    def ensure_unique(self, keys: Iterable) -> int:
+        """
+        Regenerate in place any key already indexed (deployed, or issued earlier
+        in this run), then record each key as issued. Returns how many were redrawn.
+        """
+        redrawn = 0
+        with stage("unique_check"):
+            for key in keys:
+                fp = self.key_fingerprint(key)
+                while self._contains_fp(fp):
+                    _fill_random(key)
+                    redrawn += 1
+                    fp = self.key_fingerprint(key)
+                self._issue(fp)
+        if redrawn:
+            stats_count("keys_regenerated", redrawn)
+        return redrawn
+
+    def stats(self) -> dict:
+        return {
+            "deployed": len(self._sorted),
+            "issued": self._issued_count,
+            "bloom_bytes": len(self._bloom),
+            "index_bytes": self._sorted.itemsize * len(self._sorted),
+            "issued_bytes": self._sorted.itemsize * self._issued_count,
+        }
+
@@ -0,0 +1,246 @@
+"""
+Paged terminal viewer for reviewing a batch of keys (curses).
+
+Each screen shows one page of keys, one row per key, masked until revealed.
+A row is hex-encoded only when it is revealed on the current page, into a
+single page buffer that is wiped whenever the page changes and when the
+viewer exits. Drawing therefore costs the same for ten keys or a million.
+Hex digits go to the screen one character at a time from that buffer, so no
+str or bytes copy of a key is made. The screen is blanked before curses
+ends, which leaves no key text in the terminal library's own screen copy,
+and the alternate screen leaves nothing in the scrollback.
+
+Keys: up/down or j/k move, PgUp/PgDn (space/b) page, Home/End, g, : or /
+jump to a key number, r reveal the selected key, v reveal the page, c or
+Enter copy the selected key, q or Esc quit.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from typing import Callable, Optional, Sequence
+
+from aes256_core import KEY_SIZE, HexEncoder, zeroize
+from aes256_stats import count as stats_count, stage
+
+HEX_LEN = 2 * KEY_SIZE
+MASK = "*" * HEX_LEN
+HELP = "j/k move  PgUp/PgDn page  g jump  r reveal  v page  c copy  q quit"
+
+_CHROME_ROWS = 2  # title line and status line
+
+
+def viewer_available() -> bool:
+    """True when stdin and stdout are terminals and curses can be loaded."""
+    if not (sys.stdin.isatty() and sys.stdout.isatty()) or not os.environ.get("TERM"):
+        return False
+    try:
+        import curses  # noqa: F401
+    except ImportError:  # Windows without windows-curses
+        return False
+    return True
+
+
+class KeyViewer:
+    """Paging state and drawing for a sequence of 32-byte keys."""
+
+    def __init__(
+        self,
+        keys: Sequence,
+        copy: Optional[Callable[[bytearray], None]] = None,
+        wipe: Callable[[bytearray], None] = zeroize,
+        upper: bool = False,
+    ) -> None:
+        self.keys = keys
+        self.copy = copy
+        self.wipe = wipe
+        self.selected = 0
+        self.top = 0
+        self.rows = 1
+        self.message = ""
+        self._encoder = HexEncoder(upper=upper)
+        self._page = bytearray(HEX_LEN)
+        self._revealed: set[int] = set()  # key indices encoded into the page buffer
+
+    # -- paging -----------------------------------------------------------
+
+    def _hide_page(self) -> None:
+        if self._revealed:
+            self.wipe(self._page)
+            self._revealed.clear()
+
+    def resize(self, height: int) -> None:
+        rows = max(1, height - _CHROME_ROWS)
+        if rows == self.rows and len(self._page) == rows * HEX_LEN:
+            return
+        self._hide_page()
+        self._page = bytearray(rows * HEX_LEN)
+        self.rows = rows
+        self.top = self.selected - self.selected % rows
+
+    def select(self, index: int) -> None:
+        """Move the selection to index (clamped); a page change wipes the old page."""
+        self.selected = max(0, min(index, len(self.keys) - 1))
+        top = self.selected - self.selected % self.rows
+        if top != self.top:
+            self._hide_page()
+            self.top = top
+
+    def reveal(self, index: int) -> None:
+        """Toggle the hex of key index (which must be on the current page)."""
+        slot = (index - self.top) * HEX_LEN
+        if index in self._revealed:
+            self.wipe(memoryview(self._page)[slot:slot + HEX_LEN])
+            self._revealed.discard(index)
+            return
+        with stage("encode"):
+            self._encoder.encode_into(self.keys[index], self._page, slot)
+        self._revealed.add(index)
+        stats_count("keys_displayed")
+
+    def reveal_page(self) -> None:
+        """Reveal every key on the page, or mask them all if they already are."""
+        visible = range(self.top, min(self.top + self.rows, len(self.keys)))
+        if all(i in self._revealed for i in visible):
+            self._hide_page()
+            return
+        for i in visible:
+            if i not in self._revealed:
+                self.reveal(i)
+
+    def copy_selected(self) -> None:
+        if self.copy is None:
+            self.message = "Clipboard disabled."
+            return
+        hex_buf = bytearray(HEX_LEN)
+        try:
+            self._encoder.encode_into(self.keys[self.selected], hex_buf)
+            self.copy(hex_buf)
+            stats_count("keys_copied")
+            self.message = f"Copied key #{self.selected + 1}."
+        except (RuntimeError, OSError) as e:  # ClipboardUnavailable is a RuntimeError
+            self.message = f"Copy failed: {e}"
+        finally:
+            self.wipe(hex_buf)
+
+    def close(self) -> None:
+        self._hide_page()
+        self.wipe(self._page)
+
+    # -- curses -----------------------------------------------------------
+
+    def draw(self, scr) -> None:
+        import curses
+
+        height, width = scr.getmaxyx()
+        total = len(self.keys)
+        label_width = len(str(total))
+        pages = (total + self.rows - 1) // self.rows
+        with stage("render"):
+            scr.erase()
+            title = f"{total} keys  page {self.top // self.rows + 1}/{pages}  key #{self.selected + 1}"
+            scr.addnstr(0, 0, title, width - 1, curses.A_BOLD)
+            x = label_width + 2
+            hex_width = max(0, min(HEX_LEN, width - 1 - x))
+            for row in range(min(self.rows, total - self.top)):
+                index = self.top + row
+                attr = curses.A_REVERSE if index == self.selected else curses.A_NORMAL
+                y = row + 1
+                scr.addnstr(y, 0, f"{index + 1:>{label_width}}  ", width - 1, attr)
+                if index in self._revealed:
+                    slot = row * HEX_LEN
+                    for j in range(hex_width):
+                        scr.addch(y, x + j, self._page[slot + j], attr)
+                elif hex_width:
+                    scr.addnstr(y, x, MASK, hex_width, attr)
+            scr.addnstr(height - 1, 0, self.message or HELP, width - 1)
+            scr.refresh()
+
+    def prompt_index(self, scr) -> Optional[int]:
+        """Read a key number on the status line; None if cancelled."""
+        import curses
+
+        height, width = scr.getmaxyx()
+        digits = ""
+        while True:
+            scr.move(height - 1, 0)
+            scr.clrtoeol()
+            scr.addnstr(height - 1, 0, f"Go to key (1-{len(self.keys)}): {digits}", width - 1)
+            scr.refresh()
+            ch = scr.getch()
+            if ch in (10, 13, curses.KEY_ENTER):
+                return int(digits) if digits else None
+            if ch == 27:
+                return None
+            if ch in (curses.KEY_BACKSPACE, 8, 127):
+                digits = digits[:-1]
+            elif 48 <= ch <= 57 and len(digits) < 12:
+                digits += chr(ch)
+
+    def run(self, scr) -> None:
+        """Event loop; pass to curses.wrapper."""
+        import curses
+
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        scr.keypad(True)
+        moves = {
+            curses.KEY_DOWN: 1, ord("j"): 1,
+            curses.KEY_UP: -1, ord("k"): -1,
+        }
+        try:
+            while True:
+                self.resize(scr.getmaxyx()[0])
+                self.draw(scr)
+                ch = scr.getch()
+                self.message = ""
+                if ch in (ord("q"), 27):
+                    return
+                if ch in moves:
+                    self.select(self.selected + moves[ch])
+                elif ch in (curses.KEY_NPAGE, ord(" ")):
+                    self.select(self.selected + self.rows)
+                elif ch in (curses.KEY_PPAGE, ord("b")):
+                    self.select(self.selected - self.rows)
+                elif ch == curses.KEY_HOME:
+                    self.select(0)
+                elif ch in (curses.KEY_END, ord("G")):
+                    self.select(len(self.keys) - 1)
+                elif ch in (ord("g"), ord(":"), ord("/")):
+                    number = self.prompt_index(scr)
+                    if number is not None:
+                        if 1 <= number <= len(self.keys):
+                            self.select(number - 1)
+                        else:
+                            self.message = f"No key #{number}."
+                elif ch == ord("r"):
+                    self.reveal(self.selected)
+                elif ch == ord("v"):
+                    self.reveal_page()
+                elif ch in (ord("c"), 10, 13, curses.KEY_ENTER):
+                    self.copy_selected()
+        finally:
+            self.close()
+            # Overwrite curses' copy of the screen before it is torn down.
+            scr.erase()
+            scr.refresh()
+
+
+def view_keys(
+    keys: Sequence,
+    copy: Optional[Callable[[bytearray], None]] = None,
+    wipe: Callable[[bytearray], None] = zeroize,
+    upper: bool = False,
+) -> None:
+    """
+    Page through keys in a full-screen viewer. copy(hex_buf), if given, is
+    called with the selected key's hex in a bytearray that is wiped on return.
+    """
+    if not keys:
+        return
+    import curses
+
+    curses.wrapper(KeyViewer(keys, copy, wipe, upper).run)
@@ -0,0 +1,94 @@
+"""
+Import-time and CLI startup benchmark for aes256_generator.
+
+Each sample runs in a fresh interpreter so module caches do not hide cost:
+
+* import      - cumulative ``-X importtime`` of ``import aes256_generator``
+* cli_help    - wall clock of ``aes256_generator.py --help`` minus a bare
+                ``python -c pass`` (interpreter start-up is not ours to fix)
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 15] [--max-import-ms 60] [--json]
+
+With --max-import-ms the script exits non-zero when the median import time
+exceeds the budget, so it can gate CI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE = "aes256_generator"
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    env.pop("PYTHONDEVMODE", None)
+    return env
+
+
+def import_time_us(module: str = MODULE) -> int:
+    """Cumulative import time of module in microseconds, from -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    for line in reversed(proc.stderr.splitlines()):
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"no importtime entry for {module}")
+
+
+def wall_ms(argv: list[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run(argv, cwd=ROOT, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - start) * 1000.0
+
+
+def run(runs: int) -> dict:
+    # Warm the bytecode cache so the first sample is not a compile.
+    import_time_us()
+    imports = [import_time_us() / 1000.0 for _ in range(runs)]
+    bare = [wall_ms([sys.executable, "-c", "pass"]) for _ in range(runs)]
+    cli = [wall_ms([sys.executable, os.path.join(ROOT, f"{MODULE}.py"), "--help"]) for _ in range(runs)]
+    bare_median = statistics.median(bare)
+    return {
+        "runs": runs,
+        "python": sys.version.split()[0],
+        "import_ms_median": round(statistics.median(imports), 3),
+        "import_ms_min": round(min(imports), 3),
+        "cli_help_ms_median": round(statistics.median(cli) - bare_median, 3),
+        "interpreter_ms_median": round(bare_median, 3),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time / startup benchmark for aes256_generator")
+    parser.add_argument("--runs", type=int, default=15, help="Fresh-interpreter samples per measurement")
+    parser.add_argument("--max-import-ms", type=float, default=None, help="Fail if the median import exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args(argv)
+
+    result = run(max(1, args.runs))
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for key, value in result.items():
+            print(f"{key:24} {value}")
+    if args.max_import_ms is not None and result["import_ms_median"] > args.max_import_ms:
+        print(f"import time {result['import_ms_median']} ms exceeds budget {args.max_import_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""
+Hot-path benchmark suite for the AES-256 Hex Generator.
+
+Cases (each run at every size, in its own interpreter so peak RSS is per case):
+
+* generate_key   - ``generate_ephemeral_aes256_key()`` per key
+* generate_batch - ``generate_keys(n)`` + ``release_keys`` as one batch
+* wipe:<backend> - ``secure_wipe_strong`` on a 32-byte key, for every
+                   zeroization backend available on this platform
+* print_hex      - ``print_hex_from_bytes`` to a null terminal (os.devnull)
+* clipboard      - copy + clear of one hex key through the fake clipboard
+* export_hex     - headless ``export_keys(n, os.devnull)``
+
+Per-key cases report latency percentiles; batch cases report throughput only.
+Import/CLI start-up is measured once with bench_startup.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 1,1000,100000,1000000] [--cases generate_key,print_hex]
+                                     [--save baseline.json] [--compare baseline.json] [--tolerance 0.25]
+
+With --compare the script exits non-zero when any case is slower (keys/sec or
+p99) or uses more peak RSS than the baseline by more than the tolerance.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from array import array
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = (1, 1_000, 100_000, 1_000_000)
+PER_KEY_CASES = ("generate_key", "print_hex", "clipboard")
+BATCH_CASES = ("generate_batch", "export_hex")
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    env["AES256_CLIPBOARD_BACKEND"] = "fake"
+    env.pop("PYTHONDEVMODE", None)
+    return env
+
+
+def peak_rss_kib() -> int | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS reports bytes
+
+
+def wipe_cases() -> list[str]:
+    from aes256_core import available_wipe_backends
+
+    return [f"wipe:{b.primitive}" for b in available_wipe_backends()]
+
+
+def percentiles(samples: array) -> dict:
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    result = {f"p{p:g}_ns": ordered[min(last, int(round(p / 100 * last)))] for p in PERCENTILES}
+    result["max_ns"] = ordered[last]
+    return result
+
+
+# ---------------------------
+# Cases (run inside the child interpreter)
+# ---------------------------
+
+def _per_key(n: int, step) -> array:
+    clock = time.perf_counter_ns
+    samples = array("Q", bytes(8 * n))
+    for i in range(n):
+        start = clock()
+        step()
+        samples[i] = clock() - start
+    return samples
+
+
+def _case_generate_key(n: int) -> array:
+    import aes256_generator as cli
+
+    def step():
+        cli.secure_wipe_strong(cli.generate_ephemeral_aes256_key())
+    return _per_key(n, step)
+
+
+def _case_print_hex(n: int) -> array:
+    import aes256_generator as cli
+    from aes256_core import generate_keys
+
+    sys.stdout = open(os.devnull, "w")  # null terminal; print_hex_from_bytes writes to its raw fd
+    key = generate_keys(1)[0]
+    hex_buf = bytearray(64)
+    return _per_key(n, lambda: cli.print_hex_from_bytes(key, hex_buf))
+
+
+def _case_clipboard(n: int) -> array:
+    from aes256_clipboard import clipboard_backend
+
+    backend = clipboard_backend()
+    if backend.name != "fake":
+        raise RuntimeError(f"expected the fake clipboard, got {backend.name}")
+    hex_buf = bytearray(b"0f" * 32)
+
+    def step():
+        backend.copy(hex_buf)
+        backend.clear()
+    return _per_key(n, step)
+
+
+def _case_wipe(n: int, primitive: str) -> array:
+    import aes256_core
+    import aes256_generator as cli
+
+    backend = next(b for b in aes256_core.available_wipe_backends() if b.primitive == primitive)
+    aes256_core._wipe_backend = backend
+    key = bytearray(32)
+    return _per_key(n, lambda: cli.secure_wipe_strong(key))
+
+
+def _case_generate_batch(n: int) -> None:
+    from aes256_core import generate_keys, release_keys
+
+    release_keys(generate_keys(n))
+
+
+def _case_export_hex(n: int) -> None:
+    from aes256_export import export_keys
+
+    export_keys(n, os.devnull, "hex")
+
+
+def run_case(case: str, n: int) -> dict:
+    """Run one case in this process and return its measurements."""
+    # Import outside the timed region: start-up is measured by bench_startup.
+    import aes256_clipboard, aes256_core, aes256_export, aes256_generator  # noqa: F401
+
+    rss_start = peak_rss_kib()
+    start = time.perf_counter()
+    if case.startswith("wipe:"):
+        samples = _case_wipe(n, case.split(":", 1)[1])
+    else:
+        samples = globals()[f"_case_{case}"](n)
+    elapsed = time.perf_counter() - start
+    result = {
+        "case": case,
+        "keys": n,
+        "seconds": round(elapsed, 6),
+        "keys_per_sec": round(n / elapsed, 1) if elapsed else None,
+        "peak_rss_kib": peak_rss_kib(),
+        "rss_start_kib": rss_start,
+    }
+    if samples is not None:
+        # Per-key cases: throughput from the timed calls only, not case setup.
+        result["keys_per_sec"] = round(n / (sum(samples) / 1e9), 1)
+        result.update(percentiles(samples))
+    return result
+
+
+def run_child(case: str, n: int) -> dict:
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", case, str(n)],
+        cwd=ROOT, env=_env(), capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return {"case": case, "keys": n, "error": proc.stderr.strip().splitlines()[-1:]}
+    return json.loads(proc.stdout)
+
+
+# ---------------------------
+# Baseline comparison
+# ---------------------------
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Human-readable regressions of results against baseline."""
+    previous = {(r["case"], r["keys"]): r for r in baseline if "error" not in r}
+    regressions = []
+    for r in results:
+        old = previous.get((r["case"], r["keys"]))
+        if old is None or "error" in r:
+            continue
+        label = f"{r['case']} @ {r['keys']}"
+        if old.get("keys_per_sec") and r["keys_per_sec"] < old["keys_per_sec"] * (1 - tolerance):
+            regressions.append(f"{label}: {r['keys_per_sec']} keys/s vs baseline {old['keys_per_sec']}")
+        if old.get("p99_ns") and r.get("p99_ns", 0) > old["p99_ns"] * (1 + tolerance):
+            regressions.append(f"{label}: p99 {r['p99_ns']} ns vs baseline {old['p99_ns']}")
+        if old.get("peak_rss_kib") and r.get("peak_rss_kib") and r["peak_rss_kib"] > old["peak_rss_kib"] * (1 + tolerance):
+            regressions.append(f"{label}: peak RSS {r['peak_rss_kib']} KiB vs baseline {old['peak_rss_kib']}")
+    return regressions
+
+
+def _print_table(results: list[dict]) -> None:
+    print(f"{'case':24} {'keys':>9} {'keys/s':>12} {'p50 ns':>9} {'p99 ns':>9} {'max ns':>10} {'peak RSS KiB':>13}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['case']:24} {r['keys']:>9} error: {' '.join(r['error'])}")
+            continue
+        print(f"{r['case']:24} {r['keys']:>9} {r['keys_per_sec']:>12} {r.get('p50_ns', '-'):>9} "
+              f"{r.get('p99_ns', '-'):>9} {r.get('max_ns', '-'):>10} {r['peak_rss_kib'] or '-':>13}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Hot-path benchmark suite for the AES-256 Hex Generator")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Comma-separated key counts")
+    parser.add_argument("--cases", default=None, help="Comma-separated cases (default: all)")
+    parser.add_argument("--startup-runs", type=int, default=5, help="Fresh-interpreter start-up samples (0 to skip)")
+    parser.add_argument("--save", metavar="PATH", help="Write results as JSON (e.g. a new baseline)")
+    parser.add_argument("--compare", metavar="PATH", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression as a fraction")
+    parser.add_argument("--child", nargs=2, metavar=("CASE", "N"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    if args.child:
+        result = run_case(args.child[0], int(args.child[1]))
+        print(json.dumps(result), file=sys.__stdout__)  # cases may redirect sys.stdout
+        return 0
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    cases = args.cases.split(",") if args.cases else [*PER_KEY_CASES, *wipe_cases(), *BATCH_CASES]
+    results = [run_child(case, n) for case in cases for n in sizes]
+    report = {"python": sys.version.split()[0], "platform": sys.platform, "results": results}
+    if args.startup_runs > 0:
+        import bench_startup
+
+        report["startup"] = bench_startup.run(args.startup_runs)
+
+    _print_table(results)
+    if "startup" in report:
+        print(f"startup: import {report['startup']['import_ms_median']} ms, "
+              f"--help {report['startup']['cli_help_ms_median']} ms (median)")
+    if args.save:
+        with open(args.save, "w") as fh:
+            json.dump(report, fh, indent=2)
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        regressions = compare(results, baseline.get("results", []), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+import pytest
+
+from aes256_core import KEY_SIZE, SLOTS_PER_PAGE, SecureArena, generate_keys, release_keys
+
+
+def test_alloc_returns_zeroed_writable_slots():
+    arena = SecureArena(pages_per_chunk=1)
+    keys = arena.alloc(SLOTS_PER_PAGE + 3)  # spills into a second chunk
+    assert len(keys) == SLOTS_PER_PAGE + 3
+    assert all(len(k) == KEY_SIZE and not any(k) for k in keys)
+    keys[0][:] = b"\xaa" * KEY_SIZE
+    assert not any(keys[1])
+    assert arena.stats()["slots_used"] == SLOTS_PER_PAGE + 3
+    arena.close()
+
+
+def test_free_zeroes_releases_and_reuses_slots():
+    arena = SecureArena()
+    keys = generate_keys(4, arena)
+    chunk = arena._chunks[0]
+    arena.free_many(keys)
+    with pytest.raises(ValueError):
+        bytes(keys[0])  # the view is released
+    assert arena.stats()["slots_used"] == 0
+    assert not any(chunk.view)
+    again = arena.alloc(4)
+    assert len(arena._chunks) == 1 and not any(b for k in again for b in k)
+    arena.close()
+
+
+def test_reset_wipes_and_reclaims_everything():
+    arena = SecureArena()
+    keys = generate_keys(10, arena)
+    arena.reset()
+    assert arena.stats()["slots_used"] == 0
+    assert all(not any(c.view) for c in arena._chunks)
+    with pytest.raises(ValueError):
+        bytes(keys[0])
+    arena.close()
+
+
+def test_foreign_keys_are_rejected():
+    mine, other = SecureArena(), SecureArena()
+    key = generate_keys(1, other)[0]
+    with pytest.raises(ValueError, match="not allocated from this arena"):
+        release_keys([key], mine)
+    assert any(key)  # nothing was touched
+    release_keys([key], other)
+    mine.close()
+    other.close()
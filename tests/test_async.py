@@ -0,0 +1,89 @@
+import asyncio
+from contextlib import aclosing
+
+from aes256_async import agenerate, akeys
+from aes256_core import SecureArena
+
+
+def _assert_all_wiped(arena):
+    assert arena.stats()["slots_used"] == 0
+    for chunk in arena._chunks:
+        assert not any(chunk.view)
+
+
+def test_agenerate_with_custom_arena():
+    arena = SecureArena()
+
+    async def run():
+        seen = []
+        async for key in agenerate(10, batch_size=4, arena=arena):
+            seen.append(bytes(key))
+        return seen
+
+    seen = asyncio.run(run())
+    assert len(seen) == 10 and len(set(seen)) == 10
+    _assert_all_wiped(arena)
+    arena.close()
+
+
+def test_agenerate_wipes_on_early_close_and_cancel():
+    arena = SecureArena()
+
+    async def break_early():
+        async with aclosing(agenerate(500, batch_size=64, arena=arena)) as keys:
+            taken = 0
+            async for _key in keys:
+                taken += 1
+                if taken == 100:
+                    break
+
+    async def cancel_mid_stream():
+        started = asyncio.Event()
+
+        async def consume():
+            async with aclosing(agenerate(500, batch_size=64, arena=arena)) as keys:
+                async for _key in keys:
+                    started.set()
+                    await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(consume())
+        await started.wait()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        # Let a batch that was in flight on the key-generation thread land and be released.
+        await asyncio.sleep(0.2)
+
+    asyncio.run(break_early())
+    _assert_all_wiped(arena)
+    asyncio.run(cancel_mid_stream())
+    _assert_all_wiped(arena)
+    arena.close()
+
+
+def test_akeys_wipes_on_cancel():
+    arena = SecureArena()
+
+    async def run():
+        entered = asyncio.Event()
+
+        async def hold():
+            async with akeys(3, arena=arena) as keys:
+                assert len(keys) == 3
+                entered.set()
+                await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(hold())
+        await entered.wait()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+    _assert_all_wiped(arena)
+    arena.close()
+
@@ -0,0 +1,61 @@
+import io
+import sys
+
+import pytest
+
+import aes256_generator
+
+
+@pytest.mark.parametrize("count", ["0", "-3"])
+def test_count_below_one_is_a_usage_error(count, capsys):
+    with pytest.raises(SystemExit) as exc:
+        aes256_generator.parse_args(["--count", count])
+    assert exc.value.code == 2
+    assert "--count must be at least 1" in capsys.readouterr().err
+
+
+def test_count_one_is_accepted():
+    assert aes256_generator.parse_args(["--count", "1"]).count == 1
+
+
+@pytest.mark.parametrize("argv, message", [
+    (["--workers", "0", "--output", "-"], "--workers must be at least 1"),
+    (["--workers", "-2", "--output", "-"], "--workers must be at least 1"),
+    (["--workers", "4"], "--workers needs --output"),
+    (["--roster", "fleet.csv", "--workers", "4"], "--roster cannot be combined with --workers"),
+])
+def test_bad_workers_is_a_usage_error(argv, message, capsys):
+    with pytest.raises(SystemExit) as exc:
+        aes256_generator.parse_args(argv)
+    assert exc.value.code == 2
+    assert message in capsys.readouterr().err
+
+
+def test_workers_with_output_is_accepted():
+    assert aes256_generator.parse_args(["--workers", "4", "--output", "-"]).workers == 4
+
+
+class _ShortWriter(io.RawIOBase):
+    """Raw stream that accepts at most three bytes per write."""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        n = min(3, len(b))
+        self.data += bytes(b[:n])
+        return n
+
+
+def test_print_hex_survives_short_writes(monkeypatch):
+    raw = _ShortWriter()
+    stdout = io.TextIOWrapper(io.BufferedWriter(raw), encoding="ascii")
+    monkeypatch.setattr(sys, "stdout", stdout)
+    monkeypatch.setattr(aes256_generator, "colors", lambda: (aes256_generator._NoColor(), aes256_generator._NoColor()))
+    key = bytearray(range(32))
+    aes256_generator.print_hex_from_bytes(key)
+    assert bytes(raw.data) == b"[ " + key.hex().encode() + b" ]\n"
+
@@ -0,0 +1,29 @@
+import threading
+import time
+
+from aes256_clipboard import ClipboardExpiryScheduler
+
+
+def test_expiries_never_fire_before_their_deadline():
+    clears = []
+    fired = {}
+    done = threading.Event()
+    scheduler = ClipboardExpiryScheduler(lambda: clears.append(time.monotonic()))
+    start = time.monotonic()
+    delays = {"first": 0.2, "second": 0.35}
+
+    def on_cleared(name):
+        fired[name] = time.monotonic()
+        if len(fired) == len(delays):
+            done.set()
+
+    try:
+        for name, delay in delays.items():
+            scheduler.schedule(delay, on_cleared=lambda name=name: on_cleared(name))
+        assert done.wait(5)
+    finally:
+        scheduler.shutdown(flush=False)
+    for name, delay in delays.items():
+        assert fired[name] - start >= delay
+    # Only the newest copy's expiry clears, and not before its own deadline.
+    assert len(clears) == 1 and clears[0] - start >= delays["second"]
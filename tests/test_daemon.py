@@ -0,0 +1,63 @@
+import json
+import socket
+import threading
+
+import pytest
+
+from aes256_daemon import MAX_REQUEST, request_keys, serve
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    path = str(tmp_path / "aes256.sock")
+    started = threading.Event()
+    servers = []
+
+    def ready(server):
+        servers.append(server)
+        started.set()
+
+    thread = threading.Thread(target=serve, args=(path,), kwargs={"low": 4, "high": 16, "ready": ready}, daemon=True)
+    thread.start()
+    assert started.wait(10)
+    yield path
+    servers[0].shutdown()
+    thread.join(10)
+    assert not thread.is_alive()
+
+
+def _ask(path, request):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(request + b"QUIT\n")
+        data = b""
+        while chunk := sock.recv(4096):
+            data += chunk
+    return data
+
+
+def test_get_returns_distinct_keys(daemon):
+    keys = request_keys(daemon, 3)
+    assert len(keys) == 3
+    assert all(isinstance(k, bytearray) and len(k) == 32 for k in keys)
+    assert len({bytes(k) for k in keys}) == 3
+
+
+def test_stats_round_trip(daemon):
+    request_keys(daemon, 2)
+    reply = _ask(daemon, b"STATS\n")
+    assert reply.startswith(b"OK ") and reply.endswith(b"\n")
+    stats = json.loads(reply[3:])
+    assert stats["issued"] == 2
+    assert stats["low"] == 4 and stats["high"] == 16
+
+
+def test_bad_requests_get_errors(daemon):
+    reply = _ask(daemon, b"GET 0\nGET %d\nFETCH\n" % (MAX_REQUEST + 1))
+    assert reply.splitlines() == [
+        b"ERR count must be 1..%d" % MAX_REQUEST,
+        b"ERR count must be 1..%d" % MAX_REQUEST,
+        b"ERR unknown command",
+    ]
+    with pytest.raises(ValueError, match="count must be"):
+        request_keys(daemon, 0)
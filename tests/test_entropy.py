@@ -0,0 +1,22 @@
+from aes256_entropy import CtrDrbg
+
+# NIST CAVP drbgvectors_no_reseed, CTR_DRBG.rsp: [AES-256 no df],
+# PredictionResistance = False, no nonce/personalization/additional input,
+# ReturnedBitsLen = 512, COUNT = 0. The second generate call is checked.
+ENTROPY_INPUT = bytes.fromhex(
+    "df5d73faa468649edda33b5cca79b0b05600419ccb7a879ddfec9db32ee494e5"
+    "531b51de16a30f769262474c73bec010"
+)
+RETURNED_BITS = bytes.fromhex(
+    "d1c07cd95af8a7f11012c84ce48bb8cb87189e99d40fccb1771c619bdf82ab22"
+    "80b1dc2f2581f39164f7ac0c510494b3a43c41b7db17514c87b107ae793e01c5"
+)
+
+
+def test_ctr_drbg_cavp_aes256_no_df_no_reseed():
+    drbg = CtrDrbg(seed=ENTROPY_INPUT)
+    out = bytearray(64)
+    drbg.fill(out)
+    drbg.fill(out)
+    drbg.close()
+    assert out == RETURNED_BITS
@@ -0,0 +1,70 @@
+import csv
+import json
+import os
+import re
+
+import pytest
+
+from aes256_entropy import make_source, set_default_source
+from aes256_export import FORMATS, export_keys
+
+HEX_KEY = re.compile(r"^[0-9a-f]{64}$")
+SEED = bytes(range(48))
+
+
+@pytest.fixture
+def seeded():
+    set_default_source(make_source("ctr_drbg", seed=SEED))
+    yield
+    set_default_source(make_source())
+
+
+def _keys(path, fmt):
+    with open(path, newline="") as fh:
+        if fmt == "hex":
+            return fh.read().splitlines()
+        if fmt == "jsonl":
+            records = [json.loads(line) for line in fh]
+            assert [r["index"] for r in records] == list(range(1, len(records) + 1))
+            return [r["key"] for r in records]
+        rows = list(csv.reader(fh))
+        assert rows[0] == ["index", "key"]
+        assert [int(r[0]) for r in rows[1:]] == list(range(1, len(rows)))
+        return [r[1] for r in rows[1:]]
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_export_format_across_batches(tmp_path, seeded, fmt):
+    path = tmp_path / f"keys.{fmt}"
+    written = export_keys(10, str(path), fmt, batch_size=3)
+    assert written == path.stat().st_size
+    assert path.stat().st_mode & 0o777 == 0o600
+    keys = _keys(path, fmt)
+    assert len(keys) == 10 and len(set(keys)) == 10
+    assert all(HEX_KEY.match(k) for k in keys)
+
+
+def test_formats_carry_the_same_key_stream(tmp_path):
+    streams = []
+    for fmt in FORMATS:
+        set_default_source(make_source("ctr_drbg", seed=SEED))
+        path = tmp_path / f"keys.{fmt}"
+        export_keys(7, str(path), fmt, batch_size=4)
+        streams.append(_keys(path, fmt))
+    set_default_source(make_source())
+    assert streams[0] == streams[1] == streams[2]
+
+
+def test_parallel_export_writes_every_key_once(tmp_path):
+    path = tmp_path / "keys.txt"
+    export_keys(1000, str(path), "hex", batch_size=128, workers=2)
+    keys = _keys(path, "hex")
+    assert len(keys) == 1000 and len(set(keys)) == 1000
+    assert all(HEX_KEY.match(k) for k in keys)
+
+
+def test_export_rejects_bad_arguments(tmp_path):
+    with pytest.raises(ValueError):
+        export_keys(0, os.devnull)
+    with pytest.raises(ValueError):
+        export_keys(1, os.devnull, "xml")
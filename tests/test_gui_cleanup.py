@@ -0,0 +1,23 @@
+import threading
+
+import aes256_generator_gui
+from aes256_core import KeyRegistry, generate_keys
+
+
+def test_final_cleanup_while_registry_lock_is_held(monkeypatch):
+    monkeypatch.setattr(aes256_generator_gui, "_clear_clipboard_os_specific", lambda: None)
+    registry = KeyRegistry()
+    registry.add_many(generate_keys(4))
+    finished = threading.Event()
+
+    def interrupted_add():
+        # The signal handler runs on the thread that was inside add_many().
+        with registry._lock:
+            aes256_generator_gui._final_cleanup(registry)
+            finished.set()
+
+    thread = threading.Thread(target=interrupted_add, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert finished.is_set(), "cleanup deadlocked on the key registry lock"
+    assert len(registry) == 0
@@ -0,0 +1,67 @@
+import pytest
+
+from aes256_cipher import new_cipher, unwrap_into, wrap_into
+from aes256_entropy import make_source, set_default_source
+from aes256_export import export_keys
+from aes256_keystore import HEADER_SIZE, RECORD_SIZE, Keystore, KeystoreError, export_keystore
+
+# RFC 3394 section 4.6: 256 bits of key data wrapped with a 256-bit KEK.
+KEK = bytes.fromhex("000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f")
+KEY_DATA = bytes.fromhex("00112233445566778899aabbccddeeff000102030405060708090a0b0c0d0e0f")
+WRAPPED = bytes.fromhex("28c9f404c4b810f4cbccb35cfb87f8263f5786e2d80ed326cbc7f0e71a99f43bfb988b9b7a02dd21")
+SEED = bytes(range(48))
+PASSPHRASE = bytearray(b"correct horse battery staple")
+
+
+def test_aes_kw_rfc3394_vector():
+    cipher = new_cipher(KEK)
+    out = bytearray(len(WRAPPED))
+    assert wrap_into(cipher, KEY_DATA, out) == len(WRAPPED)
+    assert out == WRAPPED
+    plain = bytearray(len(KEY_DATA))
+    unwrap_into(cipher, WRAPPED, plain)
+    assert plain == KEY_DATA
+    with pytest.raises(ValueError):
+        unwrap_into(cipher, WRAPPED[:-1] + bytes([WRAPPED[-1] ^ 1]), plain)
+    cipher.wipe()
+
+
+@pytest.fixture
+def keystore_and_plain(tmp_path):
+    plain, path = tmp_path / "plain.txt", tmp_path / "keys.ks"
+    set_default_source(make_source("ctr_drbg", seed=SEED))
+    export_keys(5, str(plain), batch_size=2)
+    set_default_source(make_source("ctr_drbg", seed=SEED))
+    export_keystore(5, str(path), PASSPHRASE, batch_size=2, log2_n=10)
+    set_default_source(make_source())
+    return path, plain.read_text().split()
+
+
+def test_keystore_round_trip(keystore_and_plain):
+    path, expected = keystore_and_plain
+    assert path.stat().st_size == HEADER_SIZE + 5 * RECORD_SIZE
+    assert path.stat().st_mode & 0o777 == 0o600
+    with Keystore(str(path), PASSPHRASE) as ks:
+        assert len(ks) == 5
+        assert [ks.read_key(i).hex() for i in range(1, 6)] == expected
+        with pytest.raises(IndexError):
+            ks.read_key(6)
+
+
+def test_keystore_rejects_wrong_passphrase(keystore_and_plain):
+    path, _ = keystore_and_plain
+    with pytest.raises(KeystoreError, match="wrong passphrase"):
+        Keystore(str(path), bytearray(b"wrong"))
+
+
+def test_keystore_detects_swapped_records(keystore_and_plain):
+    path, _ = keystore_and_plain
+    data = bytearray(path.read_bytes())
+    first = slice(HEADER_SIZE, HEADER_SIZE + RECORD_SIZE)
+    second = slice(HEADER_SIZE + RECORD_SIZE, HEADER_SIZE + 2 * RECORD_SIZE)
+    data[first], data[second] = data[second], data[first]
+    path.write_bytes(bytes(data))
+    with Keystore(str(path), PASSPHRASE) as ks:
+        with pytest.raises(KeystoreError, match="integrity"):
+            ks.read_key(1)
+        ks.read_key(3)
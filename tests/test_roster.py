@@ -0,0 +1,17 @@
+import csv
+
+from aes256_roster import provision_roster
+
+
+def test_radio_in_two_talkgroups_keeps_one_radio_key(tmp_path):
+    roster = tmp_path / "roster.csv"
+    roster.write_text("radio_id,talkgroup,alias\n3100001,91,Alpha\n3100001,92,Alpha\n3100002,91,Bravo\n")
+    out = tmp_path / "keys.csv"
+    provision_roster(str(roster), str(out))
+    with open(out, newline="") as fh:
+        rows = list(csv.DictReader(fh))
+    assert [(r["radio_id"], r["talkgroup"]) for r in rows] == [("3100001", "91"), ("3100001", "92"), ("3100002", "91")]
+    assert rows[0]["radio_key"] == rows[1]["radio_key"]
+    assert rows[0]["radio_key"] != rows[2]["radio_key"]
+    assert rows[0]["talkgroup_key"] == rows[2]["talkgroup_key"]
+    assert rows[0]["talkgroup_key"] != rows[1]["talkgroup_key"]
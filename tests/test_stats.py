@@ -0,0 +1,25 @@
+import threading
+
+import aes256_generator
+import aes256_stats
+
+
+def test_signal_handler_while_stats_lock_is_held(monkeypatch):
+    stats = aes256_stats.Stats(enabled=True)
+    monkeypatch.setattr(aes256_stats, "_stats", stats)
+    outcome = []
+
+    def interrupted_record():
+        # The handler runs on the thread that was inside record().
+        with stats._lock:
+            try:
+                aes256_generator._signal_handler(15, None)
+            except SystemExit as e:
+                outcome.append(e.code)
+
+    thread = threading.Thread(target=interrupted_record, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "signal handler deadlocked on the stats lock"
+    assert outcome == [1]
+    assert stats.report()["stages"]["wipe_all"]["count"] == 1
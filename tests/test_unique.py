@@ -0,0 +1,61 @@
+import random
+import tracemalloc
+
+from aes256_unique import KeyringIndex
+
+
+def test_index_build_stays_near_packed_size():
+    n = 100_000
+    rng = random.Random(1)
+    tracemalloc.start()
+    try:
+        index = KeyringIndex(rng.getrandbits(64) for _ in range(n))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    stats = index.stats()
+    assert stats["deployed"] == n
+    # Packed fingerprints (8 B) plus the Bloom filter; a set of Python ints would be ~10x this.
+    assert peak < 24 * n
+
+
+def test_index_is_sorted_and_deduplicated():
+    rng = random.Random(2)
+    fingerprints = [rng.getrandbits(64) for _ in range(5000)]
+    index = KeyringIndex(fingerprints + fingerprints[:100])
+    assert list(index._sorted) == sorted(set(fingerprints))
+    assert all(index._contains_fp(fp) for fp in fingerprints)
+
+
+def _reused_keys(n, seed):
+    # One buffer refilled per key, so only the index's own growth is traced.
+    rng = random.Random(seed)
+    buf = bytearray(32)
+    for _ in range(n):
+        buf[:] = rng.getrandbits(256).to_bytes(32, "little")
+        yield buf
+
+
+def test_issued_keys_stay_packed():
+    n = 20_000
+    index = KeyringIndex()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        assert index.ensure_unique(_reused_keys(n, 3)) == 0
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert index.stats()["issued"] == n
+    # Packed 8-byte fingerprints plus bucket slack; a set of Python ints is ~100 B per key.
+    assert after - before < 16 * n
+
+
+def test_issued_key_is_redrawn_when_repeated():
+    index = KeyringIndex()
+    key = bytearray(range(32))
+    index.add(key)
+    assert key in index
+    repeat = bytearray(range(32))
+    assert index.ensure_unique([repeat]) == 1
+    assert repeat != key and repeat in index